@@ -1,9 +1,17 @@
 from fastapi import APIRouter
 from api.v1.routers import health
+from api.v1.routers import auth
 from api.v1.routers import users
+from api.v1.routers import attendances
+from api.v1.routers import reports
+from api.v1.routers import faces
 
 api_router = APIRouter()
 
 # Include all routers
 api_router.include_router(health.router, prefix="/health", tags=["health"])
-api_router.include_router(users.router)
\ No newline at end of file
+api_router.include_router(auth.router)
+api_router.include_router(users.router)
+api_router.include_router(attendances.router)
+api_router.include_router(reports.router)
+api_router.include_router(faces.router)
\ No newline at end of file
@@ -0,0 +1,70 @@
+# api/v1/deps.py
+from typing import Callable
+from fastapi import Depends, Request, status
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from core.exceptions import CustomHTTPException
+from modules.auth.services.auth_service import AuthService
+from modules.users.common.user import UserRole
+from modules.users.models.user import UserView
+from modules.users.services.user import UserService
+
+_bearer = HTTPBearer(auto_error=False)
+
+# -----------------------------
+# Helper Functions
+# -----------------------------
+def _unauthorized(error_code: str, details: str) -> CustomHTTPException:
+    return CustomHTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        message="Not authenticated",
+        error_code=error_code,
+        details=details,
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+# -----------------------------
+# Current User
+# -----------------------------
+async def get_current_user(
+    request: Request,
+    credentials: HTTPAuthorizationCredentials | None = Depends(_bearer),
+) -> UserView:
+    """
+    User của access token trong header Authorization.
+
+    Kết quả được lưu ở `request.state` nên dù nhiều dependency cùng cần user,
+    token chỉ được verify và user chỉ được tra cứu một lần cho mỗi request.
+    Claims lấy từ cache token đã verify, user lấy từ cache của UserService.
+    """
+    current_user = getattr(request.state, "current_user", None)
+    if current_user is not None:
+        return current_user
+
+    if credentials is None:
+        raise _unauthorized("NOT_AUTHENTICATED", "Missing bearer token")
+
+    payload = AuthService.verify_token(credentials.credentials)
+    if payload is None:
+        raise _unauthorized("INVALID_TOKEN", "Token is invalid or expired")
+
+    user = await UserService.get_user_by_id(payload.sub)
+    if user is None or not user.is_active:
+        raise _unauthorized("INVALID_TOKEN", "User of this token no longer exists or is inactive")
+
+    request.state.current_user = user
+    return user
+
+
+def require_roles(*roles: UserRole) -> Callable:
+    """Dependency chỉ cho phép user có một trong các role đã cho."""
+    async def dependency(user: UserView = Depends(get_current_user)) -> UserView:
+        if user.role not in roles:
+            raise CustomHTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                message="Permission denied",
+                error_code="FORBIDDEN",
+                details=f"Requires role: {', '.join(role.value for role in roles)}",
+            )
+        return user
+
+    return dependency
@@ -0,0 +1,193 @@
+# api/v1/routers/attendances.py
+from datetime import date, datetime, timedelta
+from fastapi import APIRouter, Query, status
+from core.exceptions import CustomHTTPException
+from core.schemas import FastJSONResponse
+from modules.attendances.services.attendance_buffer import BufferClosedError, BufferFullError
+from modules.attendances.models.attendance import AttendanceView
+from modules.attendances.services.attendance_service import AttendanceService, CheckIn
+from utils.pagination import DEFAULT_PAGE_LIMIT, MAX_PAGE_LIMIT, InvalidCursorError
+from utils.time import ensure_utc
+from api.v1.schemas.attendances import (
+    AttendanceCheckIn,
+    AttendanceCheckInBatch,
+    AttendanceAcceptedData,
+    AttendanceAcceptedResponse,
+    AttendanceData,
+    AttendanceListResponse,
+    AttendanceListResponseExamples,
+    AttendancePageResponse,
+    AttendancePageResponseExamples,
+    AttendanceBufferMetrics,
+    AttendanceMetricsResponse,
+    AttendanceCheckInResponseExamples,
+    MAX_HISTORY_RANGE_DAYS,
+)
+
+router = APIRouter(prefix="/attendances", tags=["attendances"])
+
+# -----------------------------
+# Helper Functions
+# -----------------------------
+def _to_checkin(event: AttendanceCheckIn) -> CheckIn:
+    """Chuyển request schema thành tuple check-in cho service"""
+    return (event.user_id, event.timestamp, event.device_id, event.score)
+
+
+
+def _to_attendance_data(attendance: AttendanceView) -> AttendanceData:
+    """Chuyển projection thành AttendanceData (timestamp luôn là UTC)"""
+    return AttendanceData.model_construct(
+        id=str(attendance.id),
+        user_id=str(attendance.user_id),
+        timestamp=ensure_utc(attendance.timestamp),
+        device_id=attendance.device_id,
+        score=attendance.score,
+    )
+
+
+async def _submit(events: list[AttendanceCheckIn]) -> FastJSONResponse:
+    """Đưa event vào buffer, map backpressure sang 503"""
+    try:
+        accepted = await AttendanceService.submit_checkins([_to_checkin(event) for event in events])
+    except (BufferFullError, BufferClosedError):
+        raise CustomHTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            message="Attendance buffer is full",
+            error_code="ATTENDANCE_BUFFER_FULL",
+            details="Too many pending check-ins. Please retry shortly.",
+        )
+
+    return FastJSONResponse(
+        AttendanceAcceptedResponse(
+            message="Check-in accepted",
+            data=AttendanceAcceptedData(accepted=accepted),
+        ),
+        status_code=status.HTTP_202_ACCEPTED,
+    )
+
+# -----------------------------
+# Check-in
+# -----------------------------
+@router.post(
+    "",
+    response_model=AttendanceAcceptedResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    responses={
+        503: AttendanceCheckInResponseExamples.ERROR_503,
+    },
+)
+async def check_in(event: AttendanceCheckIn):
+    """
+    Nhận một check-in từ camera.
+
+    Event được đưa vào write buffer và ghi xuống DB bất đồng bộ theo batch.
+
+    **Responses:**
+    - **202**: Event đã được nhận
+    - **503**: Buffer đầy, client cần retry sau
+    """
+    return await _submit([event])
+
+
+@router.post(
+    "/batch",
+    response_model=AttendanceAcceptedResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    responses={
+        503: AttendanceCheckInResponseExamples.ERROR_503,
+    },
+)
+async def check_in_batch(batch: AttendanceCheckInBatch):
+    """Nhận nhiều check-in trong một request (tất cả hoặc không event nào được nhận)."""
+    return await _submit(batch.events)
+
+# -----------------------------
+# Range Queries
+# -----------------------------
+@router.get(
+    "",
+    response_model=AttendanceListResponse,
+    status_code=status.HTTP_200_OK,
+    responses={
+        400: AttendanceListResponseExamples.ERROR_400,
+    },
+)
+async def get_user_attendances(
+    user_id: str = Query(..., pattern=r"^[0-9a-fA-F]{24}$"),
+    start: datetime = Query(...),
+    end: datetime = Query(...),
+):
+    """Lịch sử check-in của một user trong khoảng [start, end)."""
+    start, end = ensure_utc(start), ensure_utc(end)
+    if end <= start or end - start > timedelta(days=MAX_HISTORY_RANGE_DAYS):
+        raise CustomHTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            message="Invalid time range",
+            error_code="ATTENDANCE_RANGE_INVALID",
+            details=f"end must be after start and the range must not exceed {MAX_HISTORY_RANGE_DAYS} days",
+        )
+
+    attendances = await AttendanceService.get_user_history(user_id, start, end)
+    return FastJSONResponse(
+        AttendanceListResponse(
+            message="Attendances listed successfully",
+            data=[_to_attendance_data(attendance) for attendance in attendances],
+        )
+    )
+
+
+@router.get(
+    "/daily",
+    response_model=AttendancePageResponse,
+    status_code=status.HTTP_200_OK,
+    responses={
+        400: AttendancePageResponseExamples.ERROR_400,
+    },
+)
+async def get_daily_attendances(
+    day: date = Query(...),
+    limit: int = Query(default=DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT),
+    cursor: str | None = Query(default=None),
+):
+    """
+    Check-in của tất cả user trong một ngày (theo múi giờ của hệ thống), sắp
+    theo thời gian.
+
+    Dùng cursor pagination như `GET /users`: truyền `next_cursor` của response
+    trước vào `cursor` để lấy trang tiếp theo; `next_cursor` là null khi đã hết.
+    """
+    try:
+        attendances, next_cursor = await AttendanceService.get_daily_checkins(day, limit=limit, cursor=cursor)
+    except InvalidCursorError:
+        raise CustomHTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            message="Invalid pagination cursor",
+            error_code="INVALID_CURSOR",
+            details=f"Cursor {cursor} is malformed or has been tampered with",
+        )
+
+    return FastJSONResponse(
+        AttendancePageResponse(
+            message="Attendances listed successfully",
+            data=[_to_attendance_data(attendance) for attendance in attendances],
+            next_cursor=next_cursor,
+        )
+    )
+
+# -----------------------------
+# Buffer Metrics
+# -----------------------------
+@router.get(
+    "/metrics",
+    response_model=AttendanceMetricsResponse,
+    status_code=status.HTTP_200_OK,
+)
+async def get_buffer_metrics():
+    """Số liệu hàng đợi của write buffer (depth, số event đã ghi/lỗi/bị từ chối)."""
+    return FastJSONResponse(
+        AttendanceMetricsResponse(
+            message="Attendance buffer metrics",
+            data=AttendanceBufferMetrics(**AttendanceService.buffer_metrics()),
+        )
+    )
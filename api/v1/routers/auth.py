@@ -0,0 +1,86 @@
+# api/v1/routers/auth.py
+from fastapi import APIRouter, Depends, status
+from core.exceptions import CustomHTTPException
+from core.schemas import FastJSONResponse
+from modules.auth.services.auth_service import AuthService
+from modules.auth.services.password_service import PasswordServiceBusyError
+from modules.users.models.user import UserView
+from api.v1.deps import get_current_user
+from api.v1.schemas.auth import (
+    AuthResponseExamples,
+    CurrentUserResponse,
+    LoginRequest,
+    LoginResponse,
+    TokenData,
+)
+from api.v1.schemas.users import to_user_data
+
+router = APIRouter(prefix="/auth", tags=["auth"])
+
+# -----------------------------
+# Login
+# -----------------------------
+@router.post(
+    "/login",
+    response_model=LoginResponse,
+    status_code=status.HTTP_200_OK,
+    responses={
+        401: AuthResponseExamples.ERROR_401,
+        403: AuthResponseExamples.ERROR_403,
+        503: AuthResponseExamples.ERROR_503,
+    },
+)
+async def login(payload: LoginRequest):
+    """Đăng nhập bằng username/mật khẩu, trả về access token (Bearer)."""
+    try:
+        user = await AuthService.authenticate(payload.username, payload.password)
+    except PasswordServiceBusyError:
+        raise CustomHTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            message="Authentication is busy",
+            error_code="AUTH_BUSY",
+            details="Too many concurrent logins. Please retry later.",
+        )
+
+    if user is None:
+        raise CustomHTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            message="Invalid username or password",
+            error_code="INVALID_CREDENTIALS",
+        )
+
+    if not user.is_active:
+        raise CustomHTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            message="User is inactive",
+            error_code="USER_INACTIVE",
+            details=f"User {user.username} is inactive",
+        )
+
+    token, expires_at = AuthService.issue_token(user)
+    return FastJSONResponse(
+        LoginResponse(
+            message="Login successful",
+            data=TokenData(access_token=token, expires_at=expires_at, user=to_user_data(user)),
+        )
+    )
+
+# -----------------------------
+# Current User
+# -----------------------------
+@router.get(
+    "/me",
+    response_model=CurrentUserResponse,
+    status_code=status.HTTP_200_OK,
+    responses={
+        401: AuthResponseExamples.ERROR_401,
+    },
+)
+async def get_me(user: UserView = Depends(get_current_user)):
+    """Thông tin user của access token hiện tại."""
+    return FastJSONResponse(
+        CurrentUserResponse(
+            message="Current user retrieved successfully",
+            data=to_user_data(user),
+        )
+    )
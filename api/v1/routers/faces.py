@@ -0,0 +1,148 @@
+# api/v1/routers/faces.py
+from fastapi import APIRouter, Query, status
+from core.config import settings
+from core.exceptions import CustomHTTPException
+from core.schemas import FastJSONResponse
+from modules.faces.services.face_service import EmbeddingLimitError, FaceService
+from modules.users.services.user import UserService
+from api.v1.schemas.faces import (
+    FaceEnrollData,
+    FaceEnrollRequest,
+    FaceEnrollResponse,
+    FaceIndexMetrics,
+    FaceIndexMetricsResponse,
+    FaceMatchData,
+    FaceRemoveData,
+    FaceRemoveResponse,
+    FaceResponseExamples,
+    FaceSearchRequest,
+    FaceSearchResponse,
+)
+
+router = APIRouter(prefix="/faces", tags=["faces"])
+
+# -----------------------------
+# Helper Functions
+# -----------------------------
+def _ensure_dimension(embeddings: list[list[float]]) -> None:
+    """Kiểm tra mọi embedding có đúng FACE_EMBEDDING_DIM phần tử"""
+    if any(len(embedding) != settings.FACE_EMBEDDING_DIM for embedding in embeddings):
+        raise CustomHTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            message="Invalid embedding dimension",
+            error_code="FACE_EMBEDDING_DIM_INVALID",
+            details=f"Every embedding must have {settings.FACE_EMBEDDING_DIM} values",
+        )
+
+
+async def _ensure_user_exists(user_id: str) -> None:
+    if await UserService.get_user_by_id(user_id) is None:
+        raise CustomHTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            message="User not found",
+            error_code="USER_NOT_FOUND",
+            details=f"User with id {user_id} was not found",
+        )
+
+# -----------------------------
+# Enroll
+# -----------------------------
+@router.post(
+    "",
+    response_model=FaceEnrollResponse,
+    status_code=status.HTTP_201_CREATED,
+    responses={
+        400: FaceResponseExamples.ERROR_400,
+        404: FaceResponseExamples.ERROR_404,
+        409: FaceResponseExamples.ERROR_409,
+    },
+)
+async def enroll_faces(payload: FaceEnrollRequest):
+    """Đăng ký embedding khuôn mặt cho user (có hiệu lực ngay cho tìm kiếm)."""
+    _ensure_dimension(payload.embeddings)
+    await _ensure_user_exists(payload.user_id)
+
+    try:
+        embedding_ids = await FaceService.enroll(payload.user_id, payload.embeddings)
+    except EmbeddingLimitError as exc:
+        raise CustomHTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            message="Embedding limit reached",
+            error_code="FACE_EMBEDDING_LIMIT",
+            details=str(exc),
+        )
+
+    return FastJSONResponse(
+        FaceEnrollResponse(
+            message="Face embeddings enrolled successfully",
+            data=FaceEnrollData(user_id=payload.user_id, embedding_ids=embedding_ids),
+        ),
+        status_code=status.HTTP_201_CREATED,
+    )
+
+# -----------------------------
+# Search
+# -----------------------------
+@router.post(
+    "/search",
+    response_model=FaceSearchResponse,
+    status_code=status.HTTP_200_OK,
+    responses={
+        400: FaceResponseExamples.ERROR_400,
+    },
+)
+async def search_faces(payload: FaceSearchRequest):
+    """
+    Tìm top-k user khớp nhất cho một batch embedding (cosine similarity).
+
+    Kết quả trả về theo thứ tự embedding trong request; probe không có user nào
+    vượt ngưỡng `threshold` (mặc định FACE_MATCH_THRESHOLD) nhận danh sách rỗng.
+    """
+    _ensure_dimension(payload.embeddings)
+    threshold = settings.FACE_MATCH_THRESHOLD if payload.threshold is None else payload.threshold
+
+    results = await FaceService.search(payload.embeddings, k=payload.k, threshold=threshold)
+    return FastJSONResponse(
+        FaceSearchResponse(
+            message="Face search completed",
+            data=[
+                [FaceMatchData(user_id=user_id, score=score) for user_id, score in matches]
+                for matches in results
+            ],
+        )
+    )
+
+# -----------------------------
+# Remove
+# -----------------------------
+@router.delete(
+    "",
+    response_model=FaceRemoveResponse,
+    status_code=status.HTTP_200_OK,
+)
+async def remove_faces(user_id: str = Query(..., pattern=r"^[0-9a-fA-F]{24}$")):
+    """Xóa toàn bộ embedding của một user."""
+    deleted = await FaceService.remove_user(user_id)
+    return FastJSONResponse(
+        FaceRemoveResponse(
+            message="Face embeddings deleted successfully",
+            data=FaceRemoveData(user_id=user_id, deleted=deleted),
+        )
+    )
+
+# -----------------------------
+# Metrics
+# -----------------------------
+@router.get(
+    "/metrics",
+    response_model=FaceIndexMetricsResponse,
+    status_code=status.HTTP_200_OK,
+)
+async def get_face_index_metrics():
+    """Số liệu face index của worker (số embedding, dung lượng ma trận)."""
+    return FastJSONResponse(
+        FaceIndexMetricsResponse(
+            message="Face index metrics",
+            data=FaceIndexMetrics(**FaceService.index_metrics()),
+        )
+    )
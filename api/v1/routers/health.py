@@ -1,7 +1,36 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, status
+from fastapi.responses import PlainTextResponse
+from core import mongo
+from core.health import check_readiness
+from core.metrics import PROMETHEUS_CONTENT_TYPE, render_prometheus
+from core.schemas import FastJSONResponse
 
 router = APIRouter()
 
+# Probe không được cache bởi proxy/load balancer
+NO_STORE = {"Cache-Control": "no-store"}
+
 @router.get("/")
 async def health_check():
     return {"status": "ok", "message": "API is running"}
+
+@router.get("/live")
+async def liveness():
+    """Liveness: process còn phục vụ được request (không kiểm tra phụ thuộc)."""
+    return FastJSONResponse({"status": "ok"}, headers=NO_STORE)
+
+@router.get("/ready", responses={503: {"description": "Worker is not ready to receive traffic"}})
+async def readiness():
+    """
+    Readiness: ping Mongo với timeout ngắn, kiểm tra pool connection và độ trễ
+    event loop. Trả 503 khi có kiểm tra thất bại để load balancer ngừng gửi
+    traffic; kết quả được cache trong HEALTH_CACHE_SECONDS.
+    """
+    result = await check_readiness(mongo.client, mongo.health_client)
+    status_code = status.HTTP_200_OK if result["status"] == "ok" else status.HTTP_503_SERVICE_UNAVAILABLE
+    return FastJSONResponse(result, status_code=status_code, headers=NO_STORE)
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Latency/status theo route và thời gian Mongo command (Prometheus text format)."""
+    return PlainTextResponse(render_prometheus(), media_type=PROMETHEUS_CONTENT_TYPE)
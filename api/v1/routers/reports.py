@@ -0,0 +1,215 @@
+# api/v1/routers/reports.py
+import os
+from datetime import date
+from fastapi import APIRouter, Query, Request, status
+from fastapi.responses import FileResponse
+from bson import ObjectId
+from core.exceptions import CustomHTTPException
+from core.schemas import FastJSONResponse
+from modules.reports.common.report import ReportStatus
+from modules.reports.models.report_job import ReportJob
+from modules.reports.services.report_service import ReportService
+from modules.reports.services.report_worker import WorkerQueueFullError
+from utils.export import ExportFormat
+from utils.time import ensure_utc
+from api.v1.schemas.reports import (
+    DailySummaryData,
+    DailySummaryResponse,
+    DailySummaryResponseExamples,
+    ReportJobCreate,
+    ReportJobData,
+    ReportJobResponse,
+    ReportJobResponseExamples,
+    MAX_REPORT_RANGE_DAYS,
+)
+
+router = APIRouter(prefix="/reports", tags=["reports"])
+
+# -----------------------------
+# Helper Functions
+# -----------------------------
+def _to_report_job_data(job: ReportJob, request: Request) -> ReportJobData:
+    """Chuyển ReportJob thành ReportJobData"""
+    download_url = None
+    if job.status == ReportStatus.COMPLETED:
+        download_url = str(request.url_for("download_report", job_id=str(job.id)))
+
+    return ReportJobData(
+        id=str(job.id),
+        report_type=job.report_type,
+        start_day=job.start_day,
+        end_day=job.end_day,
+        format=job.file_format,
+        status=job.status,
+        progress=job.progress,
+        processed_users=job.processed_users,
+        total_users=job.total_users,
+        rows=job.rows,
+        error=job.error,
+        created_at=ensure_utc(job.created_at),
+        started_at=ensure_utc(job.started_at) if job.started_at else None,
+        finished_at=ensure_utc(job.finished_at) if job.finished_at else None,
+        download_url=download_url,
+    )
+
+
+def _ensure_period(start_day: date, end_day: date) -> None:
+    period_days = (end_day - start_day).days + 1
+    if period_days < 1 or period_days > MAX_REPORT_RANGE_DAYS:
+        raise CustomHTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            message="Invalid report period",
+            error_code="REPORT_RANGE_INVALID",
+            details=(
+                "end_day must not be before start_day and the period must not "
+                f"exceed {MAX_REPORT_RANGE_DAYS} days"
+            ),
+        )
+
+
+def _ensure_user_ids(user_ids: list[str] | None) -> None:
+    invalid_ids = [user_id for user_id in user_ids or [] if not ObjectId.is_valid(user_id)]
+    if invalid_ids:
+        raise CustomHTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            message="Invalid user ids",
+            error_code="REPORT_USER_IDS_INVALID",
+            details=f"Invalid user ids: {', '.join(invalid_ids[:10])}",
+        )
+
+
+async def _get_job_or_404(job_id: str) -> ReportJob:
+    job = await ReportService.get_job(job_id)
+    if not job:
+        raise CustomHTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            message="Report job not found",
+            error_code="REPORT_NOT_FOUND",
+            details=f"Report job {job_id} was not found",
+        )
+    return job
+
+# -----------------------------
+# Submit Report
+# -----------------------------
+@router.post(
+    "",
+    response_model=ReportJobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    responses={
+        400: ReportJobResponseExamples.ERROR_400,
+        503: ReportJobResponseExamples.ERROR_503,
+    },
+)
+async def submit_report(payload: ReportJobCreate, request: Request):
+    """
+    Tạo job báo cáo chấm công cho khoảng ngày [start_day, end_day].
+
+    Báo cáo được tính ở worker nền; dùng GET /reports/{job_id} để theo dõi tiến
+    độ và tải file khi hoàn thành.
+    """
+    _ensure_period(payload.start_day, payload.end_day)
+    _ensure_user_ids(payload.user_ids)
+
+    try:
+        job = await ReportService.submit_job(
+            payload.start_day,
+            payload.end_day,
+            payload.user_ids,
+            payload.format,
+        )
+    except WorkerQueueFullError:
+        raise CustomHTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            message="Report queue is full",
+            error_code="REPORT_QUEUE_FULL",
+            details="Too many pending reports. Please retry later.",
+        )
+
+    return FastJSONResponse(
+        ReportJobResponse(
+            message="Report job submitted",
+            data=_to_report_job_data(job, request),
+        ),
+        status_code=status.HTTP_202_ACCEPTED,
+    )
+
+# -----------------------------
+# Daily Summary
+# -----------------------------
+@router.get(
+    "/daily-summary",
+    response_model=DailySummaryResponse,
+    status_code=status.HTTP_200_OK,
+    responses={
+        200: DailySummaryResponseExamples.SUCCESS_200,
+        400: DailySummaryResponseExamples.ERROR_400,
+    },
+)
+async def get_daily_summary(
+    start_day: date = Query(..., example="2024-01-01"),
+    end_day: date = Query(..., example="2024-01-31"),
+    user_ids: list[str] | None = Query(default=None, alias="user_id"),
+):
+    """
+    Tổng hợp chấm công theo ngày (số người có mặt, đi muộn, về sớm, giờ công
+    trung bình), đọc từ bảng rollup và được cache theo khoảng ngày + bộ lọc.
+    """
+    _ensure_period(start_day, end_day)
+    _ensure_user_ids(user_ids)
+
+    summary = await ReportService.get_daily_summary(start_day, end_day, user_ids)
+    return FastJSONResponse(
+        DailySummaryResponse(
+            message="Daily summary retrieved successfully",
+            data=[DailySummaryData.model_construct(**row) for row in summary],
+        )
+    )
+
+# -----------------------------
+# Poll Report
+# -----------------------------
+@router.get(
+    "/{job_id}",
+    response_model=ReportJobResponse,
+    status_code=status.HTTP_200_OK,
+    responses={
+        404: ReportJobResponseExamples.ERROR_404,
+    },
+)
+async def get_report(job_id: str, request: Request):
+    """Trạng thái và tiến độ của report job."""
+    job = await _get_job_or_404(job_id)
+    return FastJSONResponse(
+        ReportJobResponse(
+            message="Report job retrieved successfully",
+            data=_to_report_job_data(job, request),
+        )
+    )
+
+# -----------------------------
+# Download Report
+# -----------------------------
+@router.get(
+    "/{job_id}/download",
+    response_class=FileResponse,
+    status_code=status.HTTP_200_OK,
+    responses={
+        404: ReportJobResponseExamples.ERROR_404,
+        409: ReportJobResponseExamples.ERROR_409,
+    },
+)
+async def download_report(job_id: str):
+    """Tải file báo cáo khi job đã hoàn thành."""
+    job = await _get_job_or_404(job_id)
+    if job.status != ReportStatus.COMPLETED or not job.file_path or not os.path.exists(job.file_path):
+        raise CustomHTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            message="Report is not ready",
+            error_code="REPORT_NOT_READY",
+            details=f"Report job {job_id} is {job.status.value}",
+        )
+
+    export_format = ExportFormat(job.file_format.value)
+    filename = f"attendance-{job.start_day:%Y%m%d}-{job.end_day:%Y%m%d}.{export_format.value}"
+    return FileResponse(job.file_path, media_type=export_format.media_type, filename=filename)
@@ -1,39 +1,53 @@
 # app/api/v1/routers/users.py
-from fastapi import APIRouter, Query, status
+import csv
+import io
+from datetime import datetime, timezone
+from typing import Any
+from fastapi import APIRouter, Body, File, Query, UploadFile, status
+from pydantic import ValidationError
+from fastapi.responses import StreamingResponse
 from pymongo.errors import DuplicateKeyError
-from modules.users.services.user import UserService
+from modules.users.services.user import (
+    EXPORT_FIELDS,
+    MAX_IMPORT_ROWS,
+    MAX_LOOKUP_KEYS,
+    SEARCH_DEFAULT_LIMIT,
+    SEARCH_MAX_LIMIT,
+    ImportResult,
+    UserService,
+)
+from modules.users.common.user import UserImportStatus, normalize_search_text
 from core.exceptions import CustomHTTPException
+from core.schemas import FastJSONResponse
+from utils.export import ExportFormat, stream_rows
+from utils.singleflight import SingleFlight
+from utils.pagination import DEFAULT_PAGE_LIMIT, MAX_PAGE_LIMIT, InvalidCursorError
 from api.v1.schemas.users import (
     UserCreate,
     UserCreateResponse,
-    UserData,
+    to_user_data,
     UserCreateResponseExamples,
     UserListResponse,
     UserListResponseExamples,
+    UserSearchResponse,
+    UserSearchResponseExamples,
     UserDeleteResponse,
     UserDeleteResponseExamples,
+    UserImportRowResult,
+    UserImportReport,
+    UserImportResponse,
+    UserImportResponseExamples,
 )
-from modules.users.models.user import User
+from modules.users.models.user import User, UserView
 
 router = APIRouter(prefix="/users", tags=["users"])
 
+# Gộp các request tạo user đồng thời có cùng số điện thoại (client retry dồn dập)
+_create_user_flight: SingleFlight[str, User] = SingleFlight()
+
 # -----------------------------
 # Helper Functions
 # -----------------------------
-def _to_user_data(user: User) -> UserData:
-    """Chuyển đổi user thành UserData"""
-    return UserData(
-        id=str(user.id),
-        name=user.name,
-        phone=user.phone,
-        username=user.username,
-        email=user.email,
-        position=user.position,
-        is_active=user.is_active,
-        role=user.role,
-    )
-
-
 def _duplicate_fields(error: DuplicateKeyError) -> set[str]:
     """Trích xuất danh sách field trùng từ DuplicateKeyError."""
     details = getattr(error, "details", None) or {}
@@ -46,6 +60,168 @@ def _duplicate_fields(error: DuplicateKeyError) -> set[str]:
     known_fields = {"phone", "username", "email"}
     return {field for field in known_fields if field in message}
 
+
+def _ensure_import_size(row_count: int) -> None:
+    """Giới hạn số dòng của một lần import."""
+    if row_count == 0:
+        raise CustomHTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            message="Import payload is empty",
+            error_code="USER_IMPORT_EMPTY",
+            details="Provide at least one user to import",
+        )
+
+    if row_count > MAX_IMPORT_ROWS:
+        raise CustomHTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            message="Import payload is too large",
+            error_code="USER_IMPORT_TOO_LARGE",
+            details=f"At most {MAX_IMPORT_ROWS} rows can be imported per request",
+        )
+
+
+def _ensure_lookup_size(values: list[str]) -> None:
+    """Giới hạn số id/username của một lần lookup."""
+    if len(values) > MAX_LOOKUP_KEYS:
+        raise CustomHTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            message="Too many users requested",
+            error_code="USER_LOOKUP_TOO_MANY",
+            details=f"At most {MAX_LOOKUP_KEYS} id or user_name values can be requested at once",
+        )
+
+
+def _lookup_response(users: list[UserView], field: str, values: list[str]) -> FastJSONResponse:
+    """Response cho lookup theo id/username, 404 nếu không có user nào."""
+    if not users:
+        raise CustomHTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            message="User not found",
+            error_code="USER_NOT_FOUND",
+            details=f"User with {field} {', '.join(values)} was not found",
+        )
+
+    return FastJSONResponse(
+        UserListResponse(
+            message="User retrieved successfully" if len(users) == 1 else "Users retrieved successfully",
+            data=[to_user_data(user) for user in users],
+        )
+    )
+
+
+def _to_import_report(
+    phones: list[str | None],
+    outcomes: dict[int, ImportResult],
+) -> UserImportReport:
+    """Gộp kết quả từng dòng thành báo cáo import (row đánh số từ 1)."""
+    results: list[UserImportRowResult] = []
+    counts = {status_: 0 for status_ in UserImportStatus}
+
+    for index, phone in enumerate(phones):
+        row_status, user, error = outcomes[index]
+        counts[row_status] += 1
+        results.append(
+            UserImportRowResult(
+                row=index + 1,
+                phone=phone,
+                status=row_status,
+                data=to_user_data(user) if user is not None else None,
+                error=error,
+            )
+        )
+
+    return UserImportReport(
+        total=len(phones),
+        created=counts[UserImportStatus.CREATED],
+        duplicate=counts[UserImportStatus.DUPLICATE],
+        conflict=counts[UserImportStatus.CONFLICT],
+        invalid=counts[UserImportStatus.INVALID],
+        results=results,
+    )
+
+
+def _validate_import_rows(
+    rows: list[Any],
+) -> tuple[list[str | None], dict[int, UserCreate], dict[int, ImportResult]]:
+    """
+    Validate từng dòng import; dòng lỗi được đánh `invalid` thay vì làm hỏng
+    cả payload (dùng chung cho JSON bulk và CSV import).
+    """
+    phones: list[str | None] = []
+    valid_rows: dict[int, UserCreate] = {}
+    outcomes: dict[int, ImportResult] = {}
+
+    for index, row in enumerate(rows):
+        phone = row.get("phone") if isinstance(row, dict) else None
+        phones.append(str(phone) if phone not in (None, "") else None)
+        try:
+            valid_rows[index] = UserCreate.model_validate(row)
+        except ValidationError as exc:
+            message = "; ".join(
+                f"{'.'.join(str(loc) for loc in error['loc']) or 'row'}: {error['msg']}"
+                for error in exc.errors()
+            )
+            outcomes[index] = (UserImportStatus.INVALID, None, message)
+
+    return phones, valid_rows, outcomes
+
+
+async def _import_users(
+    phones: list[str | None],
+    valid_rows: dict[int, UserCreate],
+    outcomes: dict[int, ImportResult],
+) -> FastJSONResponse:
+    """Chạy bulk create cho các dòng hợp lệ và dựng response."""
+    indexes = list(valid_rows)
+    created = await UserService.bulk_create_users(
+        [(valid_rows[i].name, valid_rows[i].phone, valid_rows[i].position) for i in indexes]
+    )
+    outcomes.update(zip(indexes, created))
+
+    return FastJSONResponse(
+        UserImportResponse(
+            message="Users imported",
+            data=_to_import_report(phones, outcomes),
+        )
+    )
+
+async def _create_user(user_data: UserCreate) -> User:
+    """Kiểm tra phone và tạo user, map lỗi trùng key sang CustomHTTPException."""
+    # Check phone exists
+    existing_phone = await UserService.get_user_by_phone(user_data.phone)
+    if existing_phone:
+        raise CustomHTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            message="User already registered",
+            error_code="USER_EXISTS",
+            details=f"Phone number {user_data.phone} is already registered"
+        )
+        
+    try:
+        user = await UserService.create_user(user_data.name, user_data.phone, user_data.position)
+    except DuplicateKeyError as exc:
+        duplicate_fields = _duplicate_fields(exc)
+
+        if "phone" in duplicate_fields:
+            raise CustomHTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                message="User already registered",
+                error_code="USER_EXISTS",
+                details=f"Phone number {user_data.phone} is already registered",
+            )
+
+        if duplicate_fields & {"username", "email"}:
+            raise CustomHTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                message="Unable to generate unique username/email",
+                error_code="USER_USERNAME_CONFLICT",
+                details="Generated username/email already exists. Please retry the request.",
+            )
+
+        raise
+
+    return user
+
 # -----------------------------
 # Create User
 # -----------------------------
@@ -72,43 +248,101 @@ async def create_user(user_data: UserCreate):
     - **400**: User đã tồn tại
     - **422**: Dữ liệu không hợp lệ
     """
-    # Check phone exists
-    existing_phone = await UserService.get_user_by_phone(user_data.phone)
-    if existing_phone:
+    user, shared = await _create_user_flight.do(
+        user_data.phone,
+        lambda: _create_user(user_data),
+    )
+
+    if shared:
+        # Request trùng đã được xử lý bởi request đang chạy: trả về đúng như khi
+        # các request được xử lý tuần tự.
         raise CustomHTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             message="User already registered",
             error_code="USER_EXISTS",
             details=f"Phone number {user_data.phone} is already registered"
         )
-        
+
+    return FastJSONResponse(
+        UserCreateResponse(
+            message="User created successfully",
+            data=to_user_data(user),
+        ),
+        status_code=status.HTTP_201_CREATED,
+    )
+
+# -----------------------------
+# Bulk Create / Import Users
+# -----------------------------
+@router.post(
+    "/bulk",
+    response_model=UserImportResponse,
+    status_code=status.HTTP_200_OK,
+    responses={
+        400: UserImportResponseExamples.ERROR_400,
+        422: UserImportResponseExamples.ERROR_422,
+    },
+)
+async def bulk_create_users(users_data: list[Any] = Body(...)):
+    """
+    Tạo nhiều user từ một JSON array.
+
+    Trả về báo cáo từng dòng: `created`, `duplicate` (phone đã tồn tại hoặc lặp
+    trong payload), `conflict` (không cấp được username) hoặc `invalid`. Mỗi
+    dòng được validate riêng như `/users/import`, nên một dòng lỗi không làm
+    hỏng cả array.
+    """
+    _ensure_import_size(len(users_data))
+
+    return await _import_users(*_validate_import_rows(users_data))
+
+
+@router.post(
+    "/import",
+    response_model=UserImportResponse,
+    status_code=status.HTTP_200_OK,
+    responses={
+        400: UserImportResponseExamples.ERROR_400,
+    },
+)
+async def import_users(file: UploadFile = File(...)):
+    """
+    Import user từ file CSV (UTF-8) có header `name,phone[,position]`.
+
+    Dòng không hợp lệ được báo `invalid` trong báo cáo thay vì làm hỏng cả file.
+    """
     try:
-        user = await UserService.create_user(user_data.name, user_data.phone, user_data.position)
-    except DuplicateKeyError as exc:
-        duplicate_fields = _duplicate_fields(exc)
+        content = (await file.read()).decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise CustomHTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            message="Import file must be UTF-8 encoded CSV",
+            error_code="USER_IMPORT_INVALID_FILE",
+            details="Unable to decode the uploaded file as UTF-8",
+        )
 
-        if "phone" in duplicate_fields:
-            raise CustomHTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                message="User already registered",
-                error_code="USER_EXISTS",
-                details=f"Phone number {user_data.phone} is already registered",
-            )
+    reader = csv.DictReader(io.StringIO(content))
+    if not reader.fieldnames or not {"name", "phone"} <= {name.strip() for name in reader.fieldnames}:
+        raise CustomHTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            message="Import file must have name and phone columns",
+            error_code="USER_IMPORT_INVALID_FILE",
+            details="CSV header must include name, phone and optionally position",
+        )
 
-        if duplicate_fields & {"username", "email"}:
-            raise CustomHTTPException(
-                status_code=status.HTTP_409_CONFLICT,
-                message="Unable to generate unique username/email",
-                error_code="USER_USERNAME_CONFLICT",
-                details="Generated username/email already exists. Please retry the request.",
-            )
+    rows = list(reader)
+    _ensure_import_size(len(rows))
 
-        raise
+    values = []
+    for row in rows:
+        cells = {(key or "").strip(): (value or "").strip() for key, value in row.items()}
+        values.append({
+            "name": cells.get("name", ""),
+            "phone": cells.get("phone", ""),
+            "position": cells.get("position") or None,
+        })
 
-    return UserCreateResponse(
-        message="User created successfully",
-        data=_to_user_data(user),
-    )
+    return await _import_users(*_validate_import_rows(values))
 
 # -----------------------------
 # Get Users
@@ -118,49 +352,127 @@ async def create_user(user_data: UserCreate):
     response_model=UserListResponse,
     status_code=status.HTTP_200_OK,
     responses={
+        400: UserListResponseExamples.ERROR_400,
         404: UserListResponseExamples.ERROR_404,
     },
 )
 async def get_users(
-    user_id: str | None = Query(default=None, alias="id"),
-    username: str | None = Query(default=None, alias="user_name"),
+    user_ids: list[str] | None = Query(default=None, alias="id"),
+    usernames: list[str] | None = Query(default=None, alias="user_name"),
+    limit: int = Query(default=DEFAULT_PAGE_LIMIT, ge=1, le=MAX_PAGE_LIMIT),
+    cursor: str | None = Query(default=None),
 ):
-    """Lấy user theo id/username hoặc toàn bộ danh sách nếu không truyền tham số."""
+    """
+    Lấy user theo id/username hoặc danh sách phân trang nếu không truyền tham số.
 
-    if user_id:
-        user = await UserService.get_user_by_id(user_id)
-        if not user:
-            raise CustomHTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                message="User not found",
-                error_code="USER_NOT_FOUND",
-                details=f"User with id {user_id} was not found",
-            )
+    Có thể truyền nhiều `id` (hoặc nhiều `user_name`), vd `?id=a&id=b`: tất cả
+    được lấy bằng một query, trả về theo thứ tự truyền vào và bỏ qua giá trị
+    không tồn tại; 404 khi không tìm thấy user nào.
+
+    Danh sách dùng cursor pagination: truyền `next_cursor` của response trước vào
+    `cursor` để lấy trang tiếp theo; `next_cursor` là null khi đã hết dữ liệu.
+    """
 
-        return UserListResponse(
-            message="User retrieved successfully",
-            data=[_to_user_data(user)],
+    if user_ids:
+        _ensure_lookup_size(user_ids)
+        users = await UserService.get_users_by_ids(user_ids)
+        return _lookup_response(users, "id", user_ids)
+
+    if usernames:
+        _ensure_lookup_size(usernames)
+        users = await UserService.get_users_by_usernames(usernames)
+        return _lookup_response(users, "username", usernames)
+
+    try:
+        users, next_cursor = await UserService.get_list_users(limit=limit, cursor=cursor)
+    except InvalidCursorError:
+        raise CustomHTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            message="Invalid pagination cursor",
+            error_code="INVALID_CURSOR",
+            details=f"Cursor {cursor} is malformed or has been tampered with",
         )
 
-    if username:
-        user = await UserService.get_user_by_username(username)
-        if not user:
-            raise CustomHTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                message="User not found",
-                error_code="USER_NOT_FOUND",
-                details=f"User with username {username} was not found",
-            )
+    return FastJSONResponse(
+        UserListResponse(
+            message="Users listed successfully",
+            data=[to_user_data(user) for user in users],
+            next_cursor=next_cursor,
+        )
+    )
+
+
+# -----------------------------
+# Search Users
+# -----------------------------
+@router.get(
+    "/search",
+    response_model=UserSearchResponse,
+    status_code=status.HTTP_200_OK,
+    responses={
+        400: UserSearchResponseExamples.ERROR_400,
+    },
+)
+async def search_users(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(default=SEARCH_DEFAULT_LIMIT, ge=1, le=SEARCH_MAX_LIMIT),
+):
+    """
+    Tìm user theo tên hoặc username, không phân biệt dấu/hoa thường (autocomplete).
 
-        return UserListResponse(
-            message="User retrieved successfully",
-            data=[_to_user_data(user)],
+    Khớp khi query là phần đầu của tên tính từ một từ bất kỳ: "quyet",
+    "nguyen ngoc", "ngoc quy" đều tìm thấy "Nguyễn Ngọc Quyết".
+    """
+    if not normalize_search_text(q):
+        raise CustomHTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            message="Invalid search query",
+            error_code="USER_SEARCH_QUERY_INVALID",
+            details="Query must contain at least one letter or digit",
         )
 
-    users = await UserService.get_list_users()
-    return UserListResponse(
-        message="Users listed successfully",
-        data=[_to_user_data(user) for user in users],
+    users = await UserService.search_users(q, limit=limit)
+    return FastJSONResponse(
+        UserSearchResponse(
+            message="Users found",
+            data=[to_user_data(user) for user in users],
+        )
+    )
+
+
+# -----------------------------
+# Export Users
+# -----------------------------
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    status_code=status.HTTP_200_OK,
+    responses={
+        200: {
+            "description": "User directory stream",
+            "content": {
+                ExportFormat.NDJSON.media_type: {},
+                ExportFormat.CSV.media_type: {},
+                ExportFormat.XLSX.media_type: {},
+            },
+        },
+    },
+)
+async def export_users(
+    export_format: ExportFormat = Query(default=ExportFormat.NDJSON, alias="format"),
+):
+    """
+    Export toàn bộ user dưới dạng stream NDJSON, CSV hoặc XLSX.
+
+    Dữ liệu được đọc theo batch từ Mongo và gửi dần cho client, nên byte đầu tiên
+    đi ra trước khi truy vấn kết thúc và bộ nhớ không tăng theo số user. XLSX
+    được ghi ra file tạm trước rồi mới gửi.
+    """
+    filename = f"users-{datetime.now(timezone.utc):%Y%m%d%H%M%S}.{export_format.value}"
+    return StreamingResponse(
+        stream_rows(UserService.iter_users_for_export(), export_format, EXPORT_FIELDS),
+        media_type=export_format.media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
     )
 
 
@@ -190,7 +502,7 @@ async def delete_user(
             details="Provide either id or user_name to delete a user",
         )
 
-    user: User | None
+    user: UserView | None
     if user_id:
         user = await UserService.get_user_by_id(user_id)
         identifier_detail = f"id {user_id}"
@@ -209,6 +521,8 @@ async def delete_user(
 
     await UserService.delete_user(user)
 
-    return UserDeleteResponse(
-        message="User deleted successfully",
+    return FastJSONResponse(
+        UserDeleteResponse(
+            message="User deleted successfully",
+        )
     )
@@ -0,0 +1,211 @@
+# api/v1/schemas/attendances.py
+from datetime import datetime
+from pydantic import BaseModel, Field
+from core.schemas import CursorPageResponse, SuccessResponse, ErrorResponse
+
+MAX_CHECKIN_BATCH = 1000
+MAX_HISTORY_RANGE_DAYS = 366
+
+# -----------------------------
+# Request Schemas
+# -----------------------------
+class AttendanceCheckIn(BaseModel):
+    """Schema cho một lần check-in từ camera"""
+    user_id: str = Field(..., pattern=r"^[0-9a-fA-F]{24}$", example="68d8106764888819afe47f30")
+    timestamp: datetime | None = Field(None, example="2024-01-01T08:00:00+07:00")
+    device_id: str | None = Field(None, max_length=64, example="cam-gate-01")
+    score: float | None = Field(None, ge=0, le=1, example=0.93)
+
+class AttendanceCheckInBatch(BaseModel):
+    """Schema cho một batch check-in"""
+    events: list[AttendanceCheckIn] = Field(..., min_length=1, max_length=MAX_CHECKIN_BATCH)
+
+# -----------------------------
+# Data Schemas
+# -----------------------------
+class AttendanceAcceptedData(BaseModel):
+    """Số event đã được nhận vào buffer"""
+    accepted: int
+
+class AttendanceData(BaseModel):
+    """Một check-in trong response"""
+    id: str
+    user_id: str
+    timestamp: datetime
+    device_id: str | None
+    score: float | None
+
+class AttendanceBufferMetrics(BaseModel):
+    """Số liệu write buffer"""
+    running: bool
+    depth: int
+    in_flight: int
+    max_size: int
+    batch_size: int
+    flush_interval_seconds: float
+    enqueued_total: int
+    written_total: int
+    failed_total: int
+    rejected_total: int
+    flushes_total: int
+    last_flush_size: int
+    last_flush_seconds: float
+
+# -----------------------------
+# Response Schemas
+# -----------------------------
+class AttendanceAcceptedResponse(SuccessResponse[AttendanceAcceptedData]):
+    """Response cho check-in"""
+    pass
+
+class AttendanceListResponse(SuccessResponse[list[AttendanceData]]):
+    """Response cho danh sách check-in"""
+    pass
+
+class AttendancePageResponse(CursorPageResponse[list[AttendanceData]]):
+    """Response cho một trang check-in"""
+    pass
+
+class AttendanceMetricsResponse(SuccessResponse[AttendanceBufferMetrics]):
+    """Response cho số liệu buffer"""
+    pass
+
+# -----------------------------
+# Response Examples
+# -----------------------------
+class AttendanceCheckInResponseExamples:
+    """Response examples cho check-in"""
+
+    SUCCESS_202 = {
+        "description": "Check-in accepted",
+        "content": {
+            "application/json": {
+                "example": {
+                    "success": True,
+                    "message": "Check-in accepted",
+                    "data": {
+                        "accepted": 1
+                    },
+                    "timestamp": "2024-01-01T00:00:00Z"
+                }
+            }
+        }
+    }
+
+    ERROR_503 = {
+        "model": ErrorResponse,
+        "description": "Attendance buffer is full",
+        "content": {
+            "application/json": {
+                "example": {
+                    "success": False,
+                    "message": "Attendance buffer is full",
+                    "error": {
+                        "code": "ATTENDANCE_BUFFER_FULL",
+                        "details": "Too many pending check-ins. Please retry shortly."
+                    },
+                    "timestamp": "2024-01-01T00:00:00Z"
+                }
+            }
+        }
+    }
+
+class AttendanceListResponseExamples:
+    """Response examples cho truy vấn check-in"""
+
+    SUCCESS_200 = {
+        "description": "Attendances listed successfully",
+        "content": {
+            "application/json": {
+                "example": {
+                    "success": True,
+                    "message": "Attendances listed successfully",
+                    "data": [
+                        {
+                            "id": "68d8106764888819afe47f31",
+                            "user_id": "68d8106764888819afe47f30",
+                            "timestamp": "2024-01-01T01:00:00Z",
+                            "device_id": "cam-gate-01",
+                            "score": 0.93
+                        }
+                    ],
+                    "timestamp": "2024-01-01T00:00:00Z"
+                }
+            }
+        }
+    }
+
+    ERROR_400 = {
+        "model": ErrorResponse,
+        "description": "Invalid time range",
+        "content": {
+            "application/json": {
+                "example": {
+                    "success": False,
+                    "message": "Invalid time range",
+                    "error": {
+                        "code": "ATTENDANCE_RANGE_INVALID",
+                        "details": "end must be after start and the range must not exceed 366 days"
+                    },
+                    "timestamp": "2024-01-01T00:00:00Z"
+                }
+            }
+        }
+    }
+
+class AttendancePageResponseExamples:
+    """Response examples cho check-in theo ngày (phân trang)"""
+
+    SUCCESS_200 = {
+        "description": "Attendances listed successfully",
+        "content": {
+            "application/json": {
+                "example": {
+                    "success": True,
+                    "message": "Attendances listed successfully",
+                    "data": [
+                        {
+                            "id": "68d8106764888819afe47f31",
+                            "user_id": "68d8106764888819afe47f30",
+                            "timestamp": "2024-01-01T01:00:00Z",
+                            "device_id": "cam-gate-01",
+                            "score": 0.93
+                        }
+                    ],
+                    "next_cursor": "AAABjMM8QIBo2BBnZIiIGa_kfzE",
+                    "timestamp": "2024-01-01T00:00:00Z"
+                }
+            }
+        }
+    }
+
+    ERROR_400 = {
+        "model": ErrorResponse,
+        "description": "Invalid pagination cursor",
+        "content": {
+            "application/json": {
+                "example": {
+                    "success": False,
+                    "message": "Invalid pagination cursor",
+                    "error": {
+                        "code": "INVALID_CURSOR",
+                        "details": "Cursor abc is malformed or has been tampered with"
+                    },
+                    "timestamp": "2024-01-01T00:00:00Z"
+                }
+            }
+        }
+    }
+
+# -----------------------------
+# Rebuild Schemas
+# -----------------------------
+AttendanceCheckIn.model_rebuild()
+AttendanceCheckInBatch.model_rebuild()
+AttendanceAcceptedData.model_rebuild()
+AttendanceData.model_rebuild()
+AttendanceBufferMetrics.model_rebuild()
+AttendanceAcceptedResponse.model_rebuild()
+AttendanceListResponse.model_rebuild()
+AttendancePageResponse.model_rebuild()
+AttendanceMetricsResponse.model_rebuild()
@@ -0,0 +1,102 @@
+# api/v1/schemas/auth.py
+from datetime import datetime
+from pydantic import BaseModel, Field
+from core.schemas import SuccessResponse, ErrorResponse
+from api.v1.schemas.users import UserData
+
+# -----------------------------
+# Request Schemas
+# -----------------------------
+class LoginRequest(BaseModel):
+    """Schema cho request đăng nhập"""
+    username: str = Field(..., min_length=1, example="quyetnn")
+    password: str = Field(..., min_length=1, example="123456")
+
+# -----------------------------
+# Data Schemas
+# -----------------------------
+class TokenData(BaseModel):
+    """Access token trong response"""
+    access_token: str
+    token_type: str = "bearer"
+    expires_at: datetime
+    user: UserData
+
+# -----------------------------
+# Response Schemas
+# -----------------------------
+class LoginResponse(SuccessResponse[TokenData]):
+    """Response cho đăng nhập"""
+    pass
+
+class CurrentUserResponse(SuccessResponse[UserData]):
+    """Response cho user hiện tại"""
+    pass
+
+# -----------------------------
+# Response Examples
+# -----------------------------
+class AuthResponseExamples:
+    """Response examples cho auth"""
+
+    ERROR_401 = {
+        "model": ErrorResponse,
+        "description": "Invalid credentials or token",
+        "content": {
+            "application/json": {
+                "example": {
+                    "success": False,
+                    "message": "Invalid username or password",
+                    "error": {
+                        "code": "INVALID_CREDENTIALS",
+                        "details": "Invalid username or password"
+                    },
+                    "timestamp": "2024-01-01T00:00:00Z"
+                }
+            }
+        }
+    }
+
+    ERROR_403 = {
+        "model": ErrorResponse,
+        "description": "User is inactive",
+        "content": {
+            "application/json": {
+                "example": {
+                    "success": False,
+                    "message": "User is inactive",
+                    "error": {
+                        "code": "USER_INACTIVE",
+                        "details": "User quyetnn is inactive"
+                    },
+                    "timestamp": "2024-01-01T00:00:00Z"
+                }
+            }
+        }
+    }
+
+    ERROR_503 = {
+        "model": ErrorResponse,
+        "description": "Too many concurrent logins",
+        "content": {
+            "application/json": {
+                "example": {
+                    "success": False,
+                    "message": "Authentication is busy",
+                    "error": {
+                        "code": "AUTH_BUSY",
+                        "details": "Too many concurrent logins. Please retry later."
+                    },
+                    "timestamp": "2024-01-01T00:00:00Z"
+                }
+            }
+        }
+    }
+
+# -----------------------------
+# Rebuild Schemas
+# -----------------------------
+LoginRequest.model_rebuild()
+TokenData.model_rebuild()
+LoginResponse.model_rebuild()
+CurrentUserResponse.model_rebuild()
@@ -0,0 +1,143 @@
+# api/v1/schemas/faces.py
+from pydantic import BaseModel, Field
+from core.schemas import SuccessResponse, ErrorResponse
+
+MAX_ENROLL_EMBEDDINGS = 10
+MAX_SEARCH_PROBES = 64
+MAX_SEARCH_K = 20
+
+# -----------------------------
+# Request Schemas
+# -----------------------------
+class FaceEnrollRequest(BaseModel):
+    """Schema cho request đăng ký embedding khuôn mặt"""
+    user_id: str = Field(..., pattern=r"^[0-9a-fA-F]{24}$", example="68d8106764888819afe47f30")
+    embeddings: list[list[float]] = Field(..., min_length=1, max_length=MAX_ENROLL_EMBEDDINGS)
+
+class FaceSearchRequest(BaseModel):
+    """Schema cho request tìm user theo embedding"""
+    embeddings: list[list[float]] = Field(..., min_length=1, max_length=MAX_SEARCH_PROBES)
+    k: int = Field(1, ge=1, le=MAX_SEARCH_K)
+    threshold: float | None = Field(None, ge=-1, le=1, example=0.5)
+
+# -----------------------------
+# Data Schemas
+# -----------------------------
+class FaceEnrollData(BaseModel):
+    """Embedding đã đăng ký"""
+    user_id: str
+    embedding_ids: list[str]
+
+class FaceMatchData(BaseModel):
+    """User khớp với một probe"""
+    user_id: str
+    score: float
+
+class FaceRemoveData(BaseModel):
+    """Số embedding đã xóa"""
+    user_id: str
+    deleted: int
+
+class FaceIndexMetrics(BaseModel):
+    """Số liệu face index"""
+    embeddings: int
+    users: int
+    capacity: int
+    dim: int
+    matrix_bytes: int
+    base_embeddings: int
+    base_removed: int
+    delta_embeddings: int
+
+# -----------------------------
+# Response Schemas
+# -----------------------------
+class FaceEnrollResponse(SuccessResponse[FaceEnrollData]):
+    """Response cho đăng ký embedding"""
+    pass
+
+class FaceSearchResponse(SuccessResponse[list[list[FaceMatchData]]]):
+    """Response cho tìm kiếm: danh sách match theo thứ tự probe"""
+    pass
+
+class FaceRemoveResponse(SuccessResponse[FaceRemoveData]):
+    """Response cho xóa embedding"""
+    pass
+
+class FaceIndexMetricsResponse(SuccessResponse[FaceIndexMetrics]):
+    """Response cho số liệu face index"""
+    pass
+
+# -----------------------------
+# Response Examples
+# -----------------------------
+class FaceResponseExamples:
+    """Response examples cho faces"""
+
+    ERROR_400 = {
+        "model": ErrorResponse,
+        "description": "Invalid embeddings",
+        "content": {
+            "application/json": {
+                "example": {
+                    "success": False,
+                    "message": "Invalid embedding dimension",
+                    "error": {
+                        "code": "FACE_EMBEDDING_DIM_INVALID",
+                        "details": "Every embedding must have 512 values"
+                    },
+                    "timestamp": "2024-01-01T00:00:00Z"
+                }
+            }
+        }
+    }
+
+    ERROR_404 = {
+        "model": ErrorResponse,
+        "description": "User not found",
+        "content": {
+            "application/json": {
+                "example": {
+                    "success": False,
+                    "message": "User not found",
+                    "error": {
+                        "code": "USER_NOT_FOUND",
+                        "details": "User with id 68d8106764888819afe47f30 was not found"
+                    },
+                    "timestamp": "2024-01-01T00:00:00Z"
+                }
+            }
+        }
+    }
+
+    ERROR_409 = {
+        "model": ErrorResponse,
+        "description": "Too many embeddings for this user",
+        "content": {
+            "application/json": {
+                "example": {
+                    "success": False,
+                    "message": "Embedding limit reached",
+                    "error": {
+                        "code": "FACE_EMBEDDING_LIMIT",
+                        "details": "User 68d8106764888819afe47f30 cannot have more than 5 embeddings"
+                    },
+                    "timestamp": "2024-01-01T00:00:00Z"
+                }
+            }
+        }
+    }
+
+# -----------------------------
+# Rebuild Schemas
+# -----------------------------
+FaceEnrollRequest.model_rebuild()
+FaceSearchRequest.model_rebuild()
+FaceEnrollData.model_rebuild()
+FaceMatchData.model_rebuild()
+FaceRemoveData.model_rebuild()
+FaceIndexMetrics.model_rebuild()
+FaceEnrollResponse.model_rebuild()
+FaceSearchResponse.model_rebuild()
+FaceRemoveResponse.model_rebuild()
+FaceIndexMetricsResponse.model_rebuild()
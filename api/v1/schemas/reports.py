@@ -0,0 +1,208 @@
+# api/v1/schemas/reports.py
+from datetime import date, datetime
+from pydantic import BaseModel, Field
+from modules.reports.common.report import ReportFormat, ReportStatus, ReportType
+from core.schemas import SuccessResponse, ErrorResponse
+
+MAX_REPORT_RANGE_DAYS = 92
+MAX_REPORT_USERS = 10_000
+
+# -----------------------------
+# Request Schemas
+# -----------------------------
+class ReportJobCreate(BaseModel):
+    """Schema cho request tạo báo cáo chấm công"""
+    start_day: date = Field(..., example="2024-01-01")
+    end_day: date = Field(..., example="2024-01-31")
+    user_ids: list[str] | None = Field(
+        None,
+        max_length=MAX_REPORT_USERS,
+        example=["68d8106764888819afe47f30"],
+    )
+    format: ReportFormat = Field(ReportFormat.CSV, example="xlsx")
+
+# -----------------------------
+# Data Schemas
+# -----------------------------
+class ReportJobData(BaseModel):
+    """Report job trong response"""
+    id: str
+    report_type: ReportType
+    start_day: date
+    end_day: date
+    format: ReportFormat
+    status: ReportStatus
+    progress: float
+    processed_users: int
+    total_users: int
+    rows: int
+    error: str | None
+    created_at: datetime
+    started_at: datetime | None
+    finished_at: datetime | None
+    download_url: str | None
+
+class DailySummaryData(BaseModel):
+    """Tổng hợp chấm công của một ngày"""
+    day: date
+    present_users: int
+    checkins: int
+    late_users: int
+    early_leave_users: int
+    avg_worked_hours: float
+
+# -----------------------------
+# Response Schemas
+# -----------------------------
+class ReportJobResponse(SuccessResponse[ReportJobData]):
+    """Response cho report job"""
+    pass
+
+class DailySummaryResponse(SuccessResponse[list[DailySummaryData]]):
+    """Response cho tổng hợp chấm công theo ngày"""
+    pass
+
+# -----------------------------
+# Response Examples
+# -----------------------------
+class ReportJobResponseExamples:
+    """Response examples cho report job"""
+
+    SUCCESS_202 = {
+        "description": "Report job submitted",
+        "content": {
+            "application/json": {
+                "example": {
+                    "success": True,
+                    "message": "Report job submitted",
+                    "data": {
+                        "id": "68d8106764888819afe47f40",
+                        "report_type": "monthly_attendance",
+                        "start_day": "2024-01-01",
+                        "end_day": "2024-01-31",
+                        "format": "csv",
+                        "status": "pending",
+                        "progress": 0.0,
+                        "processed_users": 0,
+                        "total_users": 0,
+                        "rows": 0,
+                        "error": None,
+                        "created_at": "2024-01-01T00:00:00Z",
+                        "started_at": None,
+                        "finished_at": None,
+                        "download_url": None
+                    },
+                    "timestamp": "2024-01-01T00:00:00Z"
+                }
+            }
+        }
+    }
+
+    ERROR_400 = {
+        "model": ErrorResponse,
+        "description": "Invalid report parameters",
+        "content": {
+            "application/json": {
+                "example": {
+                    "success": False,
+                    "message": "Invalid report period",
+                    "error": {
+                        "code": "REPORT_RANGE_INVALID",
+                        "details": "end_day must not be before start_day and the period must not exceed 92 days"
+                    },
+                    "timestamp": "2024-01-01T00:00:00Z"
+                }
+            }
+        }
+    }
+
+    ERROR_404 = {
+        "model": ErrorResponse,
+        "description": "Report job not found",
+        "content": {
+            "application/json": {
+                "example": {
+                    "success": False,
+                    "message": "Report job not found",
+                    "error": {
+                        "code": "REPORT_NOT_FOUND",
+                        "details": "Report job 68d8106764888819afe47f40 was not found"
+                    },
+                    "timestamp": "2024-01-01T00:00:00Z"
+                }
+            }
+        }
+    }
+
+    ERROR_409 = {
+        "model": ErrorResponse,
+        "description": "Report is not ready",
+        "content": {
+            "application/json": {
+                "example": {
+                    "success": False,
+                    "message": "Report is not ready",
+                    "error": {
+                        "code": "REPORT_NOT_READY",
+                        "details": "Report job 68d8106764888819afe47f40 is running"
+                    },
+                    "timestamp": "2024-01-01T00:00:00Z"
+                }
+            }
+        }
+    }
+
+    ERROR_503 = {
+        "model": ErrorResponse,
+        "description": "Report queue is full",
+        "content": {
+            "application/json": {
+                "example": {
+                    "success": False,
+                    "message": "Report queue is full",
+                    "error": {
+                        "code": "REPORT_QUEUE_FULL",
+                        "details": "Too many pending reports. Please retry later."
+                    },
+                    "timestamp": "2024-01-01T00:00:00Z"
+                }
+            }
+        }
+    }
+
+class DailySummaryResponseExamples:
+    """Response examples cho tổng hợp theo ngày"""
+
+    SUCCESS_200 = {
+        "description": "Daily summary retrieved successfully",
+        "content": {
+            "application/json": {
+                "example": {
+                    "success": True,
+                    "message": "Daily summary retrieved successfully",
+                    "data": [
+                        {
+                            "day": "2024-01-02",
+                            "present_users": 120,
+                            "checkins": 251,
+                            "late_users": 7,
+                            "early_leave_users": 3,
+                            "avg_worked_hours": 8.62
+                        }
+                    ],
+                    "timestamp": "2024-01-01T00:00:00Z"
+                }
+            }
+        }
+    }
+
+    ERROR_400 = ReportJobResponseExamples.ERROR_400
+
+# -----------------------------
+# Rebuild Schemas
+# -----------------------------
+ReportJobCreate.model_rebuild()
+ReportJobData.model_rebuild()
+ReportJobResponse.model_rebuild()
+DailySummaryData.model_rebuild()
+DailySummaryResponse.model_rebuild()
@@ -1,7 +1,8 @@
 # api/v1/schemas/users.py
 from pydantic import BaseModel, EmailStr, Field
-from modules.users.common.user import UserRole
-from core.schemas import SuccessResponse, ErrorResponse
+from modules.users.common.user import UserImportStatus, UserRole
+from modules.users.models.user import User, UserView
+from core.schemas import SuccessResponse, CursorPageResponse, ErrorResponse
 
 # -----------------------------
 # Request Schemas
@@ -26,6 +27,20 @@ class UserData(BaseModel):
     is_active: bool
     role: UserRole
 
+
+def to_user_data(user: User | UserView) -> UserData:
+    """Chuyển đổi user thành UserData (dữ liệu từ DB đã hợp lệ nên bỏ qua validate)"""
+    return UserData.model_construct(
+        id=str(user.id),
+        name=user.name,
+        phone=user.phone,
+        username=user.username,
+        email=user.email,
+        position=user.position,
+        is_active=user.is_active,
+        role=user.role,
+    )
+
 # -----------------------------
 # Create Response Schemas
 # -----------------------------
@@ -125,7 +140,7 @@ class UserCreateResponseExamples:
 # -----------------------------
 # List Response Schemas
 # -----------------------------
-class UserListResponse(SuccessResponse[list[UserData]]):
+class UserListResponse(CursorPageResponse[list[UserData]]):
     """Response cho danh sách user"""
     pass
 
@@ -154,6 +169,25 @@ class UserListResponseExamples:
                             "role": "user"
                         }
                     ],
+                    "next_cursor": "aNgQZ2SIiBmv5H8w",
+                    "timestamp": "2024-01-01T00:00:00Z"
+                }
+            }
+        }
+    }
+
+    ERROR_400 = {
+        "model": ErrorResponse,
+        "description": "Invalid pagination cursor",
+        "content": {
+            "application/json": {
+                "example": {
+                    "success": False,
+                    "message": "Invalid pagination cursor",
+                    "error": {
+                        "code": "INVALID_CURSOR",
+                        "details": "Cursor abc is malformed or has been tampered with"
+                    },
                     "timestamp": "2024-01-01T00:00:00Z"
                 }
             }
@@ -178,6 +212,62 @@ class UserListResponseExamples:
         }
     }
 
+# -----------------------------
+# Search Response Schemas
+# -----------------------------
+class UserSearchResponse(SuccessResponse[list[UserData]]):
+    """Response cho tìm kiếm user"""
+    pass
+
+# -----------------------------
+# Search Response Examples
+# -----------------------------
+class UserSearchResponseExamples:
+    """Response examples cho tìm kiếm user"""
+
+    SUCCESS_200 = {
+        "description": "Users found",
+        "content": {
+            "application/json": {
+                "example": {
+                    "success": True,
+                    "message": "Users found",
+                    "data": [
+                        {
+                            "id": "68d8106764888819afe47f30",
+                            "name": "Nguyễn Ngọc Quyết",
+                            "phone": "0123456789",
+                            "username": "quyetnn",
+                            "email": "quyetnn@edulive.net",
+                            "position": "Dev IT",
+                            "is_active": True,
+                            "role": "user"
+                        }
+                    ],
+                    "timestamp": "2024-01-01T00:00:00Z"
+                }
+            }
+        }
+    }
+
+    ERROR_400 = {
+        "model": ErrorResponse,
+        "description": "Search query has no searchable characters",
+        "content": {
+            "application/json": {
+                "example": {
+                    "success": False,
+                    "message": "Invalid search query",
+                    "error": {
+                        "code": "USER_SEARCH_QUERY_INVALID",
+                        "details": "Query must contain at least one letter or digit"
+                    },
+                    "timestamp": "2024-01-01T00:00:00Z"
+                }
+            }
+        }
+    }
+
 # -----------------------------
 # Delete Response Schemas
 # -----------------------------
@@ -240,6 +330,101 @@ class UserDeleteResponseExamples:
         }
     }
 
+# -----------------------------
+# Import Schemas
+# -----------------------------
+class UserImportRowResult(BaseModel):
+    """Kết quả import của một dòng"""
+    row: int
+    phone: str | None = None
+    status: UserImportStatus
+    data: UserData | None = None
+    error: str | None = None
+
+class UserImportReport(BaseModel):
+    """Báo cáo tổng hợp một lần import"""
+    total: int
+    created: int
+    duplicate: int
+    conflict: int
+    invalid: int
+    results: list[UserImportRowResult]
+
+class UserImportResponse(SuccessResponse[UserImportReport]):
+    """Response cho bulk create/import user"""
+    pass
+
+# -----------------------------
+# Import Response Examples
+# -----------------------------
+class UserImportResponseExamples:
+    """Response examples cho bulk create/import user"""
+
+    SUCCESS_200 = {
+        "description": "Users imported",
+        "content": {
+            "application/json": {
+                "example": {
+                    "success": True,
+                    "message": "Users imported",
+                    "data": {
+                        "total": 2,
+                        "created": 1,
+                        "duplicate": 1,
+                        "conflict": 0,
+                        "invalid": 0,
+                        "results": [
+                            {
+                                "row": 1,
+                                "phone": "0123456789",
+                                "status": "created",
+                                "data": {
+                                    "id": "68d8106764888819afe47f30",
+                                    "name": "Nguyễn Ngọc Quyết",
+                                    "phone": "0123456789",
+                                    "username": "quyetnn",
+                                    "email": "quyetnn@edulive.net",
+                                    "position": "Dev IT",
+                                    "is_active": True,
+                                    "role": "user"
+                                },
+                                "error": None
+                            },
+                            {
+                                "row": 2,
+                                "phone": "0123456788",
+                                "status": "duplicate",
+                                "data": None,
+                                "error": "Phone number 0123456788 is already registered"
+                            }
+                        ]
+                    },
+                    "timestamp": "2024-01-01T00:00:00Z"
+                }
+            }
+        }
+    }
+
+    ERROR_400 = {
+        "model": ErrorResponse,
+        "description": "Import payload is empty, too large or malformed",
+        "content": {
+            "application/json": {
+                "example": {
+                    "success": False,
+                    "message": "Import payload is too large",
+                    "error": {
+                        "code": "USER_IMPORT_TOO_LARGE",
+                        "details": "At most 10000 rows can be imported per request"
+                    },
+                    "timestamp": "2024-01-01T00:00:00Z"
+                }
+            }
+        }
+    }
+
+    ERROR_422 = UserCreateResponseExamples.ERROR_422
+
 # -----------------------------
 # Rebuild Schemas
 # -----------------------------
@@ -248,3 +433,6 @@ UserData.model_rebuild()
 UserCreateResponse.model_rebuild()
 UserListResponse.model_rebuild()
 UserDeleteResponse.model_rebuild()
+UserImportRowResult.model_rebuild()
+UserImportReport.model_rebuild()
+UserImportResponse.model_rebuild()
@@ -0,0 +1,81 @@
+"""
+Benchmark: FaceIndex (modules/faces/services/face_index.py) ở 10k/100k identity,
+so với tìm kiếm từng probe một và kiểm tra kết quả với argsort đầy đủ.
+
+    python -m benchmarks.bench_face_index --identities 10000 100000 --dim 512
+"""
+import argparse
+import time
+
+import numpy as np
+
+from modules.faces.services.face_index import FaceIndex, normalize_rows
+
+
+def generate_embeddings(count: int, dim: int, seed: int = 42) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return normalize_rows(rng.standard_normal((count, dim), dtype=np.float32))
+
+
+def generate_probes(gallery: np.ndarray, count: int, noise: float = 0.3, seed: int = 7):
+    """Probe = embedding trong gallery cộng nhiễu, kèm id đúng của probe."""
+    rng = np.random.default_rng(seed)
+    truth = rng.integers(0, gallery.shape[0], size=count)
+    probes = gallery[truth] + noise * rng.standard_normal((count, gallery.shape[1]), dtype=np.float32) / np.sqrt(gallery.shape[1])
+    return normalize_rows(probes), truth
+
+
+def timed(fn, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def run(identities: int, dim: int, batch: int, k: int) -> None:
+    gallery = generate_embeddings(identities, dim)
+    probes, truth = generate_probes(gallery, batch)
+    ids = list(range(identities))
+
+    index = FaceIndex(dim=dim, initial_capacity=1024)
+    started = time.perf_counter()
+    for start in range(0, identities, 1000):
+        index.add(ids[start:start + 1000], ids[start:start + 1000], gallery[start:start + 1000])
+    add_seconds = time.perf_counter() - started
+
+    results = index.search(probes, k=k)
+    expected = np.argsort(-(probes @ gallery.T), axis=1)[:, :k]
+    assert [[match.embedding_id for match in row] for row in results] == expected.tolist(), \
+        "index result differs from full argsort"
+    top1 = np.mean([row[0].user_id == expected_id for row, expected_id in zip(results, truth.tolist())])
+
+    batch_seconds = timed(lambda: index.search(probes, k=k))
+    single_seconds = timed(lambda: [index.search(probe, k=k) for probe in probes], repeat=3)
+
+    started = time.perf_counter()
+    index.remove(ids[: identities // 10])
+    remove_seconds = time.perf_counter() - started
+
+    print(f"{identities} identities x {dim} dims ({gallery.nbytes / 2**20:.0f} MiB), top-{k}, top-1 accuracy {top1:.2%}")
+    print(f"  add (batches of 1000):      {add_seconds * 1000:9.1f} ms")
+    print(f"  search {batch} probes (batch):  {batch_seconds * 1000:9.1f} ms  ({batch_seconds / batch * 1e6:.0f} us/probe)")
+    print(f"  search {batch} probes (loop):   {single_seconds * 1000:9.1f} ms  ({single_seconds / batch * 1e6:.0f} us/probe)")
+    print(f"  remove {identities // 10} (swap-delete):  {remove_seconds * 1000:9.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--identities", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--dim", type=int, default=512)
+    parser.add_argument("--batch", type=int, default=32)
+    parser.add_argument("-k", type=int, default=5)
+    args = parser.parse_args()
+
+    for identities in args.identities:
+        run(identities, args.dim, args.batch, args.k)
+
+
+if __name__ == "__main__":
+    main()
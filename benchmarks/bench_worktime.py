@@ -0,0 +1,117 @@
+"""
+Benchmark: engine vectorized (modules/reports/services/worktime.py) so với bản
+tham chiếu vòng lặp Python trên từng check-in.
+
+    python -m benchmarks.bench_worktime --users 5000 --days 31
+    python -m benchmarks.bench_worktime --timezone Europe/Berlin --start-day 2024-03-20
+"""
+import argparse
+import time
+from datetime import date, datetime, time as dtime, timedelta
+
+import numpy as np
+
+from modules.reports.services.worktime import (
+    WorkSchedule,
+    compute_daily_metrics,
+    compute_daily_presence,
+)
+from utils.time import get_timezone, local_day_starts
+
+TIMEZONE = "Asia/Ho_Chi_Minh"
+SCHEDULE = WorkSchedule(start=dtime(8, 0), end=dtime(17, 0), late_grace_minutes=5)
+
+
+def generate_checkins(users: int, days: int, start_day: date, tz_name: str = TIMEZONE, seed: int = 42):
+    """Sinh 0-4 check-in mỗi user/ngày quanh giờ vào/ra ca."""
+    rng = np.random.default_rng(seed)
+    day_starts = local_day_starts(start_day, start_day + timedelta(days=days - 1), get_timezone(tz_name))
+
+    per_cell = rng.integers(0, 5, size=users * days)
+    cell = np.repeat(np.arange(users * days), per_cell)
+    user_index = cell // days
+    day_index = cell % days
+    offsets = rng.normal(12.5 * 3600, 4 * 3600, size=cell.size).clip(0, 86399).astype(np.int64)
+    timestamps = day_starts[day_index] + offsets
+
+    order = rng.permutation(cell.size)
+    return user_index[order], timestamps[order]
+
+
+def naive_metrics(user_index, timestamps, start_day: date, days: int, tz_name: str = TIMEZONE):
+    """Bản tham chiếu: datetime + dict, từng check-in một."""
+    tz = get_timezone(tz_name)
+    cells = {}
+    for user, ts in zip(user_index.tolist(), timestamps.tolist()):
+        local = datetime.fromtimestamp(ts, tz)
+        day_offset = (local.date() - start_day).days
+        if not 0 <= day_offset < days:
+            continue
+        key = (user, day_offset)
+        first, last, count = cells.get(key, (ts, ts, 0))
+        cells[key] = (min(first, ts), max(last, ts), count + 1)
+
+    result = {}
+    for (user, day_offset), (first, last, count) in cells.items():
+        day = start_day + timedelta(days=day_offset)
+        shift_start = datetime.combine(day, SCHEDULE.start, tzinfo=tz).timestamp() + SCHEDULE.late_grace_minutes * 60
+        shift_end = datetime.combine(day, SCHEDULE.end, tzinfo=tz).timestamp()
+        worked = last - first if count >= 2 else 0
+        late = max(first - shift_start, 0)
+        early = max(shift_end - last, 0) if count >= 2 else 0
+        result[(user, day_offset)] = (first, last, count, int(worked), int(late), int(early))
+    return result
+
+
+def vectorized_metrics(user_index, timestamps, start_day: date, days: int, tz_name: str = TIMEZONE):
+    end_day = start_day + timedelta(days=days - 1)
+    tz = get_timezone(tz_name)
+    day_starts = local_day_starts(start_day, end_day, tz)
+    presence = compute_daily_presence(user_index, timestamps, day_starts)
+    metrics = compute_daily_metrics(presence, SCHEDULE.shift_bounds(start_day, end_day, tz), SCHEDULE)
+    return presence, metrics
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--days", type=int, default=31)
+    parser.add_argument("--timezone", default=TIMEZONE)
+    parser.add_argument("--start-day", type=date.fromisoformat, default=date(2024, 1, 1))
+    args = parser.parse_args()
+
+    start_day = args.start_day
+    user_index, timestamps = generate_checkins(args.users, args.days, start_day, args.timezone)
+    print(f"{args.users} users x {args.days} days, {timestamps.size} check-ins")
+
+    started = time.perf_counter()
+    expected = naive_metrics(user_index, timestamps, start_day, args.days, args.timezone)
+    naive_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    presence, metrics = vectorized_metrics(user_index, timestamps, start_day, args.days, args.timezone)
+    vectorized_seconds = time.perf_counter() - started
+
+    actual = {
+        (user, day): row
+        for user, day, *row in zip(
+            presence.user_index.tolist(),
+            presence.day_index.tolist(),
+            presence.first_in.tolist(),
+            presence.last_out.tolist(),
+            presence.checkins.tolist(),
+            metrics.worked_seconds.tolist(),
+            metrics.late_seconds.tolist(),
+            metrics.early_leave_seconds.tolist(),
+        )
+    }
+    actual = {key: tuple(value) for key, value in actual.items()}
+    assert actual == expected, "vectorized result differs from naive reference"
+
+    print(f"naive:      {naive_seconds * 1000:9.1f} ms")
+    print(f"vectorized: {vectorized_seconds * 1000:9.1f} ms")
+    print(f"speedup:    {naive_seconds / vectorized_seconds:9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,23 @@
+from datetime import time
 from pydantic_settings import BaseSettings
 from pydantic import Field
 from urllib.parse import quote_plus
 
+# Secret mẫu cho môi trường dev; bị từ chối khi DEBUG=False
+DEFAULT_JWT_SECRET_KEY = "change-me-to-a-long-random-secret-key"
+
 class Settings(BaseSettings):
     # App
     APP_NAME: str = "FastAPI App"
     DEBUG: bool = True
     API_PREFIX: str = "/api/v1"
     CORS_ORIGINS: list[str] = ["http://localhost:3000"]
+    TIMEZONE: str = "Asia/Ho_Chi_Minh"  # múi giờ dùng để chia ngày chấm công
+
+    # Ca làm việc chuẩn (giờ local) để tính đi muộn/về sớm
+    WORK_START_TIME: time = Field(default=time(8, 0))
+    WORK_END_TIME: time = Field(default=time(17, 0))
+    LATE_GRACE_MINUTES: int = Field(default=0)
 
     # Mongo (từ .env)
     MONGO_HOST: str = Field(default="localhost")
@@ -17,6 +27,95 @@ class Settings(BaseSettings):
     MONGO_PASSWORD: str = Field(default="")
     MONGO_AUTH_SOURCE: str = Field(default="admin")  # đổi nếu bạn tạo user ở DB khác
 
+    # Mongo client: mỗi worker có pool riêng, tổng connection = số worker x MONGO_MAX_POOL_SIZE
+    MONGO_MAX_POOL_SIZE: int = Field(default=100)
+    MONGO_MIN_POOL_SIZE: int = Field(default=0)
+    MONGO_MAX_IDLE_TIME_MS: int | None = Field(default=None)  # None = không đóng connection rảnh
+    MONGO_WAIT_QUEUE_TIMEOUT_MS: int | None = Field(default=None)  # chờ connection tối đa khi pool cạn
+    MONGO_SERVER_SELECTION_TIMEOUT_MS: int = Field(default=30_000)
+    MONGO_CONNECT_TIMEOUT_MS: int = Field(default=20_000)
+    MONGO_SOCKET_TIMEOUT_MS: int | None = Field(default=None)
+    MONGO_COMPRESSORS: list[str] = Field(default_factory=list)  # vd ["zstd", "snappy", "zlib"]; zstd/snappy cần cài thư viện
+    MONGO_READ_PREFERENCE: str = Field(default="primary")  # mặc định cho mọi truy vấn
+    # Truy vấn nặng chỉ đọc (list, export, report) có thể đọc từ secondary; ghi luôn vào primary
+    MONGO_ANALYTICS_READ_PREFERENCE: str = Field(default="primary")  # vd "secondaryPreferred"
+    MONGO_ANALYTICS_MAX_STALENESS_SECONDS: int = Field(default=-1)  # -1 = không giới hạn, tối thiểu 90
+
+    # User cache (in-process, theo từng worker)
+    USER_CACHE_MAX_SIZE: int = Field(default=10_000)
+    USER_CACHE_TTL_SECONDS: float = Field(default=60.0)
+
+    # Password hashing (argon2id); đổi tham số sẽ hash lại khi user đăng nhập
+    DEFAULT_PASSWORD: str = Field(default="123456")
+    PASSWORD_HASH_TIME_COST: int = Field(default=3)
+    PASSWORD_HASH_MEMORY_COST: int = Field(default=65_536)  # KiB
+    PASSWORD_HASH_PARALLELISM: int = Field(default=1)
+    PASSWORD_HASH_WORKERS: int = Field(default=2)
+    PASSWORD_HASH_MAX_PENDING: int = Field(default=64)  # số thao tác hash/verify chờ tối đa
+    PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS: float = Field(default=2.0)
+
+    # JWT; RS*/ES* đọc key PEM từ file, HS* dùng JWT_SECRET_KEY
+    JWT_ALGORITHM: str = Field(default="HS256")
+    JWT_SECRET_KEY: str = Field(default=DEFAULT_JWT_SECRET_KEY)  # >= 32 ký tự khi DEBUG=False
+    JWT_PRIVATE_KEY_FILE: str | None = Field(default=None)
+    JWT_PUBLIC_KEY_FILE: str | None = Field(default=None)
+    JWT_ISSUER: str = Field(default="fastapi-app")
+    JWT_ACCESS_TOKEN_EXPIRE_MINUTES: int = Field(default=60)
+    JWT_LEEWAY_SECONDS: int = Field(default=10)
+    TOKEN_CACHE_MAX_SIZE: int = Field(default=10_000)
+    TOKEN_CACHE_TTL_SECONDS: float = Field(default=60.0)
+
+    # Logging: ghi qua queue + thread nền; text màu khi DEBUG, JSON khi không
+    LOG_LEVEL: str = Field(default="INFO")  # dùng khi DEBUG=False
+    LOG_QUEUE_SIZE: int = Field(default=10_000)  # queue đầy thì bỏ record thay vì chặn
+    LOG_RATE_LIMIT_BURST: int = Field(default=100)
+    # Chỉ logger có tên ở đây bị giới hạn (record/giây cho mỗi dòng code gọi log);
+    # uvicorn.access và FastAPI.requests (slow_request...) mặc định không giới hạn
+    LOG_RATE_LIMITS: dict[str, float] = Field(default_factory=lambda: {"FastAPI": 20.0, "uvicorn.error": 20.0})
+
+    # Log request chậm và profile theo yêu cầu
+    SLOW_REQUEST_THRESHOLD_MS: float = Field(default=500.0)
+    PROFILE_HEADER: str = Field(default="X-Profile")
+    PROFILE_TOKEN: str | None = Field(default=None)  # header khớp token thì profile request; None = tắt
+    PROFILE_SAMPLE_RATE: float = Field(default=0.0)  # tỷ lệ request được profile ngẫu nhiên (0-1)
+    PROFILE_DIR: str = Field(default="storage/profiles")
+
+    # Health check (readiness probe)
+    HEALTH_PING_TIMEOUT_SECONDS: float = Field(default=1.0)
+    HEALTH_CACHE_SECONDS: float = Field(default=2.0)  # probe trong khoảng này dùng lại kết quả
+    HEALTH_MAX_LOOP_LAG_MS: float = Field(default=500.0)  # lag lớn hơn thì báo not ready
+    HEALTH_LOOP_LAG_INTERVAL_SECONDS: float = Field(default=0.5)
+
+    # Attendance write buffer
+    ATTENDANCE_BUFFER_MAX_SIZE: int = Field(default=50_000)
+    ATTENDANCE_FLUSH_BATCH_SIZE: int = Field(default=1_000)
+    ATTENDANCE_FLUSH_INTERVAL_SECONDS: float = Field(default=1.0)
+    ATTENDANCE_ENQUEUE_TIMEOUT_SECONDS: float = Field(default=0.5)
+    ATTENDANCE_FLUSH_MAX_RETRIES: int = Field(default=3)
+
+    # Report jobs
+    REPORT_WORKERS: int = Field(default=2)
+    REPORT_QUEUE_SIZE: int = Field(default=100)
+    REPORT_CHUNK_USERS: int = Field(default=200)
+    REPORT_OUTPUT_DIR: str = Field(default="storage/reports")
+    REPORT_STALE_SECONDS: int = Field(default=600)  # job running không heartbeat quá lâu sẽ được chạy lại
+    REPORT_RETENTION_HOURS: float = Field(default=72.0)  # job xong quá thời gian này bị xóa cùng file
+    REPORT_CLEANUP_INTERVAL_SECONDS: float = Field(default=3600.0)
+    REPORT_SUMMARY_CACHE_MAX_SIZE: int = Field(default=256)
+    REPORT_SUMMARY_CACHE_TTL_SECONDS: float = Field(default=300.0)  # độ trễ tối đa giữa các worker
+
+    # Face embeddings
+    FACE_EMBEDDING_DIM: int = Field(default=512)
+    FACE_INDEX_INITIAL_CAPACITY: int = Field(default=1024)
+    FACE_MAX_EMBEDDINGS_PER_USER: int = Field(default=5)
+    FACE_MATCH_THRESHOLD: float = Field(default=0.5)  # cosine similarity tối thiểu để coi là khớp
+    FACE_SNAPSHOT_DIR: str = Field(default="storage/faces")
+    FACE_SNAPSHOT_MAX_AGE_SECONDS: int = Field(default=86_400)  # phải nhỏ hơn FACE_CHANGE_LOG_TTL_SECONDS
+    FACE_SNAPSHOT_MAX_DELTA: int = Field(default=10_000)  # số thay đổi tối đa trước khi dựng lại snapshot
+    FACE_CHANGE_LOG_TTL_SECONDS: int = Field(default=7 * 86_400)
+    FACE_DELTA_POLL_SECONDS: float = Field(default=5.0)
+    FACE_DELTA_OVERLAP_SECONDS: float = Field(default=30.0)  # đọc chồng lên để không sót thay đổi ghi trễ
+
     @property
     def MONGO_URI(self) -> str:
         if self.MONGO_USER and self.MONGO_PASSWORD:
@@ -29,6 +128,23 @@ class Settings(BaseSettings):
         # no auth
         return f"mongodb://{self.MONGO_HOST}:{self.MONGO_PORT}/{self.MONGO_DB}"
 
+    @property
+    def MONGO_CLIENT_OPTIONS(self) -> dict:
+        """Tham số pool/timeout/nén/read preference cho AsyncIOMotorClient."""
+        options = {
+            "maxPoolSize": self.MONGO_MAX_POOL_SIZE,
+            "minPoolSize": self.MONGO_MIN_POOL_SIZE,
+            "maxIdleTimeMS": self.MONGO_MAX_IDLE_TIME_MS,
+            "waitQueueTimeoutMS": self.MONGO_WAIT_QUEUE_TIMEOUT_MS,
+            "serverSelectionTimeoutMS": self.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+            "connectTimeoutMS": self.MONGO_CONNECT_TIMEOUT_MS,
+            "socketTimeoutMS": self.MONGO_SOCKET_TIMEOUT_MS,
+            "readPreference": self.MONGO_READ_PREFERENCE,
+        }
+        if self.MONGO_COMPRESSORS:
+            options["compressors"] = ",".join(self.MONGO_COMPRESSORS)
+        return {key: value for key, value in options.items() if value is not None}
+
     class Config:
         env_file = ".env"
 
@@ -1,25 +1,32 @@
 # core/exceptions.py
 from fastapi import Request, HTTPException
-from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
-from core.schemas import ErrorResponse
-from datetime import datetime, timezone
+from core.schemas import ErrorResponse, FastJSONResponse
 
 class CustomHTTPException(HTTPException):
-    def __init__(self, status_code: int, message: str, error_code: str = None, details: str = None):
-        error_response = ErrorResponse(
+    def __init__(
+        self,
+        status_code: int,
+        message: str,
+        error_code: str = None,
+        details: str = None,
+        headers: dict[str, str] | None = None,
+    ):
+        # Giữ nguyên model, chỉ serialize một lần khi handler render response
+        self.error_response = ErrorResponse(
             message=message,
             error={
                 "code": error_code or "UNKNOWN_ERROR",
                 "details": details or message
             }
         )
-        super().__init__(status_code=status_code, detail=error_response.model_dump(mode='json'))
+        super().__init__(status_code=status_code, detail=message, headers=headers)
 
 async def custom_http_exception_handler(request: Request, exc: CustomHTTPException):
-    return JSONResponse(
+    return FastJSONResponse(
         status_code=exc.status_code,
-        content=exc.detail
+        content=exc.error_response,
+        headers=exc.headers,
     )
 
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
@@ -30,9 +37,9 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
             "details": exc.errors()
         }
     )
-    return JSONResponse(
+    return FastJSONResponse(
         status_code=422,
-        content=error_response.model_dump(mode='json')
+        content=error_response
     )
 
 async def general_exception_handler(request: Request, exc: Exception):
@@ -43,7 +50,7 @@ async def general_exception_handler(request: Request, exc: Exception):
             "details": str(exc)
         }
     )
-    return JSONResponse(
+    return FastJSONResponse(
         status_code=500,
-        content=error_response.model_dump(mode='json')
+        content=error_response
     )
\ No newline at end of file
@@ -0,0 +1,269 @@
+# core/health.py
+import asyncio
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import monitoring
+
+from core.config import settings
+from core.logging import LOGGER
+from utils.singleflight import SingleFlight
+
+# -----------------------------
+# Connection Pool Stats
+# -----------------------------
+class ConnectionPoolStats(monitoring.ConnectionPoolListener):
+    """
+    ConnectionPoolListener của pymongo đếm connection và checkout của pool.
+
+    Callback chạy trên thread của driver nên chỉ cộng số dưới lock. Client có
+    một pool cho mỗi server (replica set/sharded) nên `open`, `checked_out` và
+    `waiting` được đếm riêng theo `event.address`; `waiting` là số checkout
+    đang chờ connection (pool cạn khi số này > 0 và mọi connection của chính
+    pool đó đều đang được dùng).
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        # "host:port" -> {"open", "checked_out", "waiting"}
+        self._pools: Dict[str, Dict[str, int]] = {}
+        self.checkouts = 0
+        self.checkout_failures = 0
+        self.checkout_seconds = 0.0
+        self.max_checkout_seconds = 0.0
+        self.pool_clears = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            pools = {address: dict(counts) for address, counts in self._pools.items()}
+            return {
+                "open": sum(counts["open"] for counts in pools.values()),
+                "checked_out": sum(counts["checked_out"] for counts in pools.values()),
+                "waiting": sum(counts["waiting"] for counts in pools.values()),
+                "checkouts": self.checkouts,
+                "checkout_failures": self.checkout_failures,
+                "avg_checkout_ms": self.checkout_seconds / self.checkouts * 1000 if self.checkouts else 0.0,
+                "max_checkout_ms": self.max_checkout_seconds * 1000,
+                "pool_clears": self.pool_clears,
+                "pools": pools,
+            }
+
+    def exhausted_pools(self, max_pool_size: int) -> List[str]:
+        """
+        Các pool đang cạn. Mỗi server có pool `max_pool_size` riêng nên xét từng
+        pool: cộng dồn sẽ báo cạn nhầm khi mỗi server chỉ dùng một phần.
+        """
+        with self._lock:
+            return sorted(
+                address
+                for address, counts in self._pools.items()
+                if counts["waiting"] > 0 and counts["checked_out"] >= max_pool_size
+            )
+
+    @staticmethod
+    def _key(address: Any) -> str:
+        return f"{address[0]}:{address[1]}" if isinstance(address, tuple) else str(address)
+
+    def _pool(self, address: Any) -> Dict[str, int]:
+        # Gọi khi đang giữ lock
+        key = self._key(address)
+        pool = self._pools.get(key)
+        if pool is None:
+            pool = self._pools[key] = {"open": 0, "checked_out": 0, "waiting": 0}
+        return pool
+
+    def connection_created(self, event: monitoring.ConnectionCreatedEvent) -> None:
+        with self._lock:
+            self._pool(event.address)["open"] += 1
+
+    def connection_closed(self, event: monitoring.ConnectionClosedEvent) -> None:
+        with self._lock:
+            self._pool(event.address)["open"] -= 1
+
+    def connection_check_out_started(self, event: monitoring.ConnectionCheckOutStartedEvent) -> None:
+        with self._lock:
+            self._pool(event.address)["waiting"] += 1
+
+    def connection_checked_out(self, event: monitoring.ConnectionCheckedOutEvent) -> None:
+        duration = event.duration or 0.0
+        with self._lock:
+            pool = self._pool(event.address)
+            pool["waiting"] -= 1
+            pool["checked_out"] += 1
+            self.checkouts += 1
+            self.checkout_seconds += duration
+            self.max_checkout_seconds = max(self.max_checkout_seconds, duration)
+
+    def connection_check_out_failed(self, event: monitoring.ConnectionCheckOutFailedEvent) -> None:
+        with self._lock:
+            self._pool(event.address)["waiting"] -= 1
+            self.checkout_failures += 1
+
+    def connection_checked_in(self, event: monitoring.ConnectionCheckedInEvent) -> None:
+        with self._lock:
+            self._pool(event.address)["checked_out"] -= 1
+
+    def pool_cleared(self, event: monitoring.PoolClearedEvent) -> None:
+        with self._lock:
+            self.pool_clears += 1
+
+    def pool_created(self, event: monitoring.PoolCreatedEvent) -> None:
+        pass
+
+    def pool_ready(self, event: monitoring.PoolReadyEvent) -> None:
+        pass
+
+    def pool_closed(self, event: monitoring.PoolClosedEvent) -> None:
+        # Server bị bỏ khỏi topology: bỏ luôn bộ đếm nếu không còn connection
+        with self._lock:
+            if not any(self._pool(event.address).values()):
+                del self._pools[self._key(event.address)]
+
+    def connection_ready(self, event: monitoring.ConnectionReadyEvent) -> None:
+        pass
+
+# -----------------------------
+# Event Loop Lag
+# -----------------------------
+class EventLoopLagMonitor:
+    """
+    Đo độ trễ của event loop: task ngủ `interval` giây, phần thức dậy trễ hơn
+    dự kiến là thời gian loop bị chặn (code sync, GC...).
+    """
+
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self.lag_seconds = 0.0
+        self.max_lag_seconds = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="event-loop-lag-monitor")
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    def snapshot(self) -> Dict[str, float]:
+        return {
+            "lag_ms": self.lag_seconds * 1000,
+            "max_lag_ms": self.max_lag_seconds * 1000,
+        }
+
+    async def _run(self) -> None:
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.lag_seconds = max(0.0, time.perf_counter() - started - self.interval)
+            self.max_lag_seconds = max(self.max_lag_seconds, self.lag_seconds)
+
+
+pool_stats = ConnectionPoolStats()
+loop_lag = EventLoopLagMonitor(settings.HEALTH_LOOP_LAG_INTERVAL_SECONDS)
+
+# Kết quả readiness gần nhất: (thời điểm kiểm tra, kết quả)
+_last_readiness: Optional[tuple] = None
+_readiness_flight: SingleFlight[str, Dict[str, Any]] = SingleFlight()
+
+# -----------------------------
+# Readiness
+# -----------------------------
+def create_ping_client() -> AsyncIOMotorClient:
+    """
+    Client riêng cho readiness ping (1 connection, không gắn pool_stats).
+
+    Timeout đặt phía driver bằng HEALTH_PING_TIMEOUT_SECONDS: Motor chạy lệnh
+    trong thread pool nên hủy coroutine bằng `wait_for` không dừng được lệnh
+    đang treo, thread chỉ được trả lại khi driver tự hết thời gian chờ.
+    """
+    timeout_ms = max(1, int(settings.HEALTH_PING_TIMEOUT_SECONDS * 1000))
+    return AsyncIOMotorClient(
+        settings.MONGO_URI,
+        **{
+            **settings.MONGO_CLIENT_OPTIONS,
+            "maxPoolSize": 1,
+            "minPoolSize": 0,
+            "waitQueueTimeoutMS": timeout_ms,
+            "serverSelectionTimeoutMS": timeout_ms,
+            "connectTimeoutMS": timeout_ms,
+            "socketTimeoutMS": timeout_ms,
+        },
+    )
+
+
+async def check_readiness(client: Any, ping_client: Any) -> Dict[str, Any]:
+    """
+    Kiểm tra worker có nhận được traffic không: ping Mongo (timeout ngắn, qua
+    `ping_client`), pool của `client` còn connection và event loop không bị chặn.
+
+    Kết quả được cache HEALTH_CACHE_SECONDS và các probe đồng thời dùng chung
+    một lần ping, nên load balancer probe dày cũng không tạo thêm tải cho Mongo.
+    """
+    cached = _last_readiness
+    if cached is not None and time.monotonic() - cached[0] < settings.HEALTH_CACHE_SECONDS:
+        return cached[1]
+
+    result, _ = await _readiness_flight.do("ready", lambda: _run_checks(client, ping_client))
+    return result
+
+
+async def _run_checks(client: Any, ping_client: Any) -> Dict[str, Any]:
+    global _last_readiness
+
+    checks: Dict[str, Any] = {}
+    ready = True
+
+    mongo: Dict[str, Any] = {"ok": False}
+    if client is None or ping_client is None:
+        mongo["error"] = "Mongo client is not initialized"
+    else:
+        started = time.perf_counter()
+        try:
+            # Driver tự dừng sau HEALTH_PING_TIMEOUT_SECONDS (server selection,
+            # connect, đọc socket); wait_for chỉ là chốt chặn cuối
+            await asyncio.wait_for(
+                ping_client.admin.command("ping"),
+                timeout=settings.HEALTH_PING_TIMEOUT_SECONDS * 2,
+            )
+            mongo["ok"] = True
+        except asyncio.TimeoutError:
+            mongo["error"] = f"Ping timed out after {settings.HEALTH_PING_TIMEOUT_SECONDS * 2}s"
+        except Exception as exc:
+            mongo["error"] = str(exc)
+        mongo["latency_ms"] = (time.perf_counter() - started) * 1000
+    ready &= mongo["ok"]
+    checks["mongo"] = mongo
+
+    pool = pool_stats.snapshot()
+    max_pool_size = _max_pool_size(client)
+    pool["max_size"] = max_pool_size
+    exhausted = pool_stats.exhausted_pools(max_pool_size) if max_pool_size else []
+    pool["exhausted"] = bool(exhausted)
+    if exhausted:
+        pool["exhausted_pools"] = exhausted
+    ready &= not pool["exhausted"]
+    checks["pool"] = pool
+
+    event_loop = loop_lag.snapshot()
+    event_loop["ok"] = event_loop["lag_ms"] <= settings.HEALTH_MAX_LOOP_LAG_MS
+    ready &= event_loop["ok"]
+    checks["event_loop"] = event_loop
+
+    result = {"status": "ok" if ready else "unavailable", "checks": checks}
+    if not ready:
+        LOGGER.warning(f"Readiness check failed: {checks}")
+    _last_readiness = (time.monotonic(), result)
+    return result
+
+
+def _max_pool_size(client: Any) -> Optional[int]:
+    try:
+        max_pool_size = client.options.pool_options.max_pool_size
+    except AttributeError:
+        return None
+    return max_pool_size if isinstance(max_pool_size, int) else None
@@ -1,61 +1,261 @@
-import platform
+import atexit
+import copy
+import json
 import logging
-import logging.config
-import colorlog
+import platform
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, List, Optional, Tuple
+
+from core.config import settings
 
 LOGGING_NAME = "FastAPI"
+# Logger của uvicorn cũng đi qua queue để access log không chặn event loop
+CAPTURED_LOGGERS = ("uvicorn", "uvicorn.error", "uvicorn.access")
 
-def setup_logging(name=LOGGING_NAME, verbose=True, debug=False):
-    level = logging.DEBUG if debug else (logging.INFO if verbose else logging.WARNING)
-    # - %(name)s
-    formatter_str = "%(asctime)s | %(levelname)s | %(module)s:%(lineno)d | %(message)s"
-    datefmt = "%Y-%m-%d %H:%M:%S"
-
-    # Formatters
-    formatters = {
-        "color": {
-            "()": "colorlog.ColoredFormatter",
-            "format": "%(log_color)s" + formatter_str,
-            "datefmt": datefmt,
-            "log_colors": {
-                "DEBUG": "cyan",
-                "INFO": "green",
-                "WARNING": "yellow",
-                "ERROR": "red",
-                "CRITICAL": "bold_red",
-            }
-        }
-    }
-
-    # Only console handler
-    handlers = {
-        "console": {
-            "class": "logging.StreamHandler",
-            "level": level,
-            "formatter": "color"
-        }
-    }
-
-    logging.config.dictConfig({
-        "version": 1,
-        "disable_existing_loggers": False,
-        "formatters": formatters,
-        "handlers": handlers,
-        "loggers": {
-            name: {
-                "handlers": ["console"],
-                "level": level,
-                "propagate": False
-            }
+FORMAT = "%(asctime)s | %(levelname)s | %(module)s:%(lineno)d | %(message)s"
+DATEFMT = "%Y-%m-%d %H:%M:%S"
+LOG_COLORS = {
+    "DEBUG": "cyan",
+    "INFO": "green",
+    "WARNING": "yellow",
+    "ERROR": "red",
+    "CRITICAL": "bold_red",
+}
+
+_TRACEBACK_FORMATTER = logging.Formatter()
+
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional["_NonBlockingQueueHandler"] = None
+_configured_loggers: List[str] = []
+_setup_lock = threading.Lock()
+
+# -----------------------------
+# Formatters
+# -----------------------------
+class JsonFormatter(logging.Formatter):
+    """
+    Một dòng JSON cho mỗi record. Field của `log_event` được đưa lên cấp
+    ngoài cùng để hệ thống gom log lọc trực tiếp.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "module": record.module,
+            "line": record.lineno,
+            "message": record.getMessage(),
         }
-    })
+
+        event = getattr(record, "event", None)
+        if event:
+            payload["event"] = event
+        fields = getattr(record, "fields", None)
+        if fields:
+            for key, value in fields.items():
+                payload.setdefault(key, value)
+        suppressed = getattr(record, "suppressed", 0)
+        if suppressed:
+            payload["suppressed"] = suppressed
+
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            payload["exception"] = record.exc_text
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+def _text_formatter(color: bool) -> logging.Formatter:
+    """colorlog chỉ dùng khi DEBUG (và có cài), còn lại là text thường."""
+    if color:
+        try:
+            import colorlog
+        except ImportError:  # pragma: no cover - colorlog là optional
+            pass
+        else:
+            return colorlog.ColoredFormatter("%(log_color)s" + FORMAT, datefmt=DATEFMT, log_colors=LOG_COLORS)
+    return logging.Formatter(FORMAT, datefmt=DATEFMT)
+
+# -----------------------------
+# Rate Limit
+# -----------------------------
+class RateLimitFilter(logging.Filter):
+    """
+    Token bucket theo từng dòng code gọi log (logger, file, dòng).
+
+    Một dòng log nằm trong vòng lặp nóng (vd: lỗi lặp lại khi Mongo mất kết nối)
+    chỉ được ghi tối đa `rate` record/giây sau `burst` record đầu; số record bị
+    bỏ được báo kèm record kế tiếp được ghi. Chỉ logger có trong `rates` (tên
+    logger -> rate, 0 = không giới hạn) bị giới hạn; log theo từng request như
+    access log thì không.
+    """
+
+    def __init__(self, rates: Dict[str, float], burst: int) -> None:
+        super().__init__()
+        self.rates = dict(rates)
+        self.burst = max(1, burst)
+        # key -> [tokens, lần cập nhật cuối, số record đã bỏ]
+        self._buckets: Dict[Tuple[str, str, int], list] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        rate = self.rates.get(record.name, 0)
+        if rate <= 0:
+            return True
+
+        key = (record.name, record.pathname, record.lineno)
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [float(self.burst), now, 0]
+            else:
+                bucket[0] = min(float(self.burst), bucket[0] + (now - bucket[1]) * rate)
+                bucket[1] = now
+
+            if bucket[0] < 1.0:
+                bucket[2] += 1
+                return False
+
+            bucket[0] -= 1.0
+            suppressed, bucket[2] = bucket[2], 0
+
+        if suppressed:
+            record.suppressed = suppressed
+            record.msg = f"{record.msg} [{suppressed} similar messages suppressed]"
+        return True
+
+# -----------------------------
+# Queue Handler
+# -----------------------------
+class _NonBlockingQueueHandler(QueueHandler):
+    """
+    QueueHandler với queue có giới hạn: khi queue đầy record bị bỏ (đếm lại)
+    thay vì chặn thread gọi log. Message/traceback được dựng sẵn ở đây để
+    record không còn tham chiếu tới object của request.
+    """
+
+    def __init__(self, log_queue: "queue.Queue[logging.LogRecord]") -> None:
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = _TRACEBACK_FORMATTER.formatException(record.exc_info)
+        record.msg = record.getMessage()
+        record.args = None
+        record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+# -----------------------------
+# Setup
+# -----------------------------
+def setup_logging(name: str = LOGGING_NAME, level: Optional[int] = None, json_format: Optional[bool] = None) -> None:
+    """
+    Cấu hình logging cho app (idempotent: gọi lại khi đã cấu hình thì bỏ qua).
+
+    Logger chỉ đẩy record vào queue (không bao giờ chặn), một thread nền
+    (`QueueListener`) format và ghi ra stream. DEBUG dùng text màu; ngoài ra
+    ghi JSON mỗi dòng một record.
+    """
+    global _listener, _queue_handler
+
+    with _setup_lock:
+        if _listener is not None:
+            return
+
+        if level is None:
+            level = logging.DEBUG if settings.DEBUG else logging.getLevelName(settings.LOG_LEVEL.upper())
+        if json_format is None:
+            json_format = not settings.DEBUG
+
+        stream_handler = logging.StreamHandler()
+        stream_handler.setFormatter(JsonFormatter() if json_format else _text_formatter(color=settings.DEBUG))
+
+        queue_handler = _NonBlockingQueueHandler(queue.Queue(maxsize=settings.LOG_QUEUE_SIZE))
+        queue_handler.addFilter(
+            RateLimitFilter(rates=settings.LOG_RATE_LIMITS, burst=settings.LOG_RATE_LIMIT_BURST)
+        )
+
+        for logger_name in (name, *CAPTURED_LOGGERS):
+            logger = logging.getLogger(logger_name)
+            for handler in list(logger.handlers):
+                logger.removeHandler(handler)
+            logger.addHandler(queue_handler)
+            logger.propagate = False
+        logging.getLogger(name).setLevel(level)
+
+        listener = QueueListener(queue_handler.queue, stream_handler, respect_handler_level=True)
+        listener.start()
+        _listener, _queue_handler = listener, queue_handler
+        _configured_loggers[:] = [name, *CAPTURED_LOGGERS]
 
     # Emoji safe logging cho Windows (nếu cần)
     logger = logging.getLogger(name)
     if platform.system() == 'Windows':
         for fn in logger.info, logger.warning:
-            setattr(logger, fn.__name__, lambda x: fn(str(x)))
+            setattr(logger, fn.__name__, lambda x, fn=fn: fn(str(x)))
+
+
+def shutdown_logging() -> None:
+    """
+    Ghi hết record còn trong queue rồi dừng thread ghi log. Log phát sinh sau
+    đó (cuối shutdown) được ghi thẳng ra stream.
+    """
+    global _listener, _queue_handler
+
+    with _setup_lock:
+        listener, queue_handler = _listener, _queue_handler
+        if listener is None or queue_handler is None:
+            return
+
+        if queue_handler.dropped:
+            listener.handle(logging.makeLogRecord({
+                "name": LOGGING_NAME,
+                "levelno": logging.WARNING,
+                "levelname": "WARNING",
+                "msg": f"Dropped {queue_handler.dropped} log records because the log queue was full",
+            }))
+        listener.stop()
+
+        for logger_name in _configured_loggers:
+            logger = logging.getLogger(logger_name)
+            logger.removeHandler(queue_handler)
+            for handler in listener.handlers:
+                logger.addHandler(handler)
+        _listener, _queue_handler = None, None
+
+
+def log_event(logger: logging.Logger, level: int, event: str, **fields) -> None:
+    """
+    Log một sự kiện có cấu trúc: message dạng `event key=value ...`, các field
+    được giữ nguyên trong `record.fields` cho formatter/handler đọc lại.
+    """
+    parts = [event]
+    for key, value in fields.items():
+        if isinstance(value, float):
+            value = f"{value:.2f}"
+        elif isinstance(value, str) and (not value or " " in value):
+            value = f'"{value}"'
+        parts.append(f"{key}={value}")
+    logger.log(level, " ".join(parts), extra={"event": event, "fields": fields}, stacklevel=2)
 
 # Gọi khởi tạo logger
-setup_logging(debug=True)
+setup_logging()
+atexit.register(shutdown_logging)
 LOGGER = logging.getLogger(LOGGING_NAME)
+# Log theo từng request (slow_request...): đi qua handler của LOGGER nhưng không
+# bị rate limit vì mỗi record là một request khác nhau
+REQUEST_LOGGER = LOGGER.getChild("requests")
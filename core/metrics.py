@@ -0,0 +1,223 @@
+# core/metrics.py
+import bisect
+import threading
+import time
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+from pymongo import monitoring
+
+from core.profiling import current_request_stats
+
+# Content-Type của Prometheus text exposition format
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+HTTP_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+MONGO_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+# Request không khớp route nào gom chung một nhãn để không sinh vô hạn series
+UNMATCHED_ROUTE = "<unmatched>"
+
+LabelValues = Tuple[str, ...]
+
+# -----------------------------
+# Metric Types
+# -----------------------------
+class Counter:
+    """Counter theo bộ nhãn (thread-safe: command listener chạy ngoài event loop)."""
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str]) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels: LabelValues, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def collect(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} counter"
+        with self._lock:
+            values = list(self._values.items())
+        for labels, value in sorted(values):
+            yield f"{self.name}{_format_labels(self.label_names, labels)} {_format_value(value)}"
+
+
+class Histogram:
+    """
+    Histogram bucket cố định theo bộ nhãn.
+
+    Mỗi lần observe chỉ là một `bisect` và cộng vào list đếm (không lưu từng
+    mẫu), bucket được cộng dồn khi xuất ra theo đúng format Prometheus.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str],
+        buckets: Sequence[float],
+    ) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [đếm theo bucket (+Inf ở cuối), tổng, số mẫu]
+        self._series: Dict[LabelValues, List] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels: LabelValues, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def collect(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            snapshot = [(labels, list(counts), total, count) for labels, (counts, total, count) in self._series.items()]
+
+        label_names = self.label_names + ("le",)
+        for labels, counts, total, count in sorted(snapshot):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                bucket_labels = _format_labels(label_names, labels + (_format_value(bound),))
+                yield f"{self.name}_bucket{bucket_labels} {cumulative}"
+            series_labels = _format_labels(self.label_names, labels)
+            yield f"{self.name}_sum{series_labels} {_format_value(total)}"
+            yield f"{self.name}_count{series_labels} {count}"
+
+# -----------------------------
+# Registry
+# -----------------------------
+HTTP_REQUESTS = Counter(
+    "http_requests_total",
+    "HTTP requests by route template and status code.",
+    ("method", "route", "status"),
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template.",
+    ("method", "route"),
+    HTTP_BUCKETS,
+)
+MONGO_COMMANDS = Counter(
+    "mongo_commands_total",
+    "MongoDB commands by command name and outcome.",
+    ("command", "outcome"),
+)
+MONGO_COMMAND_DURATION = Histogram(
+    "mongo_command_duration_seconds",
+    "MongoDB command latency reported by the driver.",
+    ("command",),
+    MONGO_BUCKETS,
+)
+
+_METRICS = (HTTP_REQUESTS, HTTP_REQUEST_DURATION, MONGO_COMMANDS, MONGO_COMMAND_DURATION)
+
+
+def render_prometheus() -> str:
+    """Xuất toàn bộ metric của process theo Prometheus text format."""
+    lines: List[str] = []
+    for metric in _METRICS:
+        lines.extend(metric.collect())
+    return "\n".join(lines) + "\n"
+
+# -----------------------------
+# ASGI Middleware
+# -----------------------------
+class MetricsMiddleware:
+    """
+    Middleware ASGI thuần ghi latency và status code của từng request.
+
+    Nhãn route là template path (`/api/v1/users/{job_id}`...) lấy từ
+    `scope["route"]` mà router gắn vào khi khớp, nên số series không phụ thuộc
+    vào giá trị path param. Không bọc Request/Response của Starlette để giữ chi
+    phí ở mức vài micro giây mỗi request.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            route = scope.get("route")
+            path = getattr(route, "path", None) or UNMATCHED_ROUTE
+            method = scope["method"]
+            HTTP_REQUEST_DURATION.observe((method, path), elapsed)
+            HTTP_REQUESTS.inc((method, path, str(status_code)))
+
+# -----------------------------
+# Mongo Command Listener
+# -----------------------------
+class MongoCommandMetrics(monitoring.CommandListener):
+    """
+    CommandListener của pymongo ghi thời gian từng command theo tên.
+
+    Dùng `duration_micros` do driver đo sẵn nên không cần giữ trạng thái giữa
+    started và succeeded/failed. Thời gian cũng được cộng vào RequestStats của
+    request đang chạy (nếu có) cho log request chậm.
+    """
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        pass
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        self._record(event.command_name, event.duration_micros, "succeeded")
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        self._record(event.command_name, event.duration_micros, "failed")
+
+    @staticmethod
+    def _record(command_name: str, duration_micros: int, outcome: str) -> None:
+        seconds = duration_micros / 1_000_000
+        MONGO_COMMAND_DURATION.observe((command_name,), seconds)
+        MONGO_COMMANDS.inc((command_name, outcome))
+        stats = current_request_stats()
+        if stats is not None:
+            stats.add_mongo(seconds)
+
+# -----------------------------
+# Helpers
+# -----------------------------
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
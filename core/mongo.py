@@ -3,24 +3,75 @@ from contextlib import asynccontextmanager
 from motor.motor_asyncio import AsyncIOMotorClient
 from beanie import init_beanie
 from core.config import settings
-from core.logging import setup_logging
+from core.health import create_ping_client, loop_lag, pool_stats
+from core.logging import setup_logging, shutdown_logging
+from core.metrics import MongoCommandMetrics
+from core.security import get_jwt_keys
 
-# Chỉ có User Document
 from modules.users.models.user import User
+from modules.users.models.username_counter import UsernameCounter
+from modules.users.services.user import UserService
+from modules.attendances.models.attendance import Attendance
+from modules.attendances.models.attendance_rollup import AttendanceDailyRollup, AttendanceRollupDirtyDay
+from modules.attendances.services.attendance_service import AttendanceService
+from modules.auth.services.password_service import PasswordService
+from modules.faces.models.face_embedding import FaceEmbedding
+from modules.faces.models.face_embedding_change import FaceEmbeddingChange
+from modules.faces.services.face_service import FaceService
+from modules.reports.models.report_job import ReportJob
+from modules.reports.services.report_service import ReportService
 
 client: AsyncIOMotorClient | None = None
+# Client riêng cho readiness ping, timeout ngắn phía driver
+health_client: AsyncIOMotorClient | None = None
 
 @asynccontextmanager
 async def lifespan(app):
     setup_logging()
-    global client
-    client = AsyncIOMotorClient(settings.MONGO_URI)
+    # Nạp key JWT một lần; cấu hình sai sẽ lỗi ngay khi khởi động
+    get_jwt_keys()
+    global client, health_client
+    client = AsyncIOMotorClient(
+        settings.MONGO_URI,
+        event_listeners=[MongoCommandMetrics(), pool_stats],
+        **settings.MONGO_CLIENT_OPTIONS,
+    )
+    health_client = create_ping_client()
     db = client.get_database(settings.MONGO_DB)
 
-    # init_beanie với User Document
-    await init_beanie(database=db, document_models=[User])
+    # init_beanie với các Document
+    await init_beanie(database=db, document_models=[
+        User,
+        UsernameCounter,
+        Attendance,
+        AttendanceDailyRollup,
+        AttendanceRollupDirtyDay,
+        FaceEmbedding,
+        FaceEmbeddingChange,
+        ReportJob,
+    ])
+
+    # Đo độ trễ event loop cho readiness probe
+    loop_lag.start()
+    # Bổ sung search_tokens cho user cũ
+    await UserService.start()
+    # Face index: map snapshot dùng chung + áp change log
+    await FaceService.start()
+    # Thread pool cho hash mật khẩu
+    await PasswordService.start()
+    # Write buffer cho check-in; shutdown phải flush hết trước khi đóng client
+    await AttendanceService.start()
+    # Worker pool cho report job
+    await ReportService.start()
 
     try:
         yield
     finally:
-        client.close()
\ No newline at end of file
+        await ReportService.stop()
+        await AttendanceService.stop()
+        await PasswordService.stop()
+        await FaceService.stop()
+        await loop_lag.stop()
+        health_client.close()
+        client.close()
+        shutdown_logging()
\ No newline at end of file
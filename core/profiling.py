@@ -0,0 +1,207 @@
+# core/profiling.py
+import asyncio
+import contextvars
+import cProfile
+import hmac
+import logging
+import os
+import random
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Optional
+
+from core.config import settings
+from core.logging import LOGGER, REQUEST_LOGGER, log_event
+
+try:
+    from pyinstrument import Profiler as _SamplingProfiler
+except ImportError:  # pragma: no cover - pyinstrument là optional
+    _SamplingProfiler = None
+
+# Header trả về tên file report khi request được profile
+PROFILE_REPORT_HEADER = "x-profile-report"
+
+# -----------------------------
+# Request Stats
+# -----------------------------
+class RequestStats:
+    """
+    Thời gian của một request theo từng phần.
+
+    Gắn vào contextvar nên Mongo command listener (Motor chạy pymongo trong
+    thread pool với context đã copy) và FastJSONResponse cộng dồn vào đúng
+    request đang chạy.
+    """
+    __slots__ = ("mongo_seconds", "mongo_commands", "serialize_seconds", "_lock")
+
+    def __init__(self) -> None:
+        self.mongo_seconds = 0.0
+        self.mongo_commands = 0
+        self.serialize_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def add_mongo(self, seconds: float) -> None:
+        with self._lock:
+            self.mongo_seconds += seconds
+            self.mongo_commands += 1
+
+    def add_serialization(self, seconds: float) -> None:
+        self.serialize_seconds += seconds
+
+
+_request_stats: contextvars.ContextVar[Optional[RequestStats]] = contextvars.ContextVar(
+    "request_stats", default=None,
+)
+
+
+def current_request_stats() -> Optional[RequestStats]:
+    """Stats của request hiện tại, None khi chạy ngoài request (task nền...)."""
+    return _request_stats.get()
+
+# -----------------------------
+# Profilers
+# -----------------------------
+class _RequestProfiler:
+    """
+    Profile một request: pyinstrument (sampling, chỉ theo task của request) nếu
+    có cài, ngược lại cProfile (deterministic, đo mọi thứ chạy trên thread của
+    event loop trong lúc đó, kể cả request khác).
+    """
+
+    def __init__(self) -> None:
+        if _SamplingProfiler is not None:
+            self._profiler = _SamplingProfiler(async_mode="enabled")
+            self.extension = "html"
+        else:
+            self._profiler = cProfile.Profile()
+            self.extension = "prof"
+
+    def start(self) -> None:
+        if _SamplingProfiler is not None:
+            self._profiler.start()
+        else:
+            self._profiler.enable()
+
+    def stop(self) -> None:
+        if _SamplingProfiler is not None:
+            self._profiler.stop()
+        else:
+            self._profiler.disable()
+
+    def write(self, path: str) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if _SamplingProfiler is not None:
+            with open(path, "w", encoding="utf-8") as handle:
+                handle.write(self._profiler.output_html())
+        else:
+            self._profiler.dump_stats(path)
+
+
+# Mỗi thời điểm chỉ profile một request (hai profiler cùng lúc trên một thread
+# sẽ ghi đè hook của nhau)
+_profiling = False
+
+# -----------------------------
+# ASGI Middleware
+# -----------------------------
+class RequestProfilingMiddleware:
+    """
+    Middleware ASGI đo từng request và profile theo yêu cầu.
+
+    - Mọi request vượt SLOW_REQUEST_THRESHOLD_MS được log `slow_request` với
+      tổng thời gian, thời gian/số command Mongo và thời gian serialize.
+    - Request có header PROFILE_HEADER khớp PROFILE_TOKEN, hoặc được chọn theo
+      PROFILE_SAMPLE_RATE, được profile; report ghi vào PROFILE_DIR và tên file
+      trả về trong header `X-Profile-Report`.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+        self._header = settings.PROFILE_HEADER.lower().encode("latin-1")
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        global _profiling
+        stats = RequestStats()
+        token = _request_stats.set(stats)
+        status_code = 500
+
+        profiler: Optional[_RequestProfiler] = None
+        report_name: Optional[str] = None
+        if not _profiling and self._should_profile(scope):
+            _profiling = True
+            profiler = _RequestProfiler()
+            report_name = (
+                f"{datetime.now(timezone.utc):%Y%m%dT%H%M%S}-{scope['method']}-"
+                f"{uuid.uuid4().hex[:8]}.{profiler.extension}"
+            )
+
+        async def send_wrapper(message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if report_name is not None:
+                    headers = list(message.get("headers", []))
+                    headers.append((PROFILE_REPORT_HEADER.encode("latin-1"), report_name.encode("latin-1")))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            if profiler is not None:
+                profiler.start()
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            if profiler is not None:
+                profiler.stop()
+                _profiling = False
+            _request_stats.reset(token)
+
+            if profiler is not None:
+                await self._save_report(profiler, report_name, scope)
+            if elapsed * 1000 >= settings.SLOW_REQUEST_THRESHOLD_MS:
+                self._log_slow_request(scope, status_code, elapsed, stats)
+
+    def _should_profile(self, scope) -> bool:
+        if settings.PROFILE_TOKEN:
+            for name, value in scope.get("headers", ()):
+                if name == self._header:
+                    return hmac.compare_digest(value, settings.PROFILE_TOKEN.encode("utf-8"))
+        return settings.PROFILE_SAMPLE_RATE > 0 and random.random() < settings.PROFILE_SAMPLE_RATE
+
+    @staticmethod
+    async def _save_report(profiler: _RequestProfiler, report_name: str, scope) -> None:
+        path = os.path.join(settings.PROFILE_DIR, report_name)
+        try:
+            await asyncio.to_thread(profiler.write, path)
+        except Exception as exc:
+            LOGGER.error(f"Failed to write profile report {path}: {exc}")
+            return
+        log_event(REQUEST_LOGGER, logging.INFO, "request_profiled", method=scope["method"], path=scope["path"], report=path)
+
+    @staticmethod
+    def _log_slow_request(scope, status_code: int, elapsed: float, stats: RequestStats) -> None:
+        route = scope.get("route")
+        total_ms = elapsed * 1000
+        mongo_ms = stats.mongo_seconds * 1000
+        serialize_ms = stats.serialize_seconds * 1000
+        log_event(
+            REQUEST_LOGGER,
+            logging.WARNING,
+            "slow_request",
+            method=scope["method"],
+            route=getattr(route, "path", None) or scope["path"],
+            path=scope["path"],
+            status=status_code,
+            total_ms=total_ms,
+            mongo_ms=mongo_ms,
+            mongo_commands=stats.mongo_commands,
+            serialize_ms=serialize_ms,
+            other_ms=max(0.0, total_ms - mongo_ms - serialize_ms),
+        )
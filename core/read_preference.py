@@ -0,0 +1,55 @@
+# core/read_preference.py
+from functools import lru_cache
+from typing import Any, List, Type
+
+from beanie import Document
+from beanie.odm.queries.find import FindMany
+from beanie.odm.utils.parsing import parse_obj
+from beanie.odm.utils.projection import get_projection
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo.read_preferences import Primary, _ServerMode, make_read_preference, read_pref_mode_from_name
+
+from core.config import settings
+
+# -----------------------------
+# Analytics Reads
+# -----------------------------
+@lru_cache(maxsize=1)
+def analytics_read_preference() -> _ServerMode:
+    """
+    Read preference cho truy vấn nặng chỉ đọc (list, export, report), theo
+    MONGO_ANALYTICS_READ_PREFERENCE. Ghi và đọc thường vẫn dùng read
+    preference mặc định của client.
+    """
+    return make_read_preference(
+        read_pref_mode_from_name(settings.MONGO_ANALYTICS_READ_PREFERENCE),
+        tag_sets=None,
+        max_staleness=settings.MONGO_ANALYTICS_MAX_STALENESS_SECONDS,
+    )
+
+
+def analytics_collection(document_model: Type[Document]) -> AsyncIOMotorCollection:
+    """Motor collection của `document_model` đọc theo analytics read preference."""
+    return document_model.get_motor_collection().with_options(read_preference=analytics_read_preference())
+
+
+async def analytics_to_list(query: FindMany) -> List[Any]:
+    """
+    Chạy một Beanie FindMany (filter/sort/skip/limit/projection) theo analytics
+    read preference.
+
+    Beanie không cho chọn read preference theo query nên query được chạy thẳng
+    trên collection đã `with_options`, rồi parse như Beanie. Khi analytics dùng
+    primary thì gọi `to_list()` của Beanie như bình thường.
+    """
+    if isinstance(analytics_read_preference(), Primary):
+        return await query.to_list()
+
+    cursor = analytics_collection(query.document_model).find(
+        filter=query.get_filter_query(),
+        sort=query.sort_expressions,
+        projection=get_projection(query.projection_model),
+        skip=query.skip_number,
+        limit=query.limit_number,
+    )
+    return [parse_obj(query.projection_model, document) async for document in cursor]
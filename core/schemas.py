@@ -1,7 +1,16 @@
 # core/schemas.py
+import json
+import time
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel, Field
 from datetime import datetime, timezone
 from typing import Any, Optional, TypeVar, Generic
+from core.profiling import current_request_stats
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson là optional
+    orjson = None
 
 T = TypeVar('T')
 
@@ -17,6 +26,10 @@ class SuccessResponse(ApiResponse[T]):
     """Success response template"""
     success: bool = True
 
+class CursorPageResponse(SuccessResponse[T]):
+    """Success response kèm cursor cho trang tiếp theo"""
+    next_cursor: Optional[str] = None
+
 class ErrorResponse(BaseModel):
     """Error response template - không có data field"""
     success: bool = False
@@ -27,4 +40,49 @@ class ErrorResponse(BaseModel):
 # Rebuild schemas
 ApiResponse.model_rebuild()
 SuccessResponse.model_rebuild()
-ErrorResponse.model_rebuild()
\ No newline at end of file
+CursorPageResponse.model_rebuild()
+ErrorResponse.model_rebuild()
+
+# -----------------------------
+# Fast JSON Response
+# -----------------------------
+def _dumps(content: Any) -> bytes:
+    """Encode JSON compact, cùng định dạng với JSONResponse của Starlette."""
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(
+        content,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+class FastJSONResponse(JSONResponse):
+    """
+    Default response class của app.
+
+    - Nhận trực tiếp pydantic model (ApiResponse/ErrorResponse...) và serialize
+      bằng serializer đã compile sẵn của pydantic-core, bỏ qua model_dump +
+      validate lại response_model + jsonable_encoder.
+    - Dict/list được encode bằng orjson (fallback stdlib json).
+
+    Output giống hệt JSONResponse(model.model_dump(mode="json")).
+    """
+
+    def render(self, content: Any) -> bytes:
+        stats = current_request_stats()
+        if stats is None:
+            return self._render(content)
+
+        started = time.perf_counter()
+        try:
+            return self._render(content)
+        finally:
+            stats.add_serialization(time.perf_counter() - started)
+
+    @staticmethod
+    def _render(content: Any) -> bytes:
+        if isinstance(content, BaseModel):
+            return content.__pydantic_serializer__.to_json(content)
+        return _dumps(content)
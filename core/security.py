@@ -1 +1,125 @@
-# TODO: JWT helpers (sign/verify), password hashing (argon2/bcrypt)
\ No newline at end of file
+# core/security.py
+import hmac
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
+
+import jwt
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError, VerifyMismatchError
+
+from core.config import DEFAULT_JWT_SECRET_KEY, settings
+
+ARGON2_PREFIX = "$argon2"
+MIN_JWT_SECRET_LENGTH = 32
+
+# -----------------------------
+# Password Hashing
+# -----------------------------
+# Các hàm bên dưới tốn CPU (argon2 cố ý chậm) và chạy đồng bộ; không gọi trực
+# tiếp trong async handler mà đi qua `PasswordService` (thread pool).
+@lru_cache(maxsize=1)
+def get_password_hasher() -> PasswordHasher:
+    """PasswordHasher argon2id theo tham số trong settings."""
+    return PasswordHasher(
+        time_cost=settings.PASSWORD_HASH_TIME_COST,
+        memory_cost=settings.PASSWORD_HASH_MEMORY_COST,
+        parallelism=settings.PASSWORD_HASH_PARALLELISM,
+    )
+
+
+def is_password_hash(value: str) -> bool:
+    """Phân biệt hash argon2 với mật khẩu plaintext cũ."""
+    return value.startswith(ARGON2_PREFIX)
+
+
+def hash_password(password: str) -> str:
+    """Hash mật khẩu bằng argon2id."""
+    return get_password_hasher().hash(password)
+
+
+def verify_password(stored: str, password: str) -> bool:
+    """
+    Kiểm tra mật khẩu với giá trị đang lưu.
+
+    Giá trị không phải hash argon2 là mật khẩu plaintext từ trước khi có hash,
+    được so sánh constant-time để có thể hash lại sau lần đăng nhập đúng.
+    """
+    if not is_password_hash(stored):
+        return hmac.compare_digest(stored.encode("utf-8"), password.encode("utf-8"))
+
+    try:
+        return get_password_hasher().verify(stored, password)
+    except (VerifyMismatchError, VerificationError, InvalidHashError):
+        return False
+
+
+def password_needs_rehash(stored: str) -> bool:
+    """True nếu giá trị đang lưu là plaintext hoặc hash với tham số cũ."""
+    return not is_password_hash(stored) or get_password_hasher().check_needs_rehash(stored)
+
+# -----------------------------
+# JWT
+# -----------------------------
+@lru_cache(maxsize=1)
+def get_jwt_keys() -> Tuple[Any, Any]:
+    """
+    Key ký và key verify đã được parse sẵn (đọc file PEM một lần mỗi process).
+
+    Truyền key object thay vì chuỗi PEM để PyJWT không parse lại key ở mỗi
+    lần encode/decode.
+    """
+    algorithm = jwt.get_algorithm_by_name(settings.JWT_ALGORITHM)
+    if settings.JWT_ALGORITHM.startswith("HS"):
+        # Secret mặc định là public: ai cũng ký được token cho bất kỳ user nào
+        if not settings.DEBUG and (
+            settings.JWT_SECRET_KEY == DEFAULT_JWT_SECRET_KEY
+            or len(settings.JWT_SECRET_KEY) < MIN_JWT_SECRET_LENGTH
+        ):
+            raise RuntimeError(
+                f"JWT_SECRET_KEY must be set to a random secret of at least "
+                f"{MIN_JWT_SECRET_LENGTH} characters when DEBUG is False"
+            )
+        key = algorithm.prepare_key(settings.JWT_SECRET_KEY)
+        return key, key
+
+    if not settings.JWT_PRIVATE_KEY_FILE or not settings.JWT_PUBLIC_KEY_FILE:
+        raise RuntimeError(f"{settings.JWT_ALGORITHM} requires JWT_PRIVATE_KEY_FILE and JWT_PUBLIC_KEY_FILE")
+
+    with open(settings.JWT_PRIVATE_KEY_FILE, "rb") as handle:
+        private_key = algorithm.prepare_key(handle.read())
+    with open(settings.JWT_PUBLIC_KEY_FILE, "rb") as handle:
+        public_key = algorithm.prepare_key(handle.read())
+    return private_key, public_key
+
+
+def create_access_token(
+    subject: str,
+    claims: Optional[Dict[str, Any]] = None,
+    expires_in: Optional[timedelta] = None,
+) -> Tuple[str, datetime]:
+    """Ký access token cho `subject`, trả về (token, thời điểm hết hạn)."""
+    now = datetime.now(timezone.utc)
+    expires_at = now + (expires_in or timedelta(minutes=settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES))
+    payload = {
+        **(claims or {}),
+        "sub": subject,
+        "iss": settings.JWT_ISSUER,
+        "iat": int(now.timestamp()),
+        "exp": int(expires_at.timestamp()),
+    }
+    signing_key, _ = get_jwt_keys()
+    return jwt.encode(payload, signing_key, algorithm=settings.JWT_ALGORITHM), expires_at
+
+
+def decode_access_token(token: str) -> Dict[str, Any]:
+    """Verify chữ ký, issuer và thời hạn; raise `jwt.InvalidTokenError` nếu sai."""
+    _, verification_key = get_jwt_keys()
+    return jwt.decode(
+        token,
+        verification_key,
+        algorithms=[settings.JWT_ALGORITHM],
+        issuer=settings.JWT_ISSUER,
+        leeway=settings.JWT_LEEWAY_SECONDS,
+        options={"require": ["sub", "iat", "exp"]},
+    )
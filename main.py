@@ -3,7 +3,10 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.exceptions import RequestValidationError
 
 from core.config import settings
+from core.metrics import MetricsMiddleware
+from core.profiling import RequestProfilingMiddleware
 from core.mongo import lifespan
+from core.schemas import FastJSONResponse
 from core.exceptions import (
     custom_http_exception_handler, 
     validation_exception_handler,
@@ -17,6 +20,7 @@ def create_app() -> FastAPI:
         title=settings.APP_NAME,
         debug=settings.DEBUG,
         lifespan=lifespan,
+        default_response_class=FastJSONResponse,
         swagger_ui_parameters={"tryItOutEnabled": True}
     )
 
@@ -32,6 +36,9 @@ def create_app() -> FastAPI:
         allow_methods=["*"],
         allow_headers=["*"],
     )
+    # Middleware thêm sau bọc ngoài: metrics đo cả thời gian profile/log request chậm
+    app.add_middleware(RequestProfilingMiddleware)
+    app.add_middleware(MetricsMiddleware)
 
     app.include_router(api_router, prefix=settings.API_PREFIX)
 
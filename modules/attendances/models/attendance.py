@@ -0,0 +1,55 @@
+# modules/attendances/models/attendance.py
+from beanie import Document, Granularity, PydanticObjectId, TimeSeriesConfig
+from pydantic import BaseModel, ConfigDict, Field
+from pymongo import ASCENDING, IndexModel
+from datetime import datetime, timezone
+from typing import Optional
+
+# -----------------------------
+# Attendance Model
+# -----------------------------
+class Attendance(Document):
+    # Một lần check-in do camera nhận diện khuôn mặt gửi lên
+    user_id: PydanticObjectId
+    timestamp: datetime
+    device_id: Optional[str] = None
+    score: Optional[float] = None
+
+    # Thời điểm server nhận event
+    received_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+    class Settings:
+        name = "attendances"
+        # Time-series collection: Mongo gom check-in của cùng user_id (metaField)
+        # vào các bucket theo thời gian, giảm kích thước dữ liệu và index.
+        # Chỉ áp dụng khi collection chưa tồn tại.
+        timeseries = TimeSeriesConfig(
+            time_field="timestamp",
+            meta_field="user_id",
+            granularity=Granularity.hours,
+        )
+        indexes = [
+            # Lịch sử theo user: {user_id, timestamp range}
+            IndexModel([("user_id", ASCENDING), ("timestamp", ASCENDING)], name="user_id_timestamp"),
+            # Quét theo ngày cho tất cả user: {timestamp range}
+            IndexModel([("timestamp", ASCENDING)], name="timestamp"),
+        ]
+
+# -----------------------------
+# Attendance Projection
+# -----------------------------
+class AttendanceView(BaseModel):
+    """Projection của Attendance cho các truy vấn theo khoảng thời gian"""
+    model_config = ConfigDict(populate_by_name=True)
+
+    id: PydanticObjectId = Field(alias="_id")
+    user_id: PydanticObjectId
+    timestamp: datetime
+    device_id: Optional[str] = None
+    score: Optional[float] = None
+
+# -----------------------------
+# Rebuild Model
+# -----------------------------
+Attendance.model_rebuild()
+AttendanceView.model_rebuild()
@@ -0,0 +1,46 @@
+# modules/attendances/models/attendance_rollup.py
+from beanie import Document, PydanticObjectId
+from pydantic import Field
+from pymongo import ASCENDING, IndexModel
+from datetime import datetime, timezone
+
+# -----------------------------
+# Attendance Daily Rollup Model
+# -----------------------------
+class AttendanceDailyRollup(Document):
+    # Tổng hợp check-in của một user trong một ngày local (settings.TIMEZONE)
+    user_id: PydanticObjectId
+    day: str  # YYYY-MM-DD
+    first_in: datetime
+    last_out: datetime
+    checkins: int = 0
+    # Tăng sau mỗi lần cộng dồn incremental; lần tính lại dùng để nhận ra batch
+    # ghi xen giữa lúc đọc và lúc ghi
+    version: int = 0
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+    class Settings:
+        name = "attendance_daily_rollups"
+        indexes = [
+            IndexModel([("user_id", ASCENDING), ("day", ASCENDING)], name="user_id_day", unique=True),
+            # Beanie gộp index theo tập field (không theo thứ tự) nên không khai báo
+            # thêm (day, user_id): nó sẽ đè mất index unique ở trên
+            IndexModel([("day", ASCENDING)], name="day"),
+        ]
+
+# -----------------------------
+# Dirty Day Model
+# -----------------------------
+class AttendanceRollupDirtyDay(Document):
+    # Ngày có rollup cần tính lại từ dữ liệu gốc (vd: cập nhật incremental bị lỗi)
+    id: str  # YYYY-MM-DD
+    marked_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+    class Settings:
+        name = "attendance_rollup_dirty_days"
+
+# -----------------------------
+# Rebuild Model
+# -----------------------------
+AttendanceDailyRollup.model_rebuild()
+AttendanceRollupDirtyDay.model_rebuild()
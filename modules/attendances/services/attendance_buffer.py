@@ -0,0 +1,274 @@
+# modules/attendances/services/attendance_buffer.py
+import asyncio
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Set
+
+from bson import ObjectId
+from pymongo.errors import BulkWriteError, PyMongoError
+
+from core.logging import LOGGER
+from modules.attendances.models.attendance import Attendance
+
+FlushHook = Callable[[List[Dict[str, Any]]], Awaitable[None]]
+
+# -----------------------------
+# Errors
+# -----------------------------
+class BufferFullError(Exception):
+    """Buffer đầy quá thời gian chờ cho phép (backpressure)."""
+
+class BufferClosedError(Exception):
+    """Buffer chưa chạy hoặc đang shutdown, không nhận thêm event."""
+
+# -----------------------------
+# Attendance Write Buffer
+# -----------------------------
+class AttendanceWriteBuffer:
+    """
+    Write-behind buffer cho check-in.
+
+    Request chỉ đưa event vào hàng đợi trong bộ nhớ; một task nền gom event và
+    ghi bằng `insert_many` khi đủ `batch_size` hoặc sau `flush_interval` giây.
+    Khi hàng đợi đầy, `submit` chờ tối đa `enqueue_timeout` giây rồi báo
+    `BufferFullError` để client retry sau. `stop()` ghi hết event còn lại.
+
+    Sau mỗi batch, các flush hook (`add_flush_hook`) nhận danh sách event đã
+    ghi thành công, ví dụ để cập nhật bảng tổng hợp theo ngày. Batch bị bỏ sau
+    khi hết retry (hoặc lỗi ngoài dự kiến) có thể đã được ghi một phần nên được
+    đưa cho các failure hook (`add_failure_hook`) để dữ liệu tổng hợp được tính
+    lại từ dữ liệu gốc.
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        batch_size: int,
+        flush_interval: float,
+        enqueue_timeout: float,
+        max_retries: int,
+    ) -> None:
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.enqueue_timeout = enqueue_timeout
+        self.max_retries = max_retries
+
+        self._pending: Deque[Dict[str, Any]] = deque()
+        self._in_flight = 0
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+        self._wakeup: Optional[asyncio.Event] = None
+        self._space: Optional[asyncio.Event] = None
+        self._flush_hooks: List[FlushHook] = []
+        self._failure_hooks: List[FlushHook] = []
+
+        # Metrics
+        self.enqueued_total = 0
+        self.written_total = 0
+        self.failed_total = 0
+        self.rejected_total = 0
+        self.flushes_total = 0
+        self.last_flush_size = 0
+        self.last_flush_seconds = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done() and not self._closing
+
+    @property
+    def depth(self) -> int:
+        return len(self._pending)
+
+    def add_flush_hook(self, hook: FlushHook) -> None:
+        """Đăng ký hook chạy sau mỗi batch ghi thành công."""
+        if hook not in self._flush_hooks:
+            self._flush_hooks.append(hook)
+
+    def add_failure_hook(self, hook: FlushHook) -> None:
+        """Đăng ký hook nhận batch ghi thất bại (có thể đã ghi một phần)."""
+        if hook not in self._failure_hooks:
+            self._failure_hooks.append(hook)
+
+    async def start(self) -> None:
+        """Khởi động task flush nền (gọi trong lifespan)."""
+        if self._task is not None:
+            return
+
+        self._closing = False
+        self._wakeup = asyncio.Event()
+        self._space = asyncio.Event()
+        self._space.set()
+        self._task = asyncio.create_task(self._run(), name="attendance-write-buffer")
+
+    async def stop(self) -> None:
+        """Ngừng nhận event và ghi hết những gì còn trong buffer."""
+        if self._task is None:
+            return
+
+        self._closing = True
+        self._wakeup.set()
+        self._space.set()
+        try:
+            await self._task
+        finally:
+            self._task = None
+
+    async def submit(self, documents: List[Dict[str, Any]]) -> None:
+        """
+        Đưa một nhóm event vào buffer (tất cả hoặc không có event nào).
+
+        Raise `BufferFullError` nếu không đủ chỗ trong `enqueue_timeout` giây.
+        """
+        if not self.running:
+            raise BufferClosedError("Attendance buffer is not accepting events")
+
+        count = len(documents)
+        if count > self.max_size:
+            self.rejected_total += count
+            raise BufferFullError(f"Batch of {count} events exceeds buffer capacity {self.max_size}")
+
+        deadline = time.monotonic() + self.enqueue_timeout
+        while self.max_size - len(self._pending) < count:
+            self._space.clear()
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not self.running:
+                self.rejected_total += count
+                raise BufferFullError("Attendance buffer is full")
+            try:
+                await asyncio.wait_for(self._space.wait(), timeout=remaining)
+            except asyncio.TimeoutError:
+                pass
+
+        self._pending.extend(documents)
+        self.enqueued_total += count
+        if len(self._pending) >= self.batch_size:
+            self._wakeup.set()
+
+    def metrics(self) -> Dict[str, Any]:
+        """Số liệu hàng đợi để theo dõi."""
+        return {
+            "running": self.running,
+            "depth": len(self._pending),
+            "in_flight": self._in_flight,
+            "max_size": self.max_size,
+            "batch_size": self.batch_size,
+            "flush_interval_seconds": self.flush_interval,
+            "enqueued_total": self.enqueued_total,
+            "written_total": self.written_total,
+            "failed_total": self.failed_total,
+            "rejected_total": self.rejected_total,
+            "flushes_total": self.flushes_total,
+            "last_flush_size": self.last_flush_size,
+            "last_flush_seconds": self.last_flush_seconds,
+        }
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+            try:
+                await self._flush()
+            except Exception as exc:
+                # Lỗi ngoài dự kiến không được làm chết task nền, nếu không
+                # `submit` vẫn nhận event nhưng không còn ai ghi xuống DB.
+                LOGGER.exception(f"Attendance flush loop failed: {exc}")
+
+            if self._closing and not self._pending:
+                return
+
+    async def _flush(self) -> None:
+        """Ghi toàn bộ event đang chờ theo từng batch `batch_size`."""
+        while self._pending:
+            size = min(self.batch_size, len(self._pending))
+            batch = [self._pending.popleft() for _ in range(size)]
+            self._space.set()
+
+            self._in_flight = size
+            try:
+                await self._write(batch)
+            except Exception as exc:
+                # Vd: bson.errors.InvalidDocument hoặc lỗi trong code flush
+                self.failed_total += size
+                LOGGER.exception(f"Attendance flush: dropped {size} events: {exc}")
+                await self._run_hooks(self._failure_hooks, batch)
+            finally:
+                self._in_flight = 0
+
+    @staticmethod
+    async def _missing(collection: Any, batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Các event trong `batch` chưa có trong DB (theo _id)."""
+        # Lọc thêm theo user_id/timestamp để dùng index user_id_timestamp thay
+        # vì quét toàn bộ bucket.
+        timestamps = [document["timestamp"] for document in batch]
+        cursor = collection.find(
+            {
+                "user_id": {"$in": list({document["user_id"] for document in batch})},
+                "timestamp": {"$gte": min(timestamps), "$lte": max(timestamps)},
+                "_id": {"$in": [document["_id"] for document in batch]},
+            },
+            projection={"_id": 1},
+        )
+        existing = {document["_id"] async for document in cursor}
+        return [document for document in batch if document["_id"] not in existing]
+
+    async def _write(self, batch: List[Dict[str, Any]]) -> None:
+        started = time.perf_counter()
+        collection = Attendance.get_motor_collection()
+
+        # _id sinh phía client (trước lần ghi đầu) để lần retry nhận ra event
+        # đã ghi.
+        for document in batch:
+            document.setdefault("_id", ObjectId())
+
+        rejected_ids: Set[ObjectId] = set()
+        remaining = batch
+        for attempt in range(self.max_retries + 1):
+            try:
+                if attempt > 0:
+                    # Time-series collection không có unique index trên _id nên
+                    # ghi lại event đã ghi ở lần trước (timeout, ghi được một
+                    # phần...) không báo lỗi trùng mà tạo bản ghi trùng: chỉ ghi
+                    # lại các event chưa có trong DB.
+                    remaining = await self._missing(collection, remaining)
+                    if not remaining:
+                        break
+                await collection.insert_many(remaining, ordered=False)
+                break
+            except BulkWriteError as exc:
+                # ordered=False: các event không bị từ chối đều đã được ghi
+                rejected_ids = {
+                    remaining[error["index"]]["_id"]
+                    for error in exc.details.get("writeErrors", [])
+                }
+                self.failed_total += len(rejected_ids)
+                if rejected_ids:
+                    LOGGER.error(f"Attendance flush: {len(rejected_ids)} events rejected by Mongo")
+                break
+            except PyMongoError as exc:
+                if attempt >= self.max_retries:
+                    self.failed_total += len(batch)
+                    LOGGER.error(f"Attendance flush: dropped {len(batch)} events after retries: {exc}")
+                    await self._run_hooks(self._failure_hooks, batch)
+                    return
+                await asyncio.sleep(min(0.2 * 2 ** attempt, 5.0))
+
+        written = [document for document in batch if document["_id"] not in rejected_ids]
+        self.written_total += len(written)
+        self.flushes_total += 1
+        self.last_flush_size = len(written)
+        self.last_flush_seconds = time.perf_counter() - started
+
+        await self._run_hooks(self._flush_hooks, written)
+
+    @staticmethod
+    async def _run_hooks(hooks: List[FlushHook], documents: List[Dict[str, Any]]) -> None:
+        for hook in hooks:
+            try:
+                await hook(documents)
+            except Exception as exc:
+                LOGGER.error(f"Attendance flush hook {getattr(hook, '__qualname__', hook)} failed: {exc}")
@@ -0,0 +1,111 @@
+# modules/attendances/services/attendance_service.py
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Tuple
+from bson import ObjectId
+from core.config import settings
+from core.read_preference import analytics_to_list
+from modules.attendances.models.attendance import Attendance, AttendanceView
+from modules.attendances.services.attendance_buffer import AttendanceWriteBuffer
+from modules.attendances.services.rollup_service import AttendanceRollupService
+from utils.pagination import DEFAULT_PAGE_LIMIT, paginate_by_time
+from utils.time import ensure_utc, get_timezone, local_day_bounds, utc_now
+
+# (user_id, timestamp, device_id, score)
+CheckIn = Tuple[str, Optional[datetime], Optional[str], Optional[float]]
+
+_buffer = AttendanceWriteBuffer(
+    max_size=settings.ATTENDANCE_BUFFER_MAX_SIZE,
+    batch_size=settings.ATTENDANCE_FLUSH_BATCH_SIZE,
+    flush_interval=settings.ATTENDANCE_FLUSH_INTERVAL_SECONDS,
+    enqueue_timeout=settings.ATTENDANCE_ENQUEUE_TIMEOUT_SECONDS,
+    max_retries=settings.ATTENDANCE_FLUSH_MAX_RETRIES,
+)
+
+# -----------------------------
+# Attendance Service
+# -----------------------------
+class AttendanceService:
+    """Attendance Service"""
+
+    @staticmethod
+    async def start() -> None:
+        """Khởi động write buffer và cập nhật rollup theo ngày (lifespan startup)."""
+        await AttendanceRollupService.start()
+        _buffer.add_flush_hook(AttendanceRollupService.apply_checkins)
+        _buffer.add_failure_hook(AttendanceRollupService.mark_checkins_dirty)
+        await _buffer.start()
+
+    @staticmethod
+    async def stop() -> None:
+        """Ghi hết event còn trong buffer (lifespan shutdown)."""
+        await _buffer.stop()
+
+    @staticmethod
+    async def submit_checkins(checkins: List[CheckIn]) -> int:
+        """
+        Đưa các check-in vào write buffer, trả về số event được nhận.
+
+        Event được ghi xuống Mongo bất đồng bộ theo batch; raise
+        `BufferFullError` khi buffer đầy quá thời gian chờ.
+        """
+        received_at = utc_now()
+        documents = [
+            {
+                "user_id": ObjectId(user_id),
+                "timestamp": ensure_utc(timestamp) if timestamp else received_at,
+                "device_id": device_id,
+                "score": score,
+                "received_at": received_at,
+            }
+            for user_id, timestamp, device_id, score in checkins
+        ]
+
+        await _buffer.submit(documents)
+        return len(documents)
+
+    @staticmethod
+    def buffer_metrics() -> Dict[str, Any]:
+        """Số liệu hàng đợi của write buffer"""
+        return _buffer.metrics()
+
+    @staticmethod
+    async def get_user_history(
+        user_id: str,
+        start: datetime,
+        end: datetime,
+    ) -> List[AttendanceView]:
+        """
+        Lịch sử check-in của một user trong [start, end), sắp theo thời gian.
+
+        Dùng index (user_id, timestamp) nên chi phí chỉ phụ thuộc số check-in
+        trong khoảng, không phụ thuộc tổng dữ liệu.
+        """
+        return await analytics_to_list(
+            Attendance.find(
+                {
+                    "user_id": ObjectId(user_id),
+                    "timestamp": {"$gte": ensure_utc(start), "$lt": ensure_utc(end)},
+                },
+                projection_model=AttendanceView,
+            ).sort([("user_id", 1), ("timestamp", 1)])
+        )
+
+    @staticmethod
+    async def get_daily_checkins(
+        day: date,
+        limit: int = DEFAULT_PAGE_LIMIT,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[AttendanceView], Optional[str]]:
+        """
+        Một trang check-in của tất cả user trong một ngày (theo múi giờ
+        settings.TIMEZONE), sắp theo thời gian; trả về (check-in, next_cursor).
+        """
+        start, end = local_day_bounds(day, get_timezone(settings.TIMEZONE))
+        return await paginate_by_time(
+            Attendance,
+            {"timestamp": {"$gte": start, "$lt": end}},
+            limit=limit,
+            cursor=cursor,
+            projection_model=AttendanceView,
+            analytics=True,
+        )
@@ -0,0 +1,311 @@
+# modules/attendances/services/rollup_service.py
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+import numpy as np
+from bson import ObjectId
+from pymongo import DeleteOne, UpdateOne
+from pymongo.errors import BulkWriteError, PyMongoError
+from core.config import settings
+from core.logging import LOGGER
+from core.read_preference import analytics_collection
+from modules.attendances.models.attendance import Attendance
+from modules.attendances.models.attendance_rollup import (
+    AttendanceDailyRollup,
+    AttendanceRollupDirtyDay,
+)
+from modules.reports.services.worktime import DailyPresence, compute_daily_presence
+from utils.time import ensure_utc, get_timezone, local_day_bounds, local_day_starts, utc_now
+
+# Nhận tập ngày (YYYY-MM-DD) có rollup vừa thay đổi
+RollupListener = Callable[[Set[str]], None]
+
+LOAD_BATCH_SIZE = 5000
+
+_listeners: List[RollupListener] = []
+
+# -----------------------------
+# Attendance Rollup Service
+# -----------------------------
+class AttendanceRollupService:
+    """
+    Bảng tổng hợp check-in theo (user, ngày local).
+
+    Rollup được cập nhật incremental sau mỗi batch của write buffer bằng
+    `$min/$max/$inc` (không đọc lại dữ liệu gốc). Khi cập nhật lỗi, các ngày
+    liên quan được đánh dấu dirty và chỉ những ngày đó được tính lại từ
+    collection attendances trước khi đọc.
+    """
+
+    @staticmethod
+    async def start() -> None:
+        """
+        Lần đầu bật rollup trên dữ liệu cũ: đánh dấu dirty toàn bộ khoảng ngày
+        đã có check-in để được tính lại dần khi có truy vấn.
+        """
+        if await AttendanceDailyRollup.get_motor_collection().find_one({}, {"_id": 1}):
+            return
+
+        collection = Attendance.get_motor_collection()
+        first = await collection.find_one({}, {"timestamp": 1}, sort=[("timestamp", 1)])
+        if first is None:
+            return
+        last = await collection.find_one({}, {"timestamp": 1}, sort=[("timestamp", -1)])
+
+        tz = get_timezone(settings.TIMEZONE)
+        start_day = ensure_utc(first["timestamp"]).astimezone(tz).date()
+        end_day = ensure_utc(last["timestamp"]).astimezone(tz).date()
+        await AttendanceRollupService.mark_dirty(
+            (start_day + timedelta(days=offset)).isoformat()
+            for offset in range((end_day - start_day).days + 1)
+        )
+
+    @staticmethod
+    def add_listener(listener: RollupListener) -> None:
+        """Đăng ký callback khi rollup của một số ngày thay đổi."""
+        if listener not in _listeners:
+            _listeners.append(listener)
+
+    @staticmethod
+    async def apply_checkins(documents: List[Dict[str, Any]]) -> None:
+        """Flush hook: cộng dồn một batch check-in đã ghi vào rollup."""
+        if not documents:
+            return
+
+        tz = get_timezone(settings.TIMEZONE)
+        cells: Dict[Tuple[ObjectId, str], List[Any]] = {}
+        for document in documents:
+            timestamp = ensure_utc(document["timestamp"])
+            key = (document["user_id"], timestamp.astimezone(tz).date().isoformat())
+            cell = cells.get(key)
+            if cell is None:
+                cells[key] = [timestamp, timestamp, 1]
+            else:
+                cell[0] = min(cell[0], timestamp)
+                cell[1] = max(cell[1], timestamp)
+                cell[2] += 1
+
+        now = utc_now()
+        operations = [
+            UpdateOne(
+                {"user_id": user_id, "day": day},
+                {
+                    "$min": {"first_in": first_in},
+                    "$max": {"last_out": last_out},
+                    "$inc": {"checkins": count, "version": 1},
+                    "$set": {"updated_at": now},
+                },
+                upsert=True,
+            )
+            for (user_id, day), (first_in, last_out, count) in cells.items()
+        ]
+        days = {day for _, day in cells}
+
+        try:
+            await AttendanceDailyRollup.get_motor_collection().bulk_write(operations, ordered=False)
+        except PyMongoError as exc:
+            LOGGER.warning(f"Attendance rollup update failed, marking {len(days)} days dirty: {exc}")
+            await AttendanceRollupService.mark_dirty(days)
+            return
+
+        _notify(days)
+
+    @staticmethod
+    async def mark_checkins_dirty(documents: List[Dict[str, Any]]) -> None:
+        """
+        Failure hook: batch check-in không ghi được trọn vẹn (có thể đã ghi một
+        phần) nên không cộng dồn được; đánh dấu dirty các ngày local của batch
+        để lần đọc sau tính lại từ dữ liệu gốc.
+        """
+        tz = get_timezone(settings.TIMEZONE)
+        days = {
+            ensure_utc(document["timestamp"]).astimezone(tz).date().isoformat()
+            for document in documents
+            if isinstance(document.get("timestamp"), datetime)
+        }
+        if days:
+            LOGGER.warning(f"Attendance batch failed, marking {len(days)} rollup days dirty")
+            await AttendanceRollupService.mark_dirty(days)
+
+    @staticmethod
+    async def mark_dirty(days: Iterable[str]) -> None:
+        """Đánh dấu các ngày cần tính lại rollup từ dữ liệu gốc."""
+        days = set(days)
+        if not days:
+            return
+
+        now = utc_now()
+        await AttendanceRollupDirtyDay.get_motor_collection().bulk_write(
+            [UpdateOne({"_id": day}, {"$set": {"marked_at": now}}, upsert=True) for day in days],
+            ordered=False,
+        )
+        _notify(days)
+
+    @staticmethod
+    async def refresh_dirty_days(start_day: date, end_day: date) -> List[str]:
+        """Tính lại các ngày dirty trong [start_day, end_day], trả về các ngày đã tính."""
+        collection = AttendanceRollupDirtyDay.get_motor_collection()
+        cursor = collection.find(
+            {"_id": {"$gte": start_day.isoformat(), "$lte": end_day.isoformat()}},
+            {"_id": 1},
+        ).sort("_id", 1)
+        days = [document["_id"] async for document in cursor]
+
+        refreshed: List[str] = []
+        for day in days:
+            # Xóa marker trước: lỗi cập nhật incremental trong lúc tính lại sẽ đánh dấu lại
+            await collection.delete_one({"_id": day})
+            try:
+                _, consistent = await AttendanceRollupService.recompute_day(date.fromisoformat(day))
+            except Exception:
+                await AttendanceRollupService.mark_dirty([day])
+                raise
+            if not consistent:
+                # Có batch incremental xen vào lúc tính lại: tính lại lần sau
+                await AttendanceRollupService.mark_dirty([day])
+            refreshed.append(day)
+
+        if refreshed:
+            _notify(set(refreshed))
+        return refreshed
+
+    @staticmethod
+    async def recompute_day(day: date) -> Tuple[int, bool]:
+        """
+        Tính lại toàn bộ rollup của một ngày từ collection attendances, trả về
+        (số ô đã ghi, rollup có nhất quán không).
+
+        Mỗi ô chỉ được ghi đè khi `version` chưa đổi kể từ lúc bắt đầu đọc, nên
+        batch incremental xen vào không bị `$set` xóa mất. Khi có batch như vậy
+        (trước hoặc sau lúc ghi) kết quả trả về `False` để ngày đó được đánh
+        dấu dirty và tính lại lần sau.
+        """
+        tz = get_timezone(settings.TIMEZONE)
+        start, end = local_day_bounds(day, tz)
+        day_key = day.isoformat()
+        collection = AttendanceDailyRollup.get_motor_collection()
+        versions = await _load_versions(collection, day_key)
+        cursor = Attendance.get_motor_collection().find(
+            {"timestamp": {"$gte": start, "$lt": end}},
+            {"_id": 0, "user_id": 1, "timestamp": 1},
+        ).batch_size(LOAD_BATCH_SIZE)
+
+        index_of: Dict[ObjectId, int] = {}
+        user_index: List[int] = []
+        timestamps: List[int] = []
+        async for document in cursor:
+            user_index.append(index_of.setdefault(document["user_id"], len(index_of)))
+            timestamps.append(int(ensure_utc(document["timestamp"]).timestamp()))
+
+        presence = compute_daily_presence(
+            np.fromiter(user_index, dtype=np.int64, count=len(user_index)),
+            np.fromiter(timestamps, dtype=np.int64, count=len(timestamps)),
+            local_day_starts(day, day, tz),
+        )
+
+        user_ids = list(index_of)
+        now = utc_now()
+        operations: List[Any] = [
+            UpdateOne(
+                {
+                    "user_id": user_ids[index],
+                    "day": day_key,
+                    "version": _version_filter(versions.get(user_ids[index], 0)),
+                },
+                {"$set": {
+                    "first_in": datetime.fromtimestamp(first_in, timezone.utc),
+                    "last_out": datetime.fromtimestamp(last_out, timezone.utc),
+                    "checkins": checkins,
+                    "updated_at": now,
+                }},
+                upsert=True,
+            )
+            for index, first_in, last_out, checkins in zip(
+                presence.user_index.tolist(),
+                presence.first_in.tolist(),
+                presence.last_out.tolist(),
+                presence.checkins.tolist(),
+            )
+        ]
+
+        written = len(operations)
+        # Ô không còn check-in nào (dữ liệu gốc đã bị xóa)
+        operations.extend(
+            DeleteOne({"user_id": user_id, "day": day_key, "version": _version_filter(version)})
+            for user_id, version in versions.items()
+            if user_id not in index_of
+        )
+
+        if operations:
+            try:
+                await collection.bulk_write(operations, ordered=False)
+            except BulkWriteError as exc:
+                # Lỗi trùng key: ô đã được batch incremental tạo/cập nhật trong
+                # lúc tính lại (filter theo version không khớp nên upsert chèn trùng)
+                if any(error.get("code") != 11000 for error in exc.details.get("writeErrors", [])):
+                    raise
+
+        current = await _load_versions(collection, day_key)
+        consistent = all(version == versions.get(user_id, 0) for user_id, version in current.items())
+        return written, consistent
+
+    @staticmethod
+    async def load_presence(
+        start_day: date,
+        end_day: date,
+        user_ids: Optional[List[ObjectId]] = None,
+    ) -> Tuple[DailyPresence, List[ObjectId]]:
+        """
+        Đọc rollup trong [start_day, end_day] thành DailyPresence (epoch giây).
+
+        `user_index` trỏ vào `user_ids` nếu có, ngược lại vào danh sách user
+        trả về kèm theo (theo thứ tự gặp). Đọc theo analytics read preference.
+        """
+        criteria: Dict[str, Any] = {"day": {"$gte": start_day.isoformat(), "$lte": end_day.isoformat()}}
+        if user_ids is not None:
+            criteria["user_id"] = {"$in": user_ids}
+
+        cursor = analytics_collection(AttendanceDailyRollup).find(
+            criteria,
+            {"_id": 0, "user_id": 1, "day": 1, "first_in": 1, "last_out": 1, "checkins": 1},
+        ).batch_size(LOAD_BATCH_SIZE)
+
+        index_of: Dict[ObjectId, int] = {user_id: index for index, user_id in enumerate(user_ids or [])}
+        user_index: List[int] = []
+        day_index: List[int] = []
+        first_in: List[int] = []
+        last_out: List[int] = []
+        checkins: List[int] = []
+        async for document in cursor:
+            user_index.append(index_of.setdefault(document["user_id"], len(index_of)))
+            day_index.append((date.fromisoformat(document["day"]) - start_day).days)
+            first_in.append(int(ensure_utc(document["first_in"]).timestamp()))
+            last_out.append(int(ensure_utc(document["last_out"]).timestamp()))
+            checkins.append(document["checkins"])
+
+        presence = DailyPresence(
+            user_index=np.array(user_index, dtype=np.int64),
+            day_index=np.array(day_index, dtype=np.int64),
+            first_in=np.array(first_in, dtype=np.int64),
+            last_out=np.array(last_out, dtype=np.int64),
+            checkins=np.array(checkins, dtype=np.int64),
+        )
+        return presence, list(index_of)
+
+
+async def _load_versions(collection: Any, day_key: str) -> Dict[ObjectId, int]:
+    """`version` của từng ô rollup trong một ngày (đọc từ primary)."""
+    cursor = collection.find({"day": day_key}, {"_id": 0, "user_id": 1, "version": 1})
+    return {document["user_id"]: document.get("version") or 0 async for document in cursor}
+
+
+def _version_filter(version: int) -> Any:
+    # Ô tạo trước khi có field version được coi là version 0
+    return version if version else {"$in": [0, None]}
+
+
+def _notify(days: Set[str]) -> None:
+    for listener in _listeners:
+        try:
+            listener(days)
+        except Exception as exc:
+            LOGGER.error(f"Attendance rollup listener failed: {exc}")
@@ -0,0 +1,20 @@
+# modules/auth/models/token.py
+from pydantic import BaseModel
+from typing import Optional
+from modules.users.common.user import UserRole
+
+# -----------------------------
+# Token Payload
+# -----------------------------
+class TokenPayload(BaseModel):
+    """Claims của access token đã verify"""
+    sub: str  # user id
+    role: UserRole = UserRole.USER
+    iat: int
+    exp: int
+    iss: Optional[str] = None
+
+# -----------------------------
+# Rebuild Model
+# -----------------------------
+TokenPayload.model_rebuild()
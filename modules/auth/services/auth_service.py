@@ -0,0 +1,86 @@
+# modules/auth/services/auth_service.py
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+import jwt
+from pydantic import ValidationError
+from core.config import settings
+from core.security import create_access_token, decode_access_token
+from modules.auth.models.token import TokenPayload
+from modules.auth.services.password_service import PasswordService
+from modules.users.models.user import User, UserView
+from utils.cache import TTLCache
+
+# -----------------------------
+# Verified Token Cache
+# -----------------------------
+# Token đã verify -> claims, để request lặp lại với cùng token không phải decode
+# và verify chữ ký lại. TTL của mỗi entry không vượt quá thời hạn của token.
+_verified_tokens: TTLCache[str, TokenPayload] = TTLCache(
+    max_size=settings.TOKEN_CACHE_MAX_SIZE,
+    ttl_seconds=settings.TOKEN_CACHE_TTL_SECONDS,
+)
+
+# -----------------------------
+# Auth Service
+# -----------------------------
+class AuthService:
+    """Auth Service"""
+
+    @staticmethod
+    async def authenticate(username: str, password: str) -> Optional[User]:
+        """
+        Kiểm tra username/mật khẩu, trả về User nếu đúng.
+
+        Mật khẩu plaintext cũ hoặc hash với tham số argon2 cũ được hash lại và
+        lưu ngay sau lần đăng nhập đúng.
+        """
+        user = await User.find_one(User.username == username)
+        if user is None:
+            # Vẫn chạy verify để thời gian phản hồi không lộ username có tồn tại
+            await PasswordService.verify(await PasswordService.default_password_hash(), settings.DEFAULT_PASSWORD)
+            return None
+
+        valid, new_hash = await PasswordService.verify(user.password, password)
+        if not valid:
+            return None
+
+        if new_hash is not None:
+            # Chỉ ghi nếu password chưa bị đổi trong lúc verify
+            await User.get_motor_collection().update_one(
+                {"_id": user.id, "password": user.password},
+                {"$set": {"password": new_hash}},
+            )
+            user.password = new_hash
+
+        return user
+
+    @staticmethod
+    def issue_token(user: User | UserView) -> Tuple[str, datetime]:
+        """Tạo access token cho user, trả về (token, thời điểm hết hạn)."""
+        return create_access_token(str(user.id), {"role": user.role.value})
+
+    @staticmethod
+    def verify_token(token: str) -> Optional[TokenPayload]:
+        """Claims của token nếu hợp lệ (ưu tiên cache), None nếu không."""
+        payload = _verified_tokens.get(token)
+        if payload is not None:
+            if payload.exp > time.time():
+                return payload
+            _verified_tokens.pop(token)
+            return None
+
+        try:
+            payload = TokenPayload.model_validate(decode_access_token(token))
+        except (jwt.InvalidTokenError, ValidationError):
+            return None
+
+        remaining = payload.exp - time.time()
+        if remaining > 0:
+            _verified_tokens.set(token, payload, ttl_seconds=min(remaining, settings.TOKEN_CACHE_TTL_SECONDS))
+        return payload
+
+    @staticmethod
+    def token_cache_stats() -> Dict[str, Any]:
+        """Số liệu cache token đã verify"""
+        return _verified_tokens.stats()
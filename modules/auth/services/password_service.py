@@ -0,0 +1,106 @@
+# modules/auth/services/password_service.py
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Optional, Tuple, TypeVar
+from core.config import settings
+from core.security import hash_password, password_needs_rehash, verify_password
+
+T = TypeVar("T")
+
+_executor: Optional[ThreadPoolExecutor] = None
+_slots: Optional[asyncio.Semaphore] = None
+_default_hash: Optional[str] = None
+
+# -----------------------------
+# Errors
+# -----------------------------
+class PasswordServiceBusyError(Exception):
+    """Quá nhiều thao tác hash/verify đang chờ (backpressure)."""
+
+# -----------------------------
+# Password Service
+# -----------------------------
+class PasswordService:
+    """
+    Hash/verify mật khẩu trên thread pool riêng có giới hạn.
+
+    argon2 chạy trong C và nhả GIL nên event loop vẫn phục vụ request khác trong
+    lúc hash. Pool có PASSWORD_HASH_WORKERS thread (không dùng chung default
+    executor) và tối đa PASSWORD_HASH_MAX_PENDING thao tác chờ; khi bị dồn
+    (login storm) request mới nhận `PasswordServiceBusyError` thay vì xếp hàng
+    vô hạn.
+    """
+
+    @staticmethod
+    async def start() -> None:
+        """Tạo thread pool và hash sẵn mật khẩu mặc định (lifespan startup)."""
+        global _executor, _slots
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.PASSWORD_HASH_WORKERS,
+                thread_name_prefix="password-hash",
+            )
+            _slots = asyncio.Semaphore(settings.PASSWORD_HASH_MAX_PENDING)
+        await PasswordService.default_password_hash()
+
+    @staticmethod
+    async def stop() -> None:
+        """Đóng thread pool (lifespan shutdown)."""
+        global _executor, _slots
+        executor, _executor, _slots = _executor, None, None
+        if executor is not None:
+            await asyncio.to_thread(executor.shutdown, wait=True, cancel_futures=True)
+
+    @staticmethod
+    async def hash(password: str) -> str:
+        """Hash mật khẩu"""
+        return await PasswordService._run(hash_password, password)
+
+    @staticmethod
+    async def verify(stored: str, password: str) -> Tuple[bool, Optional[str]]:
+        """
+        Kiểm tra mật khẩu, trả về (đúng/sai, hash mới).
+
+        Hash mới khác None khi mật khẩu đúng nhưng giá trị đang lưu là plaintext
+        hoặc hash với tham số cũ; caller lưu lại để nâng cấp dần khi đăng nhập.
+        """
+        return await PasswordService._run(_verify_and_rehash, stored, password)
+
+    @staticmethod
+    async def default_password_hash() -> str:
+        """
+        Hash của DEFAULT_PASSWORD, chỉ tính một lần cho mỗi process.
+
+        User mới dùng chung hash này nên tạo user không tốn thêm một lần argon2;
+        hash được thay bằng hash riêng khi user đổi mật khẩu.
+        """
+        global _default_hash
+        if _default_hash is None:
+            _default_hash = await PasswordService.hash(settings.DEFAULT_PASSWORD)
+        return _default_hash
+
+    @staticmethod
+    async def _run(fn: Callable[..., T], *args) -> T:
+        if _executor is None:
+            await PasswordService.start()
+
+        slots = _slots
+        try:
+            await asyncio.wait_for(slots.acquire(), timeout=settings.PASSWORD_HASH_QUEUE_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError as exc:
+            raise PasswordServiceBusyError("Too many pending password operations") from exc
+
+        try:
+            return await asyncio.get_running_loop().run_in_executor(_executor, partial(fn, *args))
+        finally:
+            slots.release()
+
+
+def _verify_and_rehash(stored: str, password: str) -> Tuple[bool, Optional[str]]:
+    """Verify và (nếu cần) hash lại trong cùng một lượt trên worker thread."""
+    if not verify_password(stored, password):
+        return False, None
+    if password_needs_rehash(stored):
+        return True, hash_password(password)
+    return True, None
@@ -0,0 +1,8 @@
+from enum import Enum
+
+#------------------------------
+# Face Embedding Change Operation
+#------------------------------
+class FaceChangeOp(str, Enum):
+    ADD = "add"
+    REMOVE_USER = "remove_user"
@@ -0,0 +1,25 @@
+# modules/faces/models/face_embedding.py
+from beanie import Document, PydanticObjectId
+from pydantic import Field
+from pymongo import ASCENDING, IndexModel
+from datetime import datetime, timezone
+
+# -----------------------------
+# Face Embedding Model
+# -----------------------------
+class FaceEmbedding(Document):
+    # Một user có thể có nhiều embedding (nhiều ảnh đăng ký)
+    user_id: PydanticObjectId
+    vector: bytes  # float32 little-endian, đã chuẩn hóa L2, dài FACE_EMBEDDING_DIM
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+    class Settings:
+        name = "face_embeddings"
+        indexes = [
+            IndexModel([("user_id", ASCENDING)], name="user_id"),
+        ]
+
+# -----------------------------
+# Rebuild Model
+# -----------------------------
+FaceEmbedding.model_rebuild()
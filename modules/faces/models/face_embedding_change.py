@@ -0,0 +1,34 @@
+# modules/faces/models/face_embedding_change.py
+from beanie import Document, PydanticObjectId
+from pydantic import Field
+from pymongo import ASCENDING, IndexModel
+from datetime import datetime, timezone
+from typing import List
+from core.config import settings
+from modules.faces.common.face import FaceChangeOp
+
+# -----------------------------
+# Face Embedding Change Model
+# -----------------------------
+class FaceEmbeddingChange(Document):
+    # Nhật ký thay đổi embedding để các worker áp lên snapshot (delta)
+    op: FaceChangeOp
+    user_id: PydanticObjectId
+    embedding_ids: List[PydanticObjectId] = Field(default_factory=list)
+    origin: str  # id process ghi, để worker bỏ qua thay đổi của chính nó
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+    class Settings:
+        name = "face_embedding_changes"
+        indexes = [
+            IndexModel(
+                [("created_at", ASCENDING)],
+                name="created_at_ttl",
+                expireAfterSeconds=settings.FACE_CHANGE_LOG_TTL_SECONDS,
+            ),
+        ]
+
+# -----------------------------
+# Rebuild Model
+# -----------------------------
+FaceEmbeddingChange.model_rebuild()
@@ -0,0 +1,308 @@
+# modules/faces/services/face_index.py
+import threading
+from typing import Any, Callable, Dict, Hashable, List, NamedTuple, Optional, Sequence, Set
+
+import numpy as np
+
+# -----------------------------
+# Result Types
+# -----------------------------
+class FaceMatch(NamedTuple):
+    """Một kết quả khớp: embedding gần probe nhất và user sở hữu."""
+    user_id: Hashable
+    embedding_id: Hashable
+    score: float  # cosine similarity trong [-1, 1]
+
+# -----------------------------
+# Helpers
+# -----------------------------
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """Chuẩn hóa L2 từng dòng (float32); dòng toàn 0 giữ nguyên."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if vectors.ndim == 1:
+        vectors = vectors[np.newaxis, :]
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+# -----------------------------
+# Face Index
+# -----------------------------
+class FaceIndex:
+    """
+    Index embedding trong bộ nhớ cho tìm kiếm cosine chính xác (brute force).
+
+    Tất cả embedding nằm trong một ma trận float32 liền mạch `capacity x dim`
+    (đã chuẩn hóa L2), nên cosine của cả batch probe là một phép nhân ma trận
+    và top-k lấy bằng `argpartition`. Ma trận tăng gấp đôi khi đầy (amortized
+    O(1) cho mỗi lần thêm); xóa bằng cách chuyển dòng cuối vào chỗ trống.
+
+    Ngoài ra index có thể có một segment gốc chỉ đọc (`set_base`), thường là
+    snapshot được `np.memmap` dùng chung page giữa các worker. Segment gốc
+    không bị sửa: xóa chỉ bật cờ trong mask riêng của worker, còn embedding mới
+    đi vào ma trận delta ở trên.
+
+    Lock bảo vệ ma trận khi search chạy trong thread pool song song với
+    add/remove. Search giữ lock trong suốt phép nhân ma trận nên add/remove
+    không được gọi trực tiếp trên event loop (FaceService chạy chúng trên một
+    thread riêng, giữ đúng thứ tự).
+    """
+
+    def __init__(self, dim: int, initial_capacity: int = 1024) -> None:
+        if dim <= 0:
+            raise ValueError("dim must be positive")
+
+        self.dim = dim
+        self._matrix = np.empty((max(1, initial_capacity), dim), dtype=np.float32)
+        self._size = 0
+        self._embedding_ids: List[Hashable] = []
+        self._user_ids: List[Hashable] = []
+        self._row_of: Dict[Hashable, int] = {}
+        self._rows_of_user: Dict[Hashable, Set[int]] = {}
+        self._lock = threading.RLock()
+
+        # Segment gốc (chỉ đọc), id lưu dạng bytes cố định và sắp xếp tăng dần
+        self._base_matrix: Optional[np.ndarray] = None
+        self._base_embedding_keys: Optional[np.ndarray] = None
+        self._base_user_keys: Optional[np.ndarray] = None
+        self._base_alive: Optional[np.ndarray] = None
+        self._base_removed = 0
+        # Số embedding còn lại của từng user trong segment gốc
+        self._base_counts: Dict[Hashable, int] = {}
+        self._encode: Callable[[Hashable], bytes] = bytes
+        self._decode: Callable[[bytes], Hashable] = bytes
+
+    def __len__(self) -> int:
+        return self._base_count() + self._size
+
+    @property
+    def capacity(self) -> int:
+        return self._matrix.shape[0]
+
+    def user_count(self) -> int:
+        # dict.copy() không bị thread ghi chen vào giữa như khi duyệt trực tiếp
+        return len(self._rows_of_user.copy().keys() | self._base_counts.copy().keys())
+
+    def embedding_count(self, user_id: Hashable) -> int:
+        return len(self._rows_of_user.get(user_id, ())) + self._base_counts.get(user_id, 0)
+
+    def set_base(
+        self,
+        matrix: np.ndarray,
+        embedding_keys: np.ndarray,
+        user_keys: np.ndarray,
+        encode: Callable[[Hashable], bytes],
+        decode: Callable[[bytes], Hashable],
+    ) -> None:
+        """
+        Gắn segment gốc chỉ đọc (thay segment cũ, giữ nguyên delta).
+
+        `matrix` phải đã chuẩn hóa L2; `embedding_keys` là mảng bytes cố định
+        (vd: dtype S12) sắp xếp tăng dần, cùng thứ tự dòng với `matrix`.
+        `encode`/`decode` chuyển giữa id và key bytes (numpy bỏ các byte 0 ở cuối
+        key nên `decode` phải tự pad lại).
+        """
+        if matrix.ndim != 2 or matrix.shape[1] != self.dim:
+            raise ValueError(f"Base matrix must have shape (n, {self.dim})")
+        if not (len(matrix) == len(embedding_keys) == len(user_keys)):
+            raise ValueError("Base matrix and keys must have the same length")
+
+        with self._lock:
+            self._base_matrix = matrix
+            self._base_embedding_keys = embedding_keys
+            self._base_user_keys = user_keys
+            self._base_alive = np.ones(len(matrix), dtype=bool)
+            self._base_removed = 0
+            self._encode = encode
+            self._decode = decode
+            user_keys, counts = np.unique(user_keys, return_counts=True)
+            self._base_counts = dict(zip(map(decode, user_keys.tolist()), counts.tolist()))
+
+            # Embedding đã có trong delta thì bản delta được ưu tiên
+            self._mask_base(list(self._row_of))
+
+    def add(
+        self,
+        embedding_ids: Sequence[Hashable],
+        user_ids: Sequence[Hashable],
+        vectors: np.ndarray,
+    ) -> None:
+        """Thêm (hoặc thay thế) các embedding; `vectors` có shape (n, dim)."""
+        vectors = normalize_rows(vectors)
+        if vectors.shape != (len(embedding_ids), self.dim) or len(user_ids) != len(embedding_ids):
+            raise ValueError(f"Expected {len(embedding_ids)} vectors of dim {self.dim}")
+
+        with self._lock:
+            self._mask_base(embedding_ids)
+            existing = [embedding_id for embedding_id in embedding_ids if embedding_id in self._row_of]
+            if existing:
+                self.remove(existing)
+
+            self._reserve(self._size + len(embedding_ids))
+            start = self._size
+            self._matrix[start:start + len(embedding_ids)] = vectors
+            for offset, (embedding_id, user_id) in enumerate(zip(embedding_ids, user_ids)):
+                row = start + offset
+                self._embedding_ids.append(embedding_id)
+                self._user_ids.append(user_id)
+                self._row_of[embedding_id] = row
+                self._rows_of_user.setdefault(user_id, set()).add(row)
+            self._size += len(embedding_ids)
+
+    def remove(self, embedding_ids: Sequence[Hashable]) -> int:
+        """Xóa các embedding theo id, trả về số embedding đã xóa."""
+        with self._lock:
+            removed = self._mask_base(embedding_ids)
+            for embedding_id in embedding_ids:
+                row = self._row_of.pop(embedding_id, None)
+                if row is None:
+                    continue
+                self._remove_row(row)
+                removed += 1
+        return removed
+
+    def remove_user(self, user_id: Hashable) -> int:
+        """Xóa toàn bộ embedding của một user."""
+        with self._lock:
+            removed = 0
+            if self._base_matrix is not None:
+                base_rows = np.flatnonzero(self._base_alive & (self._base_user_keys == self._encode(user_id)))
+                self._base_alive[base_rows] = False
+                self._base_removed += base_rows.size
+                removed += base_rows.size
+                self._base_counts.pop(user_id, None)
+
+            rows = self._rows_of_user.get(user_id)
+            if rows:
+                removed += self.remove([self._embedding_ids[row] for row in sorted(rows)])
+            return removed
+
+    def search(self, probes: np.ndarray, k: int = 1) -> List[List[FaceMatch]]:
+        """
+        Top-k embedding gần nhất (cosine) cho từng probe, giảm dần theo score.
+
+        Một phép nhân `(n, dim) @ (dim, size)` cho cả batch, sau đó
+        `argpartition` O(size) mỗi probe thay vì sắp xếp toàn bộ.
+        """
+        probes = normalize_rows(probes)
+        if probes.shape[1] != self.dim:
+            raise ValueError(f"Probe dim {probes.shape[1]} does not match index dim {self.dim}")
+
+        with self._lock:
+            base_size = len(self._base_matrix) if self._base_matrix is not None else 0
+            size = base_size + self._size
+            if len(self) == 0 or k <= 0:
+                return [[] for _ in range(probes.shape[0])]
+
+            if base_size and self._size:
+                scores = np.empty((probes.shape[0], size), dtype=np.float32)
+                np.matmul(probes, self._base_matrix.T, out=scores[:, :base_size])
+                np.matmul(probes, self._matrix[:self._size].T, out=scores[:, base_size:])
+            elif base_size:
+                scores = probes @ self._base_matrix.T
+            else:
+                scores = probes @ self._matrix[:size].T
+            if self._base_removed:
+                scores[:, :base_size][:, ~self._base_alive] = -np.inf
+
+            k = min(k, size)
+            if k < size:
+                top = np.argpartition(scores, -k, axis=1)[:, -k:]
+            else:
+                top = np.broadcast_to(np.arange(size), (probes.shape[0], size))
+            top_scores = np.take_along_axis(scores, top, axis=1)
+            order = np.argsort(-top_scores, axis=1)
+            top = np.take_along_axis(top, order, axis=1)
+            top_scores = np.take_along_axis(top_scores, order, axis=1)
+
+            return [
+                [
+                    self._match(row, base_size, score)
+                    for row, score in zip(rows.tolist(), row_scores.tolist())
+                    if score != -np.inf
+                ]
+                for rows, row_scores in zip(top, top_scores)
+            ]
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "embeddings": len(self),
+            "users": self.user_count(),
+            "capacity": self.capacity,
+            "dim": self.dim,
+            "matrix_bytes": self._matrix.nbytes,
+            "base_embeddings": len(self._base_matrix) if self._base_matrix is not None else 0,
+            "base_removed": self._base_removed,
+            "delta_embeddings": self._size,
+        }
+
+    def _base_count(self) -> int:
+        if self._base_matrix is None:
+            return 0
+        return len(self._base_matrix) - self._base_removed
+
+    def _match(self, row: int, base_size: int, score: float) -> FaceMatch:
+        if row < base_size:
+            return FaceMatch(
+                self._decode(bytes(self._base_user_keys[row])),
+                self._decode(bytes(self._base_embedding_keys[row])),
+                score,
+            )
+        row -= base_size
+        return FaceMatch(self._user_ids[row], self._embedding_ids[row], score)
+
+    def _mask_base(self, embedding_ids: Sequence[Hashable]) -> int:
+        """Đánh dấu đã xóa các embedding thuộc segment gốc, trả về số dòng bị ẩn."""
+        if self._base_matrix is None or not len(embedding_ids):
+            return 0
+
+        base_keys = self._base_embedding_keys
+        keys = np.array([self._encode(embedding_id) for embedding_id in embedding_ids], dtype=base_keys.dtype)
+        rows = np.searchsorted(base_keys, keys)
+        found = rows < len(base_keys)
+        rows, keys = rows[found], keys[found]
+        rows = rows[base_keys[rows] == keys]
+        rows = np.unique(rows[self._base_alive[rows]])
+        self._base_alive[rows] = False
+        self._base_removed += rows.size
+        user_keys, counts = np.unique(self._base_user_keys[rows], return_counts=True)
+        for user_id, count in zip(map(self._decode, user_keys.tolist()), counts.tolist()):
+            remaining = self._base_counts.get(user_id, 0) - count
+            if remaining > 0:
+                self._base_counts[user_id] = remaining
+            else:
+                self._base_counts.pop(user_id, None)
+        return int(rows.size)
+
+    def _reserve(self, required: int) -> None:
+        capacity = self.capacity
+        if required <= capacity:
+            return
+        while capacity < required:
+            capacity *= 2
+        matrix = np.empty((capacity, self.dim), dtype=np.float32)
+        matrix[:self._size] = self._matrix[:self._size]
+        self._matrix = matrix
+
+    def _remove_row(self, row: int) -> None:
+        last = self._size - 1
+        user_id = self._user_ids[row]
+        rows = self._rows_of_user[user_id]
+        rows.discard(row)
+        if not rows:
+            del self._rows_of_user[user_id]
+
+        if row != last:
+            moved_embedding = self._embedding_ids[last]
+            moved_user = self._user_ids[last]
+            self._matrix[row] = self._matrix[last]
+            self._embedding_ids[row] = moved_embedding
+            self._user_ids[row] = moved_user
+            self._row_of[moved_embedding] = row
+            moved_rows = self._rows_of_user[moved_user]
+            moved_rows.discard(last)
+            moved_rows.add(row)
+
+        self._embedding_ids.pop()
+        self._user_ids.pop()
+        self._size = last
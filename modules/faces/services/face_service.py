@@ -0,0 +1,325 @@
+# modules/faces/services/face_service.py
+import asyncio
+import os
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from functools import partial
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from bson import Binary, ObjectId
+from core.config import settings
+from core.logging import LOGGER
+from modules.faces.common.face import FaceChangeOp
+from modules.faces.models.face_embedding import FaceEmbedding
+from modules.faces.models.face_embedding_change import FaceEmbeddingChange
+from modules.faces.services.face_index import FaceIndex, normalize_rows
+from modules.faces.services.face_snapshot import (
+    SnapshotManifest,
+    SnapshotWriter,
+    load_snapshot,
+    read_manifest,
+    snapshot_lock,
+)
+from utils.time import ensure_utc, utc_now
+
+LOAD_BATCH_SIZE = 5000
+
+# (user_id, score) của user khớp nhất cho mỗi probe
+UserMatch = Tuple[str, float]
+
+# Id của process, để bỏ qua thay đổi do chính worker này ghi vào change log
+_origin = uuid.uuid4().hex
+
+_index = FaceIndex(
+    dim=settings.FACE_EMBEDDING_DIM,
+    initial_capacity=settings.FACE_INDEX_INITIAL_CAPACITY,
+)
+# add/remove trên index chạy trên một thread riêng: search giữ lock của index
+# trong lúc nhân ma trận, chờ lock trên event loop sẽ chặn cả loop. Một thread
+# duy nhất giữ đúng thứ tự các thay đổi.
+_index_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="face-index-writer")
+_poller: Optional[asyncio.Task] = None
+_applied_changes: Dict[ObjectId, datetime] = {}
+
+# -----------------------------
+# Errors
+# -----------------------------
+class EmbeddingLimitError(Exception):
+    """User đã đủ số embedding cho phép."""
+
+# -----------------------------
+# Face Service
+# -----------------------------
+class FaceService:
+    """
+    Face Service
+
+    Embedding được lưu ở collection face_embeddings. Khi khởi động, mỗi worker
+    map snapshot `.npy` dùng chung (dựng lại nếu cũ) làm segment gốc của
+    FaceIndex rồi áp các thay đổi sau snapshot từ face_embedding_changes; một
+    task nền tiếp tục đọc change log để thấy enroll/xóa từ worker khác.
+    """
+
+    @staticmethod
+    async def start() -> None:
+        """Map snapshot, áp delta và chạy task đọc change log (lifespan startup)."""
+        global _poller
+        started = time.perf_counter()
+
+        manifest = await FaceService._ensure_snapshot()
+        if manifest.count:
+            snapshot = await asyncio.to_thread(load_snapshot, settings.FACE_SNAPSHOT_DIR, manifest)
+            _index.set_base(
+                snapshot.matrix,
+                snapshot.embedding_keys,
+                snapshot.user_keys,
+                encode=_encode_id,
+                decode=_decode_id,
+            )
+
+        replay_started = utc_now()
+        applied = await FaceService._apply_changes(manifest.started_at, skip_own=False)
+        LOGGER.info(
+            f"Face index ready in {time.perf_counter() - started:.2f}s: snapshot v{manifest.version} "
+            f"({manifest.count} embeddings) + {applied} changes"
+        )
+
+        if _poller is None:
+            _poller = asyncio.create_task(FaceService._poll_changes(replay_started), name="face-change-poller")
+
+    @staticmethod
+    async def stop() -> None:
+        """Dừng task đọc change log (lifespan shutdown)."""
+        global _poller
+        poller, _poller = _poller, None
+        if poller is not None:
+            poller.cancel()
+            await asyncio.gather(poller, return_exceptions=True)
+
+    @staticmethod
+    async def build_snapshot(previous: Optional[SnapshotManifest] = None) -> SnapshotManifest:
+        """
+        Dựng snapshot mới từ collection face_embeddings (gọi khi đang giữ
+        `snapshot_lock`). Đọc theo batch và ghi thẳng xuống file nên bộ nhớ chỉ
+        giữ một batch.
+        """
+        started_at = utc_now()
+        collection = FaceEmbedding.get_motor_collection()
+        count = await collection.count_documents({})
+        version = previous.version + 1 if previous else 1
+        writer = await asyncio.to_thread(
+            SnapshotWriter, settings.FACE_SNAPSHOT_DIR, version, count, settings.FACE_EMBEDDING_DIM,
+        )
+
+        try:
+            # Sắp theo _id để key tăng dần (tra cứu bằng searchsorted); embedding
+            # thêm sau `count` sẽ được áp từ change log.
+            cursor = collection.find(
+                {},
+                {"_id": 1, "user_id": 1, "vector": 1},
+            ).sort("_id", 1).limit(count).batch_size(LOAD_BATCH_SIZE)
+
+            batch: List[Dict[str, Any]] = []
+            async for document in cursor:
+                batch.append(document)
+                if len(batch) >= LOAD_BATCH_SIZE:
+                    await asyncio.to_thread(writer.write, *_to_arrays(batch))
+                    batch = []
+            if batch:
+                await asyncio.to_thread(writer.write, *_to_arrays(batch))
+
+            return await asyncio.to_thread(writer.commit, started_at)
+        except BaseException:
+            await asyncio.to_thread(writer.abort)
+            raise
+
+    @staticmethod
+    async def enroll(user_id: str, vectors: List[List[float]]) -> List[str]:
+        """Thêm embedding cho user, trả về id các embedding đã tạo."""
+        owner = ObjectId(user_id)
+        if _index.embedding_count(owner) + len(vectors) > settings.FACE_MAX_EMBEDDINGS_PER_USER:
+            raise EmbeddingLimitError(
+                f"User {user_id} cannot have more than {settings.FACE_MAX_EMBEDDINGS_PER_USER} embeddings"
+            )
+
+        matrix = normalize_rows(np.asarray(vectors, dtype=np.float32))
+        now = utc_now()
+        documents = [
+            {
+                "_id": ObjectId(),
+                "user_id": owner,
+                "vector": Binary(row.astype("<f4").tobytes()),
+                "created_at": now,
+            }
+            for row in matrix
+        ]
+        await FaceEmbedding.get_motor_collection().insert_many(documents, ordered=True)
+
+        embedding_ids = [document["_id"] for document in documents]
+        await FaceService._log_change(FaceChangeOp.ADD, owner, embedding_ids)
+        await _update_index(_index.add, embedding_ids, [owner] * len(documents), matrix)
+        return [str(embedding_id) for embedding_id in embedding_ids]
+
+    @staticmethod
+    async def remove_user(user_id: Any) -> int:
+        """Xóa toàn bộ embedding của user (khi xóa user hoặc đăng ký lại)."""
+        owner = ObjectId(str(user_id))
+        result = await FaceEmbedding.get_motor_collection().delete_many({"user_id": owner})
+        await FaceService._log_change(FaceChangeOp.REMOVE_USER, owner)
+        await _update_index(_index.remove_user, owner)
+        return result.deleted_count
+
+    @staticmethod
+    async def search(
+        probes: List[List[float]],
+        k: int = 1,
+        threshold: float = 0.0,
+    ) -> List[List[UserMatch]]:
+        """
+        Top-k user khớp nhất cho từng probe (score >= threshold).
+
+        Một user có nhiều embedding chỉ xuất hiện một lần với score cao nhất.
+        Phép nhân ma trận chạy trong thread pool để không chặn event loop.
+        """
+        matrix = np.asarray(probes, dtype=np.float32)
+        candidates = k * settings.FACE_MAX_EMBEDDINGS_PER_USER
+        results = await asyncio.to_thread(_index.search, matrix, candidates)
+
+        matches: List[List[UserMatch]] = []
+        for probe_matches in results:
+            users: List[UserMatch] = []
+            seen = set()
+            for match in probe_matches:
+                if match.score < threshold or len(users) >= k:
+                    break
+                if match.user_id in seen:
+                    continue
+                seen.add(match.user_id)
+                users.append((str(match.user_id), match.score))
+            matches.append(users)
+        return matches
+
+    @staticmethod
+    def index_metrics() -> Dict[str, Any]:
+        """Số liệu face index"""
+        return _index.metrics()
+
+    @staticmethod
+    async def _ensure_snapshot() -> SnapshotManifest:
+        """Trả về snapshot còn dùng được, dựng lại (một worker) nếu quá cũ."""
+        directory = settings.FACE_SNAPSHOT_DIR
+        await asyncio.to_thread(os.makedirs, directory, exist_ok=True)
+
+        lock = snapshot_lock(directory)
+        await asyncio.to_thread(lock.__enter__)
+        try:
+            manifest = await asyncio.to_thread(read_manifest, directory)
+            if manifest is not None and await FaceService._is_fresh(manifest):
+                return manifest
+            return await FaceService.build_snapshot(manifest)
+        finally:
+            await asyncio.to_thread(lock.__exit__, None, None, None)
+
+    @staticmethod
+    async def _is_fresh(manifest: SnapshotManifest) -> bool:
+        if manifest.dim != settings.FACE_EMBEDDING_DIM:
+            return False
+        if utc_now() - ensure_utc(manifest.started_at) > timedelta(seconds=settings.FACE_SNAPSHOT_MAX_AGE_SECONDS):
+            return False
+        changes = await FaceEmbeddingChange.get_motor_collection().count_documents(
+            {"created_at": {"$gte": manifest.started_at}},
+            limit=settings.FACE_SNAPSHOT_MAX_DELTA,
+        )
+        return changes < settings.FACE_SNAPSHOT_MAX_DELTA
+
+    @staticmethod
+    async def _log_change(op: FaceChangeOp, user_id: ObjectId, embedding_ids: Optional[List[ObjectId]] = None) -> None:
+        change_id = ObjectId()
+        now = utc_now()
+        await FaceEmbeddingChange.get_motor_collection().insert_one({
+            "_id": change_id,
+            "op": op.value,
+            "user_id": user_id,
+            "embedding_ids": embedding_ids or [],
+            "origin": _origin,
+            "created_at": now,
+        })
+        _applied_changes[change_id] = now
+
+    @staticmethod
+    async def _apply_changes(since: datetime, skip_own: bool = True) -> int:
+        """
+        Áp các thay đổi từ `since` (lùi thêm FACE_DELTA_OVERLAP_SECONDS để không
+        sót bản ghi có created_at trễ) theo thứ tự ghi; thay đổi đã áp được bỏ qua.
+        """
+        since = ensure_utc(since) - timedelta(seconds=settings.FACE_DELTA_OVERLAP_SECONDS)
+        cursor = FaceEmbeddingChange.get_motor_collection().find(
+            {"created_at": {"$gte": since}},
+        ).sort("_id", 1)
+
+        applied = 0
+        async for change in cursor:
+            if change["_id"] in _applied_changes or (skip_own and change["origin"] == _origin):
+                continue
+
+            if change["op"] == FaceChangeOp.ADD.value:
+                embeddings = await FaceEmbedding.get_motor_collection().find(
+                    {"_id": {"$in": change["embedding_ids"]}},
+                    {"_id": 1, "user_id": 1, "vector": 1},
+                ).to_list(length=None)
+                if embeddings:
+                    await _update_index(
+                        _index.add,
+                        [document["_id"] for document in embeddings],
+                        [document["user_id"] for document in embeddings],
+                        _to_arrays(embeddings)[0],
+                    )
+            elif change["op"] == FaceChangeOp.REMOVE_USER.value:
+                await _update_index(_index.remove_user, change["user_id"])
+
+            _applied_changes[change["_id"]] = ensure_utc(change["created_at"])
+            applied += 1
+
+        # Chỉ cần nhớ các thay đổi còn nằm trong cửa sổ đọc chồng
+        for change_id, created_at in list(_applied_changes.items()):
+            if created_at < since:
+                del _applied_changes[change_id]
+        return applied
+
+    @staticmethod
+    async def _poll_changes(since: datetime) -> None:
+        while True:
+            await asyncio.sleep(settings.FACE_DELTA_POLL_SECONDS)
+            polled_at = utc_now()
+            try:
+                await FaceService._apply_changes(since)
+                since = polled_at
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                LOGGER.error(f"Face change log poll failed: {exc}")
+
+
+async def _update_index(fn: Any, *args: Any) -> Any:
+    return await asyncio.get_running_loop().run_in_executor(_index_writer, partial(fn, *args))
+
+
+def _encode_id(value: Any) -> bytes:
+    return ObjectId(str(value)).binary
+
+
+def _decode_id(key: bytes) -> ObjectId:
+    return ObjectId(key.ljust(12, b"\x00"))
+
+
+def _to_arrays(documents: List[Dict[str, Any]]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Chuyển document Mongo thành (ma trận float32, key embedding, key user)."""
+    matrix = np.frombuffer(
+        b"".join(bytes(document["vector"]) for document in documents),
+        dtype="<f4",
+    ).reshape(len(documents), settings.FACE_EMBEDDING_DIM)
+    embedding_keys = np.array([document["_id"].binary for document in documents], dtype="S12")
+    user_keys = np.array([document["user_id"].binary for document in documents], dtype="S12")
+    return matrix, embedding_keys, user_keys
@@ -0,0 +1,181 @@
+# modules/faces/services/face_snapshot.py
+import glob
+import json
+import os
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Iterator, NamedTuple, Optional
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows: chỉ chạy một process
+    fcntl = None
+
+MANIFEST_NAME = "manifest.json"
+LOCK_NAME = "snapshot.lock"
+ID_DTYPE = np.dtype([("embedding_id", "S12"), ("user_id", "S12")])
+
+# -----------------------------
+# Snapshot Types
+# -----------------------------
+class SnapshotManifest(NamedTuple):
+    """Mô tả snapshot hiện hành (manifest.json)."""
+    version: int
+    count: int
+    dim: int
+    started_at: datetime  # thời điểm bắt đầu đọc Mongo; delta được áp từ mốc này
+    matrix_file: str
+    ids_file: str
+
+class FaceSnapshot(NamedTuple):
+    """Snapshot đã map vào bộ nhớ (chỉ đọc)."""
+    manifest: SnapshotManifest
+    matrix: np.ndarray          # (count, dim) float32, đã chuẩn hóa L2
+    embedding_keys: np.ndarray  # S12, tăng dần
+    user_keys: np.ndarray       # S12
+
+# -----------------------------
+# Read
+# -----------------------------
+def read_manifest(directory: str) -> Optional[SnapshotManifest]:
+    """Đọc manifest, None nếu chưa có snapshot."""
+    try:
+        with open(os.path.join(directory, MANIFEST_NAME), "r", encoding="utf-8") as handle:
+            data = json.load(handle)
+    except FileNotFoundError:
+        return None
+
+    return SnapshotManifest(
+        version=data["version"],
+        count=data["count"],
+        dim=data["dim"],
+        started_at=datetime.fromisoformat(data["started_at"]),
+        matrix_file=data["matrix_file"],
+        ids_file=data["ids_file"],
+    )
+
+
+def load_snapshot(directory: str, manifest: SnapshotManifest) -> FaceSnapshot:
+    """
+    Map snapshot read-only bằng `np.load(mmap_mode="r")`.
+
+    Các worker map cùng file nên dùng chung page cache của OS: dữ liệu chỉ được
+    đọc từ đĩa khi cần và không bị nhân bản theo số worker.
+    """
+    matrix = np.load(os.path.join(directory, manifest.matrix_file), mmap_mode="r")[:manifest.count]
+    ids = np.load(os.path.join(directory, manifest.ids_file), mmap_mode="r")[:manifest.count]
+    return FaceSnapshot(
+        manifest=manifest,
+        matrix=matrix,
+        embedding_keys=ids["embedding_id"],
+        user_keys=ids["user_id"],
+    )
+
+# -----------------------------
+# Lock
+# -----------------------------
+@contextmanager
+def snapshot_lock(directory: str) -> Iterator[None]:
+    """
+    Khóa độc quyền giữa các process (flock) khi kiểm tra/dựng snapshot, để chỉ
+    một worker dựng còn các worker khác chờ rồi dùng lại kết quả.
+    """
+    if fcntl is None:
+        yield
+        return
+
+    with open(os.path.join(directory, LOCK_NAME), "a+b") as handle:
+        fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+
+# -----------------------------
+# Write
+# -----------------------------
+class SnapshotWriter:
+    """
+    Ghi snapshot phiên bản mới theo từng batch thẳng vào file `.npy` (qua
+    memmap, không giữ cả ma trận trong RAM). File dữ liệu mang số phiên bản nên
+    không đè lên snapshot đang được worker khác map; snapshot chỉ có hiệu lực
+    khi `commit` thay manifest bằng `os.replace` (nguyên tử).
+    """
+
+    def __init__(self, directory: str, version: int, capacity: int, dim: int) -> None:
+        self.directory = directory
+        self.version = version
+        self.dim = dim
+        self.count = 0
+        self.matrix_file = f"embeddings-v{version}.npy"
+        self.ids_file = f"embeddings-v{version}.ids.npy"
+
+        # open_memmap không map được mảng rỗng, dành sẵn ít nhất một dòng
+        capacity = max(1, capacity)
+        self._matrix = np.lib.format.open_memmap(
+            os.path.join(directory, self.matrix_file), mode="w+", dtype=np.float32, shape=(capacity, dim),
+        )
+        self._ids = np.lib.format.open_memmap(
+            os.path.join(directory, self.ids_file), mode="w+", dtype=ID_DTYPE, shape=(capacity,),
+        )
+
+    @property
+    def capacity(self) -> int:
+        return self._matrix.shape[0]
+
+    def write(self, matrix: np.ndarray, embedding_keys: np.ndarray, user_keys: np.ndarray) -> int:
+        """Ghi một batch (đã sắp theo embedding id), trả về số dòng đã ghi."""
+        size = min(len(matrix), self.capacity - self.count)
+        end = self.count + size
+        self._matrix[self.count:end] = matrix[:size]
+        self._ids["embedding_id"][self.count:end] = embedding_keys[:size]
+        self._ids["user_id"][self.count:end] = user_keys[:size]
+        self.count = end
+        return size
+
+    def commit(self, started_at: datetime) -> SnapshotManifest:
+        """Flush dữ liệu xuống đĩa rồi công bố manifest mới."""
+        self._matrix.flush()
+        self._ids.flush()
+        del self._matrix, self._ids
+
+        manifest = SnapshotManifest(
+            version=self.version,
+            count=self.count,
+            dim=self.dim,
+            started_at=started_at,
+            matrix_file=self.matrix_file,
+            ids_file=self.ids_file,
+        )
+        path = os.path.join(self.directory, MANIFEST_NAME)
+        with open(f"{path}.tmp", "w", encoding="utf-8") as handle:
+            json.dump({**manifest._asdict(), "started_at": started_at.isoformat()}, handle)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(f"{path}.tmp", path)
+
+        _remove_old_versions(self.directory, keep={self.version, self.version - 1})
+        return manifest
+
+    def abort(self) -> None:
+        """Bỏ snapshot đang ghi dở."""
+        del self._matrix, self._ids
+        for name in (self.matrix_file, self.ids_file):
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                pass
+
+
+def _remove_old_versions(directory: str, keep: set[int]) -> None:
+    """
+    Xóa file của các phiên bản cũ. Worker đang map file đã xóa vẫn đọc được
+    (inode còn sống đến khi unmap) nên giữ lại một phiên bản trước là đủ.
+    """
+    for path in glob.glob(os.path.join(directory, "embeddings-v*.npy")):
+        name = os.path.basename(path)
+        version = name[len("embeddings-v"):].split(".", 1)[0]
+        if version.isdigit() and int(version) not in keep:
+            os.remove(path)
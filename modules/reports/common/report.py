@@ -0,0 +1,23 @@
+from enum import Enum
+
+#------------------------------
+# Report Type
+#------------------------------
+class ReportType(str, Enum):
+    MONTHLY_ATTENDANCE = "monthly_attendance"
+
+#------------------------------
+# Report Status
+#------------------------------
+class ReportStatus(str, Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+#------------------------------
+# Report File Format
+#------------------------------
+class ReportFormat(str, Enum):
+    CSV = "csv"
+    XLSX = "xlsx"
@@ -0,0 +1,43 @@
+# modules/reports/models/report_job.py
+from beanie import Document, PydanticObjectId
+from pydantic import Field
+from pymongo import ASCENDING, IndexModel
+from datetime import date, datetime, timezone
+from typing import List, Optional
+from modules.reports.common.report import ReportFormat, ReportStatus, ReportType
+
+# -----------------------------
+# Report Job Model
+# -----------------------------
+class ReportJob(Document):
+    # Tham số báo cáo
+    report_type: ReportType = ReportType.MONTHLY_ATTENDANCE
+    start_day: date
+    end_day: date  # inclusive
+    user_ids: Optional[List[PydanticObjectId]] = None  # None = toàn bộ user
+    file_format: ReportFormat = ReportFormat.CSV
+
+    # Trạng thái xử lý
+    status: ReportStatus = ReportStatus.PENDING
+    progress: float = 0.0
+    processed_users: int = 0
+    total_users: int = 0
+    rows: int = 0
+    file_path: Optional[str] = None
+    error: Optional[str] = None
+
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    heartbeat_at: Optional[datetime] = None
+
+    class Settings:
+        name = "report_jobs"
+        indexes = [
+            IndexModel([("status", ASCENDING), ("created_at", ASCENDING)], name="status_created_at"),
+        ]
+
+# -----------------------------
+# Rebuild Model
+# -----------------------------
+ReportJob.model_rebuild()
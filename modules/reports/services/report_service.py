@@ -0,0 +1,448 @@
+# modules/reports/services/report_service.py
+import asyncio
+import os
+from datetime import date, datetime, timedelta
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+import numpy as np
+from beanie import PydanticObjectId
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import ReturnDocument
+from core.config import settings
+from core.logging import LOGGER
+from modules.attendances.services.rollup_service import AttendanceRollupService
+from modules.reports.common.report import ReportFormat, ReportStatus
+from modules.reports.models.report_job import ReportJob
+from modules.reports.services.report_worker import ReportWorkerPool, WorkerQueueFullError
+from modules.reports.services.worktime import WorkSchedule, compute_daily_metrics
+from modules.users.models.user import User, UserView
+from utils.cache import TTLCache
+from utils.export import ExportFormat, write_rows_to_file
+from core.read_preference import analytics_to_list
+from utils.pagination import paginate_by_id
+from utils.time import get_timezone, local_day_starts, utc_now
+
+REPORT_COLUMNS = (
+    "user_id", "username", "name", "day",
+    "first_in", "last_out", "checkins", "worked_hours",
+    "late_minutes", "early_leave_minutes",
+)
+
+# (start_day, end_day, user_ids đã sắp xếp hoặc None) -> tổng hợp theo ngày
+SummaryKey = Tuple[str, str, Optional[Tuple[str, ...]]]
+
+# Mỗi worker có cache riêng và chỉ tự xóa entry khi rollup đổi trong chính
+# worker đó; check-in ghi bởi worker khác chỉ được thấy sau tối đa
+# REPORT_SUMMARY_CACHE_TTL_SECONDS.
+_summary_cache: TTLCache[SummaryKey, List[Dict[str, Any]]] = TTLCache(
+    max_size=settings.REPORT_SUMMARY_CACHE_MAX_SIZE,
+    ttl_seconds=settings.REPORT_SUMMARY_CACHE_TTL_SECONDS,
+)
+
+# Task nền xóa job/file báo cáo quá hạn
+_cleaner: Optional[asyncio.Task] = None
+
+# -----------------------------
+# Report Service
+# -----------------------------
+class ReportService:
+    """Report Service"""
+
+    @staticmethod
+    async def start() -> None:
+        """Khởi động worker pool và nhận lại các job chưa xong (lifespan startup)."""
+        os.makedirs(settings.REPORT_OUTPUT_DIR, exist_ok=True)
+        AttendanceRollupService.add_listener(_invalidate_summary_days)
+        await _pool.start()
+        await ReportService._recover_jobs()
+
+        global _cleaner
+        if _cleaner is None:
+            _cleaner = asyncio.create_task(ReportService._cleanup_loop(), name="report-cleanup")
+
+    @staticmethod
+    async def stop() -> None:
+        """Dừng worker pool và task dọn báo cáo (lifespan shutdown)."""
+        global _cleaner
+        cleaner, _cleaner = _cleaner, None
+        if cleaner is not None:
+            cleaner.cancel()
+            await asyncio.gather(cleaner, return_exceptions=True)
+        await _pool.stop()
+
+    @staticmethod
+    async def submit_job(
+        start_day: date,
+        end_day: date,
+        user_ids: Optional[List[str]] = None,
+        file_format: ReportFormat = ReportFormat.CSV,
+    ) -> ReportJob:
+        """Tạo job báo cáo và đưa vào hàng đợi; raise WorkerQueueFullError nếu đầy."""
+        if not _pool.has_capacity():
+            raise WorkerQueueFullError("Report queue is full")
+
+        job = ReportJob(
+            start_day=start_day,
+            end_day=end_day,
+            user_ids=[PydanticObjectId(user_id) for user_id in user_ids] if user_ids else None,
+            file_format=file_format,
+        )
+        await job.insert()
+        try:
+            _pool.enqueue(str(job.id))
+        except WorkerQueueFullError:
+            # Client nhận 503 nên job không được để lại ở trạng thái pending
+            await ReportJob.get_motor_collection().delete_one(
+                {"_id": job.id, "status": ReportStatus.PENDING.value},
+            )
+            raise
+        return job
+
+    @staticmethod
+    async def get_job(job_id: str) -> Optional[ReportJob]:
+        """Lấy job theo id"""
+        try:
+            object_id = ObjectId(job_id)
+        except (InvalidId, TypeError):
+            return None
+
+        return await ReportJob.get(object_id)
+
+    @staticmethod
+    def worker_metrics() -> Dict[str, Any]:
+        """Số liệu worker pool"""
+        return _pool.metrics()
+
+    @staticmethod
+    async def get_daily_summary(
+        start_day: date,
+        end_day: date,
+        user_ids: Optional[List[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Tổng hợp chấm công theo từng ngày trong [start_day, end_day], đọc từ rollup.
+
+        Kết quả được cache theo (khoảng ngày, user_ids); khi rollup của một ngày
+        thay đổi chỉ các entry có khoảng chứa ngày đó bị xóa. Việc xóa này chỉ
+        có hiệu lực trong worker hiện tại, worker khác thấy thay đổi sau tối đa
+        REPORT_SUMMARY_CACHE_TTL_SECONDS.
+        """
+        key: SummaryKey = (
+            start_day.isoformat(),
+            end_day.isoformat(),
+            tuple(sorted(set(user_ids))) if user_ids else None,
+        )
+        cached = _summary_cache.get(key)
+        if cached is not None:
+            return cached
+
+        await AttendanceRollupService.refresh_dirty_days(start_day, end_day)
+        presence, _ = await AttendanceRollupService.load_presence(
+            start_day,
+            end_day,
+            [ObjectId(user_id) for user_id in key[2]] if key[2] else None,
+        )
+
+        tz = get_timezone(settings.TIMEZONE)
+        schedule = _work_schedule()
+        day_starts = local_day_starts(start_day, end_day, tz)
+        metrics = compute_daily_metrics(presence, schedule.shift_bounds(start_day, end_day, tz), schedule)
+        days_count = len(day_starts) - 1
+
+        def per_day(weights: Optional[np.ndarray] = None) -> List[float]:
+            return np.bincount(presence.day_index, weights=weights, minlength=days_count).tolist()
+
+        present = per_day()
+        checkins = per_day(presence.checkins)
+        late = per_day(metrics.late_seconds > 0)
+        early = per_day(metrics.early_leave_seconds > 0)
+        worked = per_day(metrics.worked_seconds)
+
+        summary = [
+            {
+                "day": start_day + timedelta(days=offset),
+                "present_users": int(present[offset]),
+                "checkins": int(checkins[offset]),
+                "late_users": int(late[offset]),
+                "early_leave_users": int(early[offset]),
+                "avg_worked_hours": (
+                    round(worked[offset] / present[offset] / 3600, 2) if present[offset] else 0.0
+                ),
+            }
+            for offset in range(days_count)
+        ]
+        _summary_cache.set(key, summary)
+        return summary
+
+    @staticmethod
+    def summary_cache_stats() -> Dict[str, Any]:
+        """Số liệu cache tổng hợp theo ngày"""
+        return _summary_cache.stats()
+
+    @staticmethod
+    async def cleanup_expired_jobs() -> int:
+        """
+        Xóa job completed/failed đã xong quá REPORT_RETENTION_HOURS cùng file
+        báo cáo của nó, trả về số job đã xóa.
+        """
+        expired_before = utc_now() - timedelta(hours=settings.REPORT_RETENTION_HOURS)
+        collection = ReportJob.get_motor_collection()
+        cursor = collection.find(
+            {
+                "status": {"$in": [ReportStatus.COMPLETED.value, ReportStatus.FAILED.value]},
+                "finished_at": {"$lt": expired_before},
+            },
+            {"_id": 1, "file_path": 1},
+        )
+
+        job_ids = []
+        async for document in cursor:
+            file_path = document.get("file_path")
+            if file_path:
+                try:
+                    await asyncio.to_thread(os.remove, file_path)
+                except FileNotFoundError:
+                    pass
+                except OSError as exc:
+                    LOGGER.warning(f"Failed to remove report file {file_path}: {exc}")
+                    continue
+            job_ids.append(document["_id"])
+
+        if job_ids:
+            await collection.delete_many({"_id": {"$in": job_ids}})
+            LOGGER.info(f"Removed {len(job_ids)} expired report jobs")
+        return len(job_ids)
+
+    @staticmethod
+    async def _cleanup_loop() -> None:
+        while True:
+            try:
+                await ReportService.cleanup_expired_jobs()
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                LOGGER.error(f"Report cleanup failed: {exc}")
+            await asyncio.sleep(settings.REPORT_CLEANUP_INTERVAL_SECONDS)
+
+    @staticmethod
+    async def _recover_jobs() -> None:
+        """
+        Đưa lại vào hàng đợi các job pending và job running bị bỏ dở (heartbeat
+        quá cũ, ví dụ do process bị kill). Claim nguyên tử trong `_claim_job`
+        đảm bảo mỗi job chỉ chạy ở một worker dù nhiều process cùng recover.
+        """
+        stale_before = utc_now() - timedelta(seconds=settings.REPORT_STALE_SECONDS)
+        await ReportJob.get_motor_collection().update_many(
+            {"status": ReportStatus.RUNNING.value, "heartbeat_at": {"$lt": stale_before}},
+            {"$set": {"status": ReportStatus.PENDING.value}},
+        )
+
+        cursor = ReportJob.get_motor_collection().find(
+            {"status": ReportStatus.PENDING.value},
+            {"_id": 1},
+        ).sort("created_at", 1)
+
+        async for document in cursor:
+            try:
+                _pool.enqueue(str(document["_id"]))
+            except WorkerQueueFullError:
+                LOGGER.warning("Report queue is full, remaining pending jobs will wait for restart")
+                break
+
+    @staticmethod
+    async def _claim_job(job_id: str) -> Optional[Dict[str, Any]]:
+        """Chuyển job pending -> running một cách nguyên tử."""
+        now = utc_now()
+        return await ReportJob.get_motor_collection().find_one_and_update(
+            {"_id": ObjectId(job_id), "status": ReportStatus.PENDING.value},
+            {"$set": {
+                "status": ReportStatus.RUNNING.value,
+                "started_at": now,
+                "heartbeat_at": now,
+                "progress": 0.0,
+                "processed_users": 0,
+                "rows": 0,
+                "error": None,
+            }},
+            return_document=ReturnDocument.AFTER,
+        )
+
+    @staticmethod
+    async def _update_job(job_id: str, **fields: Any) -> None:
+        await ReportJob.get_motor_collection().update_one(
+            {"_id": ObjectId(job_id)},
+            {"$set": {**fields, "heartbeat_at": utc_now()}},
+        )
+
+    @staticmethod
+    async def _run_job(job_id: str) -> None:
+        """Worker handler: tính báo cáo theo từng nhóm user, ghi ra file CSV/XLSX."""
+        claimed = await ReportService._claim_job(job_id)
+        if claimed is None:
+            return  # job đã được worker khác nhận hoặc không còn pending
+
+        job = ReportJob.model_validate(claimed)
+        path = os.path.join(settings.REPORT_OUTPUT_DIR, f"{job_id}.{job.file_format.value}")
+
+        try:
+            total_users = (
+                len(job.user_ids) if job.user_ids
+                else await User.get_motor_collection().count_documents({})
+            )
+            await ReportService._update_job(job_id, total_users=total_users)
+            await AttendanceRollupService.refresh_dirty_days(job.start_day, job.end_day)
+
+            rows = await write_rows_to_file(
+                ReportService._iter_report_rows(job, total_users),
+                path,
+                ExportFormat(job.file_format.value),
+                REPORT_COLUMNS,
+            )
+            await ReportService._update_job(
+                job_id,
+                status=ReportStatus.COMPLETED.value,
+                progress=1.0,
+                rows=rows,
+                file_path=path,
+                finished_at=utc_now(),
+            )
+        except asyncio.CancelledError:
+            # Server shutdown: trả job về pending để chạy lại ở lần khởi động sau
+            await ReportService._update_job(job_id, status=ReportStatus.PENDING.value)
+            raise
+        except Exception as exc:
+            await ReportService._update_job(
+                job_id,
+                status=ReportStatus.FAILED.value,
+                error=str(exc),
+                finished_at=utc_now(),
+            )
+            raise
+
+    @staticmethod
+    async def _iter_report_rows(job: ReportJob, total_users: int) -> AsyncIterator[Tuple[Any, ...]]:
+        """Sinh từng dòng báo cáo theo nhóm user, cập nhật tiến độ sau mỗi nhóm."""
+        job_id = str(job.id)
+        processed = 0
+        rows = 0
+        async for users in ReportService._iter_user_chunks(job.user_ids):
+            chunk_rows = await ReportService._build_chunk_rows(users, job.start_day, job.end_day)
+            for row in chunk_rows:
+                yield row
+
+            processed += len(users)
+            rows += len(chunk_rows)
+            await ReportService._update_job(
+                job_id,
+                processed_users=processed,
+                rows=rows,
+                progress=min(processed / total_users, 1.0) if total_users else 1.0,
+            )
+
+    @staticmethod
+    async def _iter_user_chunks(
+        user_ids: Optional[List[PydanticObjectId]],
+    ) -> AsyncIterator[List[UserView]]:
+        """Duyệt user theo từng nhóm REPORT_CHUNK_USERS (keyset theo _id)."""
+        chunk_size = settings.REPORT_CHUNK_USERS
+
+        if user_ids:
+            for start in range(0, len(user_ids), chunk_size):
+                chunk = user_ids[start:start + chunk_size]
+                users = await analytics_to_list(
+                    User.find({"_id": {"$in": chunk}}, projection_model=UserView).sort("+_id")
+                )
+                if users:
+                    yield users
+            return
+
+        cursor: Optional[str] = None
+        while True:
+            users, cursor = await paginate_by_id(
+                User,
+                limit=chunk_size,
+                cursor=cursor,
+                projection_model=UserView,
+                analytics=True,
+            )
+            if users:
+                yield users
+            if cursor is None:
+                return
+
+    @staticmethod
+    async def _build_chunk_rows(
+        users: List[UserView],
+        start_day: date,
+        end_day: date,
+    ) -> List[Tuple[Any, ...]]:
+        """Dựng các dòng báo cáo user x ngày cho một nhóm user."""
+        tz = get_timezone(settings.TIMEZONE)
+        day_starts = local_day_starts(start_day, end_day, tz)
+        presence, _ = await AttendanceRollupService.load_presence(
+            start_day,
+            end_day,
+            [ObjectId(user.id) for user in users],
+        )
+        schedule = _work_schedule()
+        metrics = compute_daily_metrics(presence, schedule.shift_bounds(start_day, end_day, tz), schedule)
+
+        days_count = len(day_starts) - 1
+        cells: Dict[int, Tuple[int, int, int, int, int, int]] = dict(zip(
+            (presence.user_index * days_count + presence.day_index).tolist(),
+            zip(
+                presence.first_in.tolist(),
+                presence.last_out.tolist(),
+                presence.checkins.tolist(),
+                metrics.worked_seconds.tolist(),
+                metrics.late_seconds.tolist(),
+                metrics.early_leave_seconds.tolist(),
+            ),
+        ))
+        days = [(start_day + timedelta(days=offset)).isoformat() for offset in range(days_count)]
+
+        rows: List[Tuple[Any, ...]] = []
+        for index, user in enumerate(users):
+            user_id = str(user.id)
+            for day_index, day in enumerate(days):
+                cell = cells.get(index * days_count + day_index)
+                if cell is None:
+                    rows.append((user_id, user.username, user.name, day, "", "", 0, 0.0, 0, 0))
+                    continue
+
+                first_in, last_out, checkins, worked, late, early = cell
+                rows.append((
+                    user_id,
+                    user.username,
+                    user.name,
+                    day,
+                    datetime.fromtimestamp(first_in, tz).strftime("%H:%M:%S"),
+                    datetime.fromtimestamp(last_out, tz).strftime("%H:%M:%S") if checkins > 1 else "",
+                    checkins,
+                    round(worked / 3600, 2),
+                    late // 60,
+                    early // 60,
+                ))
+        return rows
+
+
+def _work_schedule() -> WorkSchedule:
+    """Ca làm việc chuẩn từ settings"""
+    return WorkSchedule(
+        start=settings.WORK_START_TIME,
+        end=settings.WORK_END_TIME,
+        late_grace_minutes=settings.LATE_GRACE_MINUTES,
+    )
+
+
+def _invalidate_summary_days(days: Set[str]) -> None:
+    """Xóa các entry cache tổng hợp có khoảng ngày chứa một trong `days`."""
+    _summary_cache.invalidate_where(
+        lambda key: any(key[0] <= day <= key[1] for day in days)
+    )
+
+_pool = ReportWorkerPool(
+    handler=ReportService._run_job,
+    concurrency=settings.REPORT_WORKERS,
+    queue_size=settings.REPORT_QUEUE_SIZE,
+)
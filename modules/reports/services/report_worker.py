@@ -0,0 +1,96 @@
+# modules/reports/services/report_worker.py
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from core.logging import LOGGER
+
+JobHandler = Callable[[str], Awaitable[None]]
+
+# -----------------------------
+# Errors
+# -----------------------------
+class WorkerQueueFullError(Exception):
+    """Hàng đợi job đã đầy."""
+
+# -----------------------------
+# Report Worker Pool
+# -----------------------------
+class ReportWorkerPool:
+    """
+    Pool gồm `concurrency` worker task chạy nền, nhận job id từ hàng đợi có giới
+    hạn `queue_size`. Job chạy ngoài request handler nên request chỉ cần tạo job
+    và trả về ngay; số job chạy đồng thời không vượt quá `concurrency`.
+    """
+
+    def __init__(self, handler: JobHandler, concurrency: int, queue_size: int) -> None:
+        self.handler = handler
+        self.concurrency = concurrency
+        self.queue_size = queue_size
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._active = 0
+
+        self.completed_total = 0
+        self.failed_total = 0
+
+    @property
+    def running(self) -> bool:
+        return bool(self._workers)
+
+    def has_capacity(self) -> bool:
+        return self._queue is not None and not self._queue.full()
+
+    async def start(self) -> None:
+        """Khởi động các worker (gọi trong lifespan)."""
+        if self._workers:
+            return
+
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"report-worker-{index}")
+            for index in range(self.concurrency)
+        ]
+
+    async def stop(self) -> None:
+        """Hủy các worker; job đang chạy tự xử lý CancelledError."""
+        workers, self._workers = self._workers, []
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        self._queue = None
+
+    def enqueue(self, job_id: str) -> None:
+        """Đưa job vào hàng đợi, raise WorkerQueueFullError nếu đầy."""
+        if self._queue is None:
+            raise WorkerQueueFullError("Report workers are not running")
+        try:
+            self._queue.put_nowait(job_id)
+        except asyncio.QueueFull as exc:
+            raise WorkerQueueFullError("Report queue is full") from exc
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "workers": len(self._workers),
+            "active": self._active,
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "queue_size": self.queue_size,
+            "completed_total": self.completed_total,
+            "failed_total": self.failed_total,
+        }
+
+    async def _worker(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            self._active += 1
+            try:
+                await self.handler(job_id)
+                self.completed_total += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                self.failed_total += 1
+                LOGGER.error(f"Report job {job_id} failed: {exc}")
+            finally:
+                self._active -= 1
+                self._queue.task_done()
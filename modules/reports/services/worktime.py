@@ -0,0 +1,123 @@
+# modules/reports/services/worktime.py
+from datetime import date, time
+from typing import NamedTuple
+from zoneinfo import ZoneInfo
+
+import numpy as np
+
+from utils.time import bucket_by_local_day, local_times
+
+# -----------------------------
+# Result Types
+# -----------------------------
+class DailyPresence(NamedTuple):
+    """First-in/last-out theo (user, ngày), chỉ gồm các ô có check-in."""
+    user_index: np.ndarray   # int64
+    day_index: np.ndarray    # int64
+    first_in: np.ndarray     # int64, epoch giây
+    last_out: np.ndarray     # int64, epoch giây
+    checkins: np.ndarray     # int64
+
+class DailyMetrics(NamedTuple):
+    """Chỉ số công theo (user, ngày), cùng thứ tự với DailyPresence."""
+    worked_seconds: np.ndarray
+    late_seconds: np.ndarray
+    early_leave_seconds: np.ndarray
+
+class ShiftBounds(NamedTuple):
+    """Giờ vào/tan ca (epoch giây) của từng ngày, đánh số như `day_index`."""
+    start: np.ndarray  # int64
+    end: np.ndarray    # int64
+
+class WorkSchedule(NamedTuple):
+    """Ca làm việc chuẩn trong ngày (giờ local)."""
+    start: time
+    end: time
+    late_grace_minutes: int = 0
+
+    def shift_bounds(self, start_day: date, end_day: date, tz: ZoneInfo) -> ShiftBounds:
+        """
+        Giờ vào/tan ca của từng ngày trong [start_day, end_day] ở múi giờ `tz`.
+
+        Tính theo giờ local của từng ngày (không cộng offset cố định vào đầu
+        ngày) nên vẫn đúng vào ngày chuyển DST.
+        """
+        return ShiftBounds(
+            start=local_times(start_day, end_day, self.start, tz),
+            end=local_times(start_day, end_day, self.end, tz),
+        )
+
+# -----------------------------
+# Vectorized Engine
+# -----------------------------
+def compute_daily_presence(
+    user_index: np.ndarray,
+    timestamps: np.ndarray,
+    day_starts: np.ndarray,
+) -> DailyPresence:
+    """
+    Gom check-in thành first-in/last-out/số lần theo (user, ngày local).
+
+    `user_index` và `timestamps` (epoch giây) là hai cột cùng độ dài;
+    `day_starts` lấy từ `utils.time.local_day_starts`. Không có vòng lặp Python:
+    sắp xếp theo (ô, thời gian) rồi lấy phần tử đầu/cuối của mỗi nhóm.
+    """
+    user_index = np.asarray(user_index, dtype=np.int64)
+    timestamps = np.asarray(timestamps, dtype=np.int64)
+
+    day_index = bucket_by_local_day(timestamps, day_starts)
+    valid = day_index >= 0
+    user_index, timestamps, day_index = user_index[valid], timestamps[valid], day_index[valid]
+
+    if timestamps.size == 0:
+        empty = np.empty(0, dtype=np.int64)
+        return DailyPresence(empty, empty, empty, empty, empty)
+
+    days = len(day_starts) - 1
+    cell = user_index * days + day_index
+
+    order = np.lexsort((timestamps, cell))
+    cell, timestamps = cell[order], timestamps[order]
+
+    boundaries = np.flatnonzero(np.diff(cell)) + 1
+    starts = np.concatenate(([0], boundaries))
+    ends = np.concatenate((boundaries, [cell.size]))
+
+    unique_cells = cell[starts]
+    return DailyPresence(
+        user_index=unique_cells // days,
+        day_index=unique_cells % days,
+        first_in=timestamps[starts],
+        last_out=timestamps[ends - 1],
+        checkins=ends - starts,
+    )
+
+
+def compute_daily_metrics(
+    presence: DailyPresence,
+    shifts: ShiftBounds,
+    schedule: WorkSchedule,
+) -> DailyMetrics:
+    """
+    Tính giờ công, số giây đi muộn và về sớm cho từng ô của `presence`.
+
+    `shifts` lấy từ `schedule.shift_bounds` cho cùng khoảng ngày với
+    `presence`.
+
+    - worked = last_out - first_in (0 nếu chỉ có một lần check-in)
+    - late = first_in trễ hơn giờ vào ca + grace
+    - early leave = last_out sớm hơn giờ tan ca (chỉ khi có từ hai lần check-in)
+    """
+    shift_start = shifts.start[presence.day_index] + schedule.late_grace_minutes * 60
+    shift_end = shifts.end[presence.day_index]
+    has_checkout = presence.checkins >= 2
+
+    worked = np.where(has_checkout, presence.last_out - presence.first_in, 0)
+    late = np.maximum(presence.first_in - shift_start, 0)
+    early = np.where(has_checkout, np.maximum(shift_end - presence.last_out, 0), 0)
+
+    return DailyMetrics(
+        worked_seconds=worked,
+        late_seconds=late,
+        early_leave_seconds=early,
+    )
@@ -1,7 +1,7 @@
 import re
 import unicodedata
 from enum import Enum
-from typing import Tuple
+from typing import List, Optional, Tuple
 
 #------------------------------
 # User Role
@@ -11,6 +11,15 @@ class UserRole(str, Enum):
     ADMIN = "admin"
     SUPER_ADMIN = "super_admin"
 
+#------------------------------
+# User Import Status
+#------------------------------
+class UserImportStatus(str, Enum):
+    CREATED = "created"
+    DUPLICATE = "duplicate"
+    CONFLICT = "conflict"
+    INVALID = "invalid"
+
 #------------------------------
 # Helper Functions
 #------------------------------
@@ -26,6 +35,26 @@ def _normalize_name_part(part: str) -> str:
     cleaned = cleaned.lower()
     return re.sub(r"[^a-z0-9]", "", cleaned)
 
+def normalize_search_text(text: str) -> str:
+    """Normalize free text for search: accent-free lowercase words joined by single spaces."""
+    parts = (_normalize_name_part(part) for part in re.split(r"\s+", text or ""))
+    return " ".join(part for part in parts if part)
+
+
+def build_search_tokens(full_name: str, username: Optional[str] = None) -> List[str]:
+    """
+    Build the search keys stored on a user.
+
+    Every word suffix of the normalized name is a key ("nguyen ngoc quyet",
+    "ngoc quyet", "quyet"), so an anchored prefix query on the multikey index
+    matches a search starting at any word. The username is added as is.
+    """
+    words = normalize_search_text(full_name).split(" ")
+    tokens = [" ".join(words[index:]) for index in range(len(words)) if words[index]]
+    if username and username not in tokens:
+        tokens.append(username)
+    return tokens
+
 #------------------------------
 # Generate Username and Email
 #------------------------------
@@ -1,8 +1,9 @@
 # modules/users/models/user.py
-from beanie import Document, Indexed
-from pydantic import EmailStr, Field
+from beanie import Document, Indexed, PydanticObjectId
+from pydantic import BaseModel, ConfigDict, EmailStr, Field
 from datetime import datetime, timezone
-from typing import Optional
+from typing import List, Optional
+from pymongo import ASCENDING, IndexModel
 from modules.users.common.user import UserRole
 
 # -----------------------------
@@ -21,11 +22,38 @@ class User(Document):
     role: UserRole = UserRole.USER
     is_active: bool = True
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    # Khóa tìm kiếm không dấu (build_search_tokens), tra bằng prefix regex
+    search_tokens: List[str] = Field(default_factory=list)
 
     class Settings:
         name = "users"  # tên collection trong MongoDB
+        indexes = [
+            IndexModel([("search_tokens", ASCENDING)], name="search_tokens"),
+        ]
+
+# -----------------------------
+# User Projection
+# -----------------------------
+class UserView(BaseModel):
+    """
+    Projection của User cho các đường đọc.
+
+    Mongo chỉ trả về các field bên dưới (không có password/created_at) và Beanie
+    dựng model nhẹ này thay vì Document đầy đủ.
+    """
+    model_config = ConfigDict(populate_by_name=True)
+
+    id: PydanticObjectId = Field(alias="_id")
+    name: str
+    phone: str
+    position: Optional[str] = None
+    username: str
+    email: str
+    role: UserRole = UserRole.USER
+    is_active: bool = True
 
 # -----------------------------
 # Rebuild Model
 # -----------------------------
-User.model_rebuild()
\ No newline at end of file
+User.model_rebuild()
+UserView.model_rebuild()
\ No newline at end of file
@@ -0,0 +1,19 @@
+# modules/users/models/username_counter.py
+from beanie import Document
+
+# -----------------------------
+# Username Counter Model
+# -----------------------------
+class UsernameCounter(Document):
+    # _id là base username (vd: "quyetnn")
+    id: str
+    # Số slot đã cấp phát: slot 0 -> "quyetnn", slot n -> "quyetnn{n}"
+    seq: int = 0
+
+    class Settings:
+        name = "username_counters"
+
+# -----------------------------
+# Rebuild Model
+# -----------------------------
+UsernameCounter.model_rebuild()
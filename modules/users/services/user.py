@@ -1,16 +1,91 @@
 # modules/users/services/user.py
-from typing import List, Optional, Tuple
+import asyncio
+import re
+from collections import defaultdict
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Sequence, Tuple
+from beanie import PydanticObjectId
+from beanie.odm.utils.projection import get_projection
 from bson import ObjectId
 from bson.errors import InvalidId
-from pymongo.errors import DuplicateKeyError
-from modules.users.models.user import User
-from modules.users.common.user import generate_username_and_email
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+from core.config import settings
+from core.logging import LOGGER
+from core.read_preference import analytics_collection
+from modules.auth.services.password_service import PasswordService
+from modules.faces.services.face_service import FaceService
+from modules.users.models.user import User, UserView
+from modules.users.models.username_counter import UsernameCounter
+from modules.users.common.user import (
+    UserImportStatus,
+    build_search_tokens,
+    generate_username_and_email,
+    normalize_search_text,
+)
+from utils.cache import TTLCache
+from utils.dataloader import DataLoader
+from utils.pagination import DEFAULT_PAGE_LIMIT, paginate_by_id
+
+EXPORT_FIELDS = ("id", "name", "phone", "position", "username", "email", "is_active", "role")
+EXPORT_BATCH_SIZE = 1000
+
+MAX_IMPORT_ROWS = 10_000
+IMPORT_BATCH_SIZE = 1000
+IMPORT_MAX_ATTEMPTS = 3
+
+MAX_LOOKUP_KEYS = 100
+
+SEARCH_DEFAULT_LIMIT = 20
+SEARCH_MAX_LIMIT = 50
+SEARCH_BACKFILL_BATCH_SIZE = 1000
+
+# (status, user đã tạo, thông báo lỗi) cho từng dòng import
+ImportResult = Tuple[UserImportStatus, Optional[User], Optional[str]]
+
+# -----------------------------
+# User Cache
+# -----------------------------
+# Read-through cache cho lookup theo id/username. Mỗi worker có cache riêng nên
+# thay đổi từ worker khác chỉ được thấy sau tối đa USER_CACHE_TTL_SECONDS.
+_users_by_id: TTLCache[str, UserView] = TTLCache(
+    max_size=settings.USER_CACHE_MAX_SIZE,
+    ttl_seconds=settings.USER_CACHE_TTL_SECONDS,
+)
+_users_by_username: TTLCache[str, UserView] = TTLCache(
+    max_size=settings.USER_CACHE_MAX_SIZE,
+    ttl_seconds=settings.USER_CACHE_TTL_SECONDS,
+)
+
+# Lần invalidate gần nhất của từng key (id/username), theo `_cache_generation`.
+# Query bắt đầu trước lần invalidate đó có thể trả về bản cũ (vd: user vừa bị
+# xóa) nên kết quả của nó không được đưa lại vào cache.
+_cache_generation = 0
+_invalidated_at: TTLCache[str, int] = TTLCache(
+    max_size=settings.USER_CACHE_MAX_SIZE,
+    ttl_seconds=settings.USER_CACHE_TTL_SECONDS,
+)
+
+# Cache miss trong cùng một vòng event loop (vd: nhiều request song song) được
+# gộp thành một query `$in`.
+_users_by_id_loader: DataLoader[ObjectId, UserView] = DataLoader(
+    lambda keys: UserService._fetch_users({"_id": {"$in": keys}}, key=lambda user: user.id),
+)
+_users_by_username_loader: DataLoader[str, UserView] = DataLoader(
+    lambda keys: UserService._fetch_users({"username": {"$in": keys}}, key=lambda user: user.username),
+)
 
 # -----------------------------
 # User Service
 # -----------------------------
 class UserService:
     """User Service"""
+
+    @staticmethod
+    async def start() -> None:
+        """Bổ sung search_tokens cho user tạo trước khi có tìm kiếm (lifespan startup)."""
+        updated = await UserService.backfill_search_tokens()
+        if updated:
+            LOGGER.info(f"Backfilled search tokens for {updated} users")
     
     @staticmethod
     async def create_user(
@@ -19,8 +94,9 @@ class UserService:
         position: Optional[str] = None
     ) -> User:
         """Tạo user mới"""
-        max_attempts = 20
+        max_attempts = 5
         last_error: DuplicateKeyError | None = None
+        password = await PasswordService.default_password_hash()
 
         for _ in range(max_attempts):
             username, email = await UserService._generate_unique_username_and_email(name)
@@ -31,10 +107,14 @@ class UserService:
                 phone=phone,
                 username=username,
                 email=email,
+                password=password,
+                search_tokens=build_search_tokens(name, username),
             )
 
             try:
-                return await user.insert()
+                user = await user.insert()
+                UserService._invalidate_cache(user)
+                return user
             except DuplicateKeyError as exc:
                 last_error = exc
 
@@ -44,7 +124,8 @@ class UserService:
                 if not UserService._is_duplicate_on_fields(exc, {"username", "email"}):
                     raise
 
-                # Khi trùng username/email, retry sinh giá trị mới.
+                # Khi trùng username/email (vd: user tạo ngoài counter), retry
+                # với slot kế tiếp của counter.
                 continue
 
         if last_error is not None:
@@ -53,34 +134,327 @@ class UserService:
         raise RuntimeError("Failed to create user due to unexpected duplicate handling state")
 
     @staticmethod
-    async def get_user_by_phone(phone: str) -> Optional[User]:
+    async def bulk_create_users(
+        entries: Sequence[Tuple[str, str, Optional[str]]],
+    ) -> List[ImportResult]:
+        """
+        Tạo nhiều user cùng lúc từ danh sách (name, phone, position).
+
+        - Chuẩn hóa tên một lượt, bỏ các số điện thoại trùng trong batch.
+        - Kiểm tra số điện thoại đã tồn tại bằng một query `$in` cho mỗi batch.
+        - Cấp phát username theo nhóm base username (một `$inc` cho mỗi base).
+        - Ghi bằng `insert_many(ordered=False)`; dòng trùng username/email được
+          cấp phát lại và ghi thử lại, dòng trùng phone được báo là duplicate.
+
+        Kết quả trả về đúng thứ tự với `entries`.
+        """
+        results: List[Optional[ImportResult]] = [None] * len(entries)
+
+        # (index, name, phone, position, base_username, domain)
+        pending: List[Tuple[int, str, str, Optional[str], str, str]] = []
+        seen_phones: set[str] = set()
+
+        for index, (name, phone, position) in enumerate(entries):
+            if phone in seen_phones:
+                results[index] = (
+                    UserImportStatus.DUPLICATE,
+                    None,
+                    f"Phone number {phone} appears more than once in the import",
+                )
+                continue
+
+            try:
+                base_username, base_email = generate_username_and_email(name)
+            except (TypeError, ValueError) as exc:
+                results[index] = (UserImportStatus.INVALID, None, str(exc))
+                continue
+
+            seen_phones.add(phone)
+            domain = base_email.split("@", 1)[1]
+            pending.append((index, name, phone, position, base_username, domain))
+
+        for start in range(0, len(pending), IMPORT_BATCH_SIZE):
+            batch = pending[start:start + IMPORT_BATCH_SIZE]
+
+            existing_phones = await UserService._find_existing_phones([item[2] for item in batch])
+            to_insert = []
+            for item in batch:
+                if item[2] in existing_phones:
+                    results[item[0]] = (
+                        UserImportStatus.DUPLICATE,
+                        None,
+                        f"Phone number {item[2]} is already registered",
+                    )
+                else:
+                    to_insert.append(item)
+
+            await UserService._insert_import_batch(to_insert, results)
+
+        return [result for result in results if result is not None]
+
+    @staticmethod
+    async def _find_existing_phones(phones: List[str]) -> set[str]:
+        """Lấy các số điện thoại đã tồn tại trong một query."""
+        cursor = User.get_motor_collection().find(
+            {"phone": {"$in": phones}},
+            {"_id": 0, "phone": 1},
+        )
+        return {document["phone"] async for document in cursor}
+
+    @staticmethod
+    async def _insert_import_batch(
+        batch: List[Tuple[int, str, str, Optional[str], str, str]],
+        results: List[Optional[ImportResult]],
+    ) -> None:
+        """Cấp phát username và insert_many một batch, retry các dòng trùng username/email."""
+        password = await PasswordService.default_password_hash()
+        for attempt in range(IMPORT_MAX_ATTEMPTS):
+            if not batch:
+                return
+
+            by_base: Dict[str, List[int]] = defaultdict(list)
+            for position_in_batch, item in enumerate(batch):
+                by_base[item[4]].append(position_in_batch)
+
+            bases = list(by_base)
+            allocations = await asyncio.gather(
+                *(UserService._allocate_usernames(base, len(by_base[base])) for base in bases)
+            )
+
+            users: List[User] = [None] * len(batch)  # type: ignore[list-item]
+            for base, usernames in zip(bases, allocations):
+                for position_in_batch, username in zip(by_base[base], usernames):
+                    _, name, phone, position, _, domain = batch[position_in_batch]
+                    users[position_in_batch] = User(
+                        id=PydanticObjectId(),
+                        name=name,
+                        phone=phone,
+                        position=position,
+                        username=username,
+                        email=f"{username}@{domain}",
+                        password=password,
+                        search_tokens=build_search_tokens(name, username),
+                    )
+
+            write_errors: List[Dict[str, Any]] = []
+            try:
+                await User.insert_many(users, ordered=False)
+            except BulkWriteError as exc:
+                write_errors = exc.details.get("writeErrors", [])
+
+            failed: Dict[int, Dict[str, Any]] = {error["index"]: error for error in write_errors}
+            retry = []
+            for position_in_batch, (item, user) in enumerate(zip(batch, users)):
+                error = failed.get(position_in_batch)
+                if error is None:
+                    UserService._invalidate_cache(user)
+                    results[item[0]] = (UserImportStatus.CREATED, user, None)
+                    continue
+
+                fields = UserService._duplicate_fields_from_details(error)
+                if "phone" in fields:
+                    results[item[0]] = (
+                        UserImportStatus.DUPLICATE,
+                        None,
+                        f"Phone number {item[2]} is already registered",
+                    )
+                elif fields & {"username", "email"} and attempt + 1 < IMPORT_MAX_ATTEMPTS:
+                    retry.append(item)
+                elif fields & {"username", "email"}:
+                    results[item[0]] = (
+                        UserImportStatus.CONFLICT,
+                        None,
+                        "Generated username/email already exists. Please retry the row.",
+                    )
+                else:
+                    results[item[0]] = (
+                        UserImportStatus.INVALID,
+                        None,
+                        str(error.get("errmsg", "Write error")),
+                    )
+
+            batch = retry
+
+    @staticmethod
+    async def get_user_by_phone(phone: str) -> Optional[UserView]:
         """Lấy user theo số điện thoại"""
-        return await User.find_one(User.phone == phone)
+        return await User.find_one(User.phone == phone, projection_model=UserView)
     
     @staticmethod
-    async def get_user_by_email(email: str) -> Optional[User]:
+    async def get_user_by_email(email: str) -> Optional[UserView]:
         """Lấy user theo email"""
-        return await User.find_one(User.email == email)
+        return await User.find_one(User.email == email, projection_model=UserView)
 
     @staticmethod
-    async def get_user_by_username(username: str) -> Optional[User]:
-        """Lấy user theo username"""
-        return await User.find_one(User.username == username)
+    async def get_user_by_username(username: str) -> Optional[UserView]:
+        """Lấy user theo username (read-through cache, miss được gộp batch)"""
+        cached = _users_by_username.get(username)
+        if cached is not None:
+            return cached
+        return await _users_by_username_loader.load(username)
     
     @staticmethod
-    async def get_user_by_id(user_id: str) -> Optional[User]:
-        """Lấy user theo id"""
+    async def get_user_by_id(user_id: str) -> Optional[UserView]:
+        """Lấy user theo id (read-through cache, miss được gộp batch)"""
         try:
             object_id = ObjectId(user_id)
         except (InvalidId, TypeError):
             return None
 
-        return await User.get(object_id)
+        cached = _users_by_id.get(str(object_id))
+        if cached is not None:
+            return cached
+        return await _users_by_id_loader.load(object_id)
+
+    @staticmethod
+    async def get_users_by_ids(user_ids: Sequence[str]) -> List[UserView]:
+        """
+        Lấy nhiều user theo id: cache trước, phần còn lại bằng một query `$in`.
+
+        Kết quả theo thứ tự `user_ids` (bỏ id trùng, id sai định dạng và id
+        không tồn tại).
+        """
+        object_ids: List[ObjectId] = []
+        for user_id in user_ids:
+            try:
+                object_ids.append(ObjectId(user_id))
+            except (InvalidId, TypeError):
+                continue
+
+        users = {object_id: _users_by_id.get(str(object_id)) for object_id in dict.fromkeys(object_ids)}
+        misses = [object_id for object_id, user in users.items() if user is None]
+        users.update(zip(misses, await _users_by_id_loader.load_many(misses)))
+        return [user for user in users.values() if user is not None]
+
+    @staticmethod
+    async def get_users_by_usernames(usernames: Sequence[str]) -> List[UserView]:
+        """Lấy nhiều user theo username, tương tự `get_users_by_ids`."""
+        users = {username: _users_by_username.get(username) for username in dict.fromkeys(usernames)}
+        misses = [username for username, user in users.items() if user is None]
+        users.update(zip(misses, await _users_by_username_loader.load_many(misses)))
+        return [user for user in users.values() if user is not None]
+
+    @staticmethod
+    async def _fetch_users(
+        criteria: Dict[str, Any],
+        key: Callable[[UserView], Any],
+    ) -> Dict[Any, UserView]:
+        """Batch function của DataLoader: một query, đưa kết quả vào cache."""
+        generation = _cache_generation
+        users = await User.find(criteria, projection_model=UserView).to_list()
+        for user in users:
+            UserService._cache_user(user, generation)
+        return {key(user): user for user in users}
+
+    @staticmethod
+    def cache_stats() -> Dict[str, Dict[str, float]]:
+        """Số liệu hit/miss của user cache"""
+        return {
+            "by_id": _users_by_id.stats(),
+            "by_username": _users_by_username.stats(),
+        }
+
+    @staticmethod
+    def _cache_user(user: UserView, generation: int) -> None:
+        """
+        Đưa user vào cả hai cache id/username, trừ khi key đã bị invalidate sau
+        thời điểm `generation` (lúc bắt đầu query).
+        """
+        user_id = str(user.id)
+        for key in (f"id:{user_id}", f"username:{user.username}"):
+            invalidated = _invalidated_at.peek(key)
+            if invalidated is not None and invalidated > generation:
+                return
+        _users_by_id.set(user_id, user)
+        _users_by_username.set(user.username, user)
+
+    @staticmethod
+    def _invalidate_cache(user: User | UserView) -> None:
+        """Xóa user khỏi cache sau khi tạo/xóa."""
+        global _cache_generation
+        _cache_generation += 1
+        if user.id is not None:
+            _users_by_id.pop(str(user.id))
+            _invalidated_at.set(f"id:{user.id}", _cache_generation)
+        _users_by_username.pop(user.username)
+        _invalidated_at.set(f"username:{user.username}", _cache_generation)
     
     @staticmethod
-    async def get_list_users() -> List[User]:
-        """Lấy toàn bộ user"""
-        return await User.find_all().to_list()
+    async def get_list_users(
+        limit: int = DEFAULT_PAGE_LIMIT,
+        cursor: Optional[str] = None,
+    ) -> Tuple[List[UserView], Optional[str]]:
+        """Lấy một trang user theo cursor, trả về (users, next_cursor)"""
+        return await paginate_by_id(User, limit=limit, cursor=cursor, projection_model=UserView, analytics=True)
+
+    @staticmethod
+    async def search_users(query: str, limit: int = SEARCH_DEFAULT_LIMIT) -> List[UserView]:
+        """
+        Tìm user theo tên/username không dấu, khớp từ đầu một từ bất kỳ trong tên
+        ("quyet", "nguyen ngoc", "ngoc quy").
+
+        Query là một prefix regex có neo `^` trên index multikey search_tokens,
+        nên Mongo chỉ quét đúng khoảng key khớp (không collection scan) và dừng
+        sau `limit` kết quả, theo thứ tự key.
+        """
+        key = normalize_search_text(query)
+        if not key:
+            return []
+
+        # key chỉ gồm [a-z0-9 ] nên không cần escape regex
+        return await User.find(
+            {"search_tokens": {"$regex": f"^{key}"}},
+            projection_model=UserView,
+        ).limit(max(1, min(limit, SEARCH_MAX_LIMIT))).to_list()
+
+    @staticmethod
+    async def backfill_search_tokens(batch_size: int = SEARCH_BACKFILL_BATCH_SIZE) -> int:
+        """Tính search_tokens cho các user chưa có, trả về số user đã cập nhật."""
+        collection = User.get_motor_collection()
+        cursor = collection.find(
+            {"search_tokens": {"$exists": False}},
+            {"_id": 1, "name": 1, "username": 1},
+        ).batch_size(batch_size)
+
+        updated = 0
+        operations: List[UpdateOne] = []
+        async for document in cursor:
+            tokens = build_search_tokens(document.get("name", ""), document.get("username"))
+            operations.append(UpdateOne({"_id": document["_id"]}, {"$set": {"search_tokens": tokens}}))
+            if len(operations) >= batch_size:
+                updated += (await collection.bulk_write(operations, ordered=False)).modified_count
+                operations = []
+        if operations:
+            updated += (await collection.bulk_write(operations, ordered=False)).modified_count
+        return updated
+
+    @staticmethod
+    async def iter_users_for_export(batch_size: int = EXPORT_BATCH_SIZE) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Duyệt toàn bộ user theo từng batch của Motor cursor, trả về dict đã rút gọn.
+
+        Dùng raw cursor với projection nên không dựng Document cho từng dòng và
+        bộ nhớ chỉ phụ thuộc vào `batch_size`. Đọc theo analytics read preference.
+        """
+        projection = get_projection(UserView)
+        cursor = (
+            analytics_collection(User)
+            .find({}, projection)
+            .sort("_id", 1)
+            .batch_size(batch_size)
+        )
+
+        async for document in cursor:
+            yield {
+                "id": str(document["_id"]),
+                "name": document.get("name"),
+                "phone": document.get("phone"),
+                "position": document.get("position"),
+                "username": document.get("username"),
+                "email": document.get("email"),
+                "is_active": document.get("is_active", True),
+                "role": document.get("role"),
+            }
 
     @staticmethod
     async def _generate_unique_username_and_email(full_name: str) -> Tuple[str, str]:
@@ -88,20 +462,87 @@ class UserService:
         base_username, base_email = generate_username_and_email(full_name)
         domain = base_email.split("@", 1)[1]
 
-        username = base_username
-        suffix = 0
-
-        while await User.find_one(User.username == username):
-            suffix += 1
-            username = f"{base_username}{suffix}"
-
+        username = (await UserService._allocate_usernames(base_username))[0]
         email = f"{username}@{domain}"
         return username, email
 
     @staticmethod
-    async def delete_user(user: User) -> None:
-        """Xóa user khỏi hệ thống."""
-        await user.delete()
+    async def _allocate_usernames(base_username: str, count: int = 1) -> List[str]:
+        """
+        Cấp phát `count` username liên tiếp cho một base username.
+
+        Dùng counter nguyên tử trong collection `username_counters` ($inc), nên mỗi
+        lần cấp phát chỉ tốn một round trip bất kể đã có bao nhiêu hậu tố. Lần đầu
+        gặp một base, counter được seed từ các username đang tồn tại.
+        """
+        collection = UsernameCounter.get_motor_collection()
+        counter = await collection.find_one_and_update(
+            {"_id": base_username},
+            {"$inc": {"seq": count}},
+            return_document=ReturnDocument.AFTER,
+        )
+
+        if counter is None:
+            await UserService._seed_username_counter(base_username)
+            counter = await collection.find_one_and_update(
+                {"_id": base_username},
+                {"$inc": {"seq": count}},
+                upsert=True,
+                return_document=ReturnDocument.AFTER,
+            )
+
+        end = counter["seq"]
+        return [
+            base_username if slot == 0 else f"{base_username}{slot}"
+            for slot in range(end - count, end)
+        ]
+
+    @staticmethod
+    async def _seed_username_counter(base_username: str) -> None:
+        """Khởi tạo counter từ hậu tố lớn nhất đang dùng, bằng một prefix query."""
+        pattern = re.compile(rf"^{re.escape(base_username)}(\d*)$")
+        cursor = User.get_motor_collection().find(
+            {"username": {"$regex": pattern.pattern}},
+            {"_id": 0, "username": 1},
+        )
+
+        used = 0
+        async for document in cursor:
+            match = pattern.match(document.get("username", ""))
+            if not match:
+                continue
+            suffix = match.group(1)
+            used = max(used, int(suffix) + 1 if suffix else 1)
+
+        try:
+            await UsernameCounter.get_motor_collection().update_one(
+                {"_id": base_username},
+                {"$max": {"seq": used}},
+                upsert=True,
+            )
+        except DuplicateKeyError:
+            # Request khác vừa upsert cùng counter, $max vẫn đúng khi chạy lại.
+            await UsernameCounter.get_motor_collection().update_one(
+                {"_id": base_username},
+                {"$max": {"seq": used}},
+            )
+
+    @staticmethod
+    async def delete_user(user: User | UserView) -> None:
+        """Xóa user khỏi hệ thống (kèm embedding khuôn mặt)."""
+        await User.find_one(User.id == user.id).delete()
+        UserService._invalidate_cache(user)
+        await FaceService.remove_user(user.id)
+
+    @staticmethod
+    def _duplicate_fields_from_details(details: Dict[str, Any]) -> set[str]:
+        """Lấy các field bị trùng từ chi tiết lỗi ghi (keyPattern hoặc errmsg)."""
+        key_pattern = details.get("keyPattern")
+        if isinstance(key_pattern, dict):
+            return {str(key) for key in key_pattern.keys()}
+
+        message = str(details.get("errmsg", ""))
+        return {field for field in ("phone", "username", "email") if field in message}
 
     @staticmethod
     def _is_duplicate_on_fields(error: DuplicateKeyError, fields: set[str]) -> bool:
@@ -0,0 +1,35 @@
+# tests/conftest.py
+from uuid import uuid4
+
+import pytest
+from beanie import init_beanie
+from mongomock_motor import AsyncMongoMockClient
+
+from modules.attendances.models.attendance import Attendance
+from modules.attendances.models.attendance_rollup import (
+    AttendanceDailyRollup,
+    AttendanceRollupDirtyDay,
+)
+
+# -----------------------------
+# Async backend
+# -----------------------------
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+# -----------------------------
+# In-memory Mongo (mongomock-motor)
+# -----------------------------
+@pytest.fixture
+async def mongo(monkeypatch):
+    """Database trong bộ nhớ đã init Beanie cho các model chấm công."""
+    # mongomock không hỗ trợ time-series collection
+    monkeypatch.setattr(Attendance.Settings, "timeseries", None)
+
+    database = AsyncMongoMockClient()[f"test_{uuid4().hex}"]
+    await init_beanie(
+        database=database,
+        document_models=[Attendance, AttendanceDailyRollup, AttendanceRollupDirtyDay],
+    )
+    return database
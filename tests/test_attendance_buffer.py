@@ -0,0 +1,72 @@
+# tests/test_attendance_buffer.py
+from datetime import date, datetime, timezone
+
+import pytest
+from bson import ObjectId
+from pymongo.errors import AutoReconnect
+
+from modules.attendances.models.attendance import Attendance
+from modules.attendances.models.attendance_rollup import (
+    AttendanceDailyRollup,
+    AttendanceRollupDirtyDay,
+)
+from modules.attendances.services.attendance_buffer import AttendanceWriteBuffer
+from modules.attendances.services.rollup_service import AttendanceRollupService
+
+pytestmark = pytest.mark.anyio
+
+DAY = date(2024, 1, 2)
+
+
+def _events(count: int) -> list:
+    # 08:00 giờ VN = 01:00 UTC, cùng một ngày local
+    return [
+        {"user_id": ObjectId(), "timestamp": datetime(2024, 1, 2, 1, index, tzinfo=timezone.utc)}
+        for index in range(count)
+    ]
+
+
+def _buffer() -> AttendanceWriteBuffer:
+    buffer = AttendanceWriteBuffer(
+        max_size=100, batch_size=100, flush_interval=60, enqueue_timeout=1, max_retries=1,
+    )
+    buffer.add_flush_hook(AttendanceRollupService.apply_checkins)
+    buffer.add_failure_hook(AttendanceRollupService.mark_checkins_dirty)
+    return buffer
+
+
+def _partial_insert_many(monkeypatch, error: Exception) -> None:
+    """insert_many ghi được nửa batch ở lần đầu rồi lỗi ở mọi lần gọi."""
+    collection_type = type(Attendance.get_motor_collection())
+    original = collection_type.insert_many
+    calls = []
+
+    async def insert_many(self, documents, *args, **kwargs):
+        calls.append(len(documents))
+        if len(calls) == 1:
+            await original(self, documents[: len(documents) // 2], *args, **kwargs)
+        raise error
+
+    monkeypatch.setattr(collection_type, "insert_many", insert_many)
+
+
+@pytest.mark.parametrize(
+    "error",
+    [AutoReconnect("connection closed"), ValueError("unexpected")],
+    ids=["give-up-after-retries", "unexpected-error"],
+)
+async def test_failed_batch_marks_days_dirty(mongo, monkeypatch, error):
+    _partial_insert_many(monkeypatch, error)
+    buffer = _buffer()
+    await buffer.start()
+    await buffer.submit(_events(10))
+    await buffer.stop()
+
+    assert buffer.failed_total == 10
+    assert await Attendance.get_motor_collection().count_documents({}) == 5
+    assert await AttendanceRollupDirtyDay.get_motor_collection().find_one({"_id": DAY.isoformat()})
+
+    assert await AttendanceRollupService.refresh_dirty_days(DAY, DAY) == [DAY.isoformat()]
+    rollup = [document async for document in AttendanceDailyRollup.get_motor_collection().find()]
+    assert sum(document["checkins"] for document in rollup) == 5
+    assert await AttendanceRollupDirtyDay.get_motor_collection().count_documents({}) == 0
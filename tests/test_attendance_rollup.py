@@ -0,0 +1,150 @@
+# tests/test_attendance_rollup.py
+from datetime import date, datetime, timezone
+
+import pytest
+from bson import ObjectId
+
+from modules.attendances.models.attendance import Attendance
+from modules.attendances.models.attendance_rollup import (
+    AttendanceDailyRollup,
+    AttendanceRollupDirtyDay,
+)
+from modules.attendances.services import rollup_service
+from modules.attendances.services.rollup_service import AttendanceRollupService
+from modules.reports.services import report_service
+from utils.cache import TTLCache
+
+pytestmark = pytest.mark.anyio
+
+DAY = date(2024, 1, 2)
+OTHER_DAY = date(2024, 1, 5)
+
+
+def _event(user_id: ObjectId, day: date, hour: int, minute: int = 0) -> dict:
+    # Giờ UTC; các giờ 0-16 đều thuộc cùng ngày local (Asia/Ho_Chi_Minh)
+    return {
+        "_id": ObjectId(),
+        "user_id": user_id,
+        "timestamp": datetime(day.year, day.month, day.day, hour, minute, tzinfo=timezone.utc),
+    }
+
+
+async def _ingest(documents: list) -> None:
+    """Ghi check-in như write buffer: ghi dữ liệu gốc rồi cộng dồn rollup."""
+    await Attendance.get_motor_collection().insert_many(documents)
+    await AttendanceRollupService.apply_checkins(documents)
+
+
+async def _rollup(day: date) -> dict:
+    cursor = AttendanceDailyRollup.get_motor_collection().find({"day": day.isoformat()})
+    return {document["user_id"]: document async for document in cursor}
+
+
+async def _dirty_days() -> list:
+    cursor = AttendanceRollupDirtyDay.get_motor_collection().find({}, {"_id": 1})
+    return sorted([document["_id"] async for document in cursor])
+
+# -----------------------------
+# Dirty day refresh
+# -----------------------------
+async def test_refresh_recomputes_only_dirty_days(mongo):
+    user_a, user_b = ObjectId(), ObjectId()
+    await _ingest([_event(user_a, DAY, 1), _event(user_a, DAY, 10), _event(user_b, OTHER_DAY, 2)])
+
+    # Check-in có trong dữ liệu gốc nhưng không vào được rollup
+    await Attendance.get_motor_collection().insert_many([_event(user_b, DAY, 3), _event(user_b, OTHER_DAY, 4)])
+    await AttendanceRollupService.mark_dirty([DAY.isoformat()])
+
+    assert await AttendanceRollupService.refresh_dirty_days(DAY, OTHER_DAY) == [DAY.isoformat()]
+    assert await _dirty_days() == []
+
+    rollup = await _rollup(DAY)
+    assert rollup[user_a]["checkins"] == 2
+    assert rollup[user_a]["first_in"] == datetime(2024, 1, 2, 1)
+    assert rollup[user_a]["last_out"] == datetime(2024, 1, 2, 10)
+    assert rollup[user_b]["checkins"] == 1
+    # Ngày không dirty giữ nguyên giá trị incremental
+    assert (await _rollup(OTHER_DAY))[user_b]["checkins"] == 1
+
+
+async def test_refresh_removes_cells_without_checkins(mongo):
+    user_id = ObjectId()
+    await _ingest([_event(user_id, DAY, 1)])
+    await Attendance.get_motor_collection().delete_many({})
+    await AttendanceRollupService.mark_dirty([DAY.isoformat()])
+
+    await AttendanceRollupService.refresh_dirty_days(DAY, DAY)
+
+    assert await _rollup(DAY) == {}
+
+# -----------------------------
+# Increment during recompute
+# -----------------------------
+async def test_increment_during_recompute_is_kept(mongo, monkeypatch):
+    user_a, user_b = ObjectId(), ObjectId()
+    await _ingest([_event(user_a, DAY, 1), _event(user_a, DAY, 9)])
+
+    collection_type = type(AttendanceDailyRollup.get_motor_collection())
+    original = collection_type.bulk_write
+    late = [_event(user_a, DAY, 10), _event(user_b, DAY, 11)]
+    fired = []
+
+    async def bulk_write(self, operations, *args, **kwargs):
+        # Batch incremental ghi xen giữa lúc tính lại đọc dữ liệu gốc và lúc ghi rollup
+        if not fired and self.name == AttendanceDailyRollup.get_settings().name and any(
+            "checkins" in getattr(operation, "_doc", {}).get("$set", {}) for operation in operations
+        ):
+            fired.append(True)
+            await _ingest(late)
+        return await original(self, operations, *args, **kwargs)
+
+    monkeypatch.setattr(collection_type, "bulk_write", bulk_write)
+    await AttendanceRollupService.mark_dirty([DAY.isoformat()])
+    await AttendanceRollupService.refresh_dirty_days(DAY, DAY)
+
+    assert fired
+    rollup = await _rollup(DAY)
+    # Không bị $set của lần tính lại ghi đè
+    assert rollup[user_a]["checkins"] == 3
+    assert rollup[user_b]["checkins"] == 1
+    # Ngày được đánh dấu lại để tính lại lần sau
+    assert await _dirty_days() == [DAY.isoformat()]
+
+    monkeypatch.setattr(collection_type, "bulk_write", original)
+    await AttendanceRollupService.refresh_dirty_days(DAY, DAY)
+
+    rollup = await _rollup(DAY)
+    assert rollup[user_a]["checkins"] == 3
+    assert rollup[user_a]["last_out"] == datetime(2024, 1, 2, 10)
+    assert rollup[user_b]["checkins"] == 1
+    assert await _dirty_days() == []
+
+# -----------------------------
+# Summary cache invalidation
+# -----------------------------
+async def test_rollup_changes_invalidate_only_overlapping_summaries(mongo, monkeypatch):
+    cache = TTLCache(max_size=100, ttl_seconds=60)
+    monkeypatch.setattr(report_service, "_summary_cache", cache)
+    monkeypatch.setattr(rollup_service, "_listeners", [])
+    AttendanceRollupService.add_listener(report_service._invalidate_summary_days)
+
+    keys = {
+        "covers_day": ("2024-01-01", "2024-01-03", None),
+        "starts_on_day": ("2024-01-02", "2024-01-02", (str(ObjectId()),)),
+        "covers_other_day": ("2024-01-04", "2024-01-06", None),
+        "before": ("2023-12-01", "2024-01-01", None),
+    }
+    for key in keys.values():
+        cache.set(key, [])
+
+    await _ingest([_event(ObjectId(), DAY, 1)])
+
+    assert cache.peek(keys["covers_day"]) is None
+    assert cache.peek(keys["starts_on_day"]) is None
+    assert cache.peek(keys["covers_other_day"]) == []
+    assert cache.peek(keys["before"]) == []
+
+    await AttendanceRollupService.mark_dirty([OTHER_DAY.isoformat()])
+
+    assert cache.peek(keys["covers_other_day"]) is None
+    assert cache.peek(keys["before"]) == []
@@ -0,0 +1,52 @@
+# tests/test_health.py
+from pymongo import monitoring
+
+from core.health import ConnectionPoolStats
+
+PRIMARY = ("db-1", 27017)
+SECONDARY = ("db-2", 27017)
+
+
+def _check_out(stats: ConnectionPoolStats, address: tuple, connection_id: int) -> None:
+    stats.connection_created(monitoring.ConnectionCreatedEvent(address, connection_id))
+    stats.connection_check_out_started(monitoring.ConnectionCheckOutStartedEvent(address))
+    stats.connection_checked_out(monitoring.ConnectionCheckedOutEvent(address, connection_id, 0.001))
+
+
+def test_pool_counts_are_tracked_per_server():
+    stats = ConnectionPoolStats()
+    for connection_id in range(3):
+        _check_out(stats, PRIMARY, connection_id)
+    _check_out(stats, SECONDARY, 10)
+    stats.connection_check_out_started(monitoring.ConnectionCheckOutStartedEvent(SECONDARY))
+
+    snapshot = stats.snapshot()
+
+    assert snapshot["checked_out"] == 4
+    assert snapshot["waiting"] == 1
+    assert snapshot["pools"] == {
+        "db-1:27017": {"open": 3, "checked_out": 3, "waiting": 0},
+        "db-2:27017": {"open": 1, "checked_out": 1, "waiting": 1},
+    }
+
+
+def test_closed_idle_pool_is_forgotten():
+    stats = ConnectionPoolStats()
+    _check_out(stats, SECONDARY, 1)
+    stats.connection_checked_in(monitoring.ConnectionCheckedInEvent(SECONDARY, 1))
+    stats.connection_closed(monitoring.ConnectionClosedEvent(SECONDARY, 1, "poolClosed"))
+    stats.pool_closed(monitoring.PoolClosedEvent(SECONDARY))
+
+    assert stats.snapshot()["pools"] == {}
+
+
+def test_pool_is_exhausted_only_when_its_own_connections_are_used():
+    stats = ConnectionPoolStats()
+    for connection_id in range(2):
+        _check_out(stats, PRIMARY, connection_id)
+        _check_out(stats, SECONDARY, 10 + connection_id)
+    stats.connection_check_out_started(monitoring.ConnectionCheckOutStartedEvent(PRIMARY))
+
+    # Tổng 4 connection đang dùng nhưng mỗi pool chỉ dùng 2/3
+    assert stats.exhausted_pools(max_pool_size=3) == []
+    assert stats.exhausted_pools(max_pool_size=2) == ["db-1:27017"]
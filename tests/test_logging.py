@@ -0,0 +1,26 @@
+# tests/test_logging.py
+import logging
+
+from core.logging import RateLimitFilter
+
+
+def _records(name: str, count: int) -> list:
+    # Cùng một dòng code gọi log
+    return [
+        logging.LogRecord(name, logging.WARNING, "app.py", 10, "event", None, None)
+        for _ in range(count)
+    ]
+
+
+def test_rate_limit_applies_only_to_opted_in_loggers():
+    limiter = RateLimitFilter(rates={"FastAPI": 1.0}, burst=5)
+
+    assert sum(limiter.filter(record) for record in _records("FastAPI", 50)) == 5
+    assert all(limiter.filter(record) for record in _records("uvicorn.access", 50))
+    assert all(limiter.filter(record) for record in _records("FastAPI.requests", 50))
+
+
+def test_zero_rate_disables_limit():
+    limiter = RateLimitFilter(rates={"FastAPI": 0}, burst=1)
+
+    assert all(limiter.filter(record) for record in _records("FastAPI", 50))
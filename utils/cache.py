@@ -0,0 +1,105 @@
+# utils/cache.py
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Generic, Hashable, Optional, Tuple, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+# -----------------------------
+# TTL + LRU Cache
+# -----------------------------
+class TTLCache(Generic[K, V]):
+    """
+    Cache in-process có giới hạn kích thước (LRU) và thời gian sống (TTL).
+
+    Không dùng lock: mọi thao tác đều đồng bộ và chạy trên event loop thread.
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        ttl_seconds: float,
+        timer: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if max_size <= 0:
+            raise ValueError("max_size must be positive")
+        if ttl_seconds <= 0:
+            raise ValueError("ttl_seconds must be positive")
+
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._timer = timer
+        self._data: "OrderedDict[K, Tuple[float, V]]" = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: K) -> Optional[V]:
+        """Lấy value còn hạn, đồng thời đánh dấu key là mới dùng gần nhất."""
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, value = entry
+        if expires_at <= self._timer():
+            del self._data[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def peek(self, key: K) -> Optional[V]:
+        """Như `get` nhưng không đổi thứ tự LRU và không tính vào hit/miss."""
+        entry = self._data.get(key)
+        if entry is None or entry[0] <= self._timer():
+            return None
+        return entry[1]
+
+    def set(self, key: K, value: V, ttl_seconds: Optional[float] = None) -> None:
+        """Ghi value, loại phần tử ít dùng nhất khi vượt `max_size`."""
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        self._data[key] = (self._timer() + ttl, value)
+        self._data.move_to_end(key)
+
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def pop(self, key: K) -> Optional[V]:
+        """Xóa key khỏi cache (invalidate), trả về value cũ nếu có."""
+        entry = self._data.pop(key, None)
+        return entry[1] if entry is not None else None
+
+    def invalidate_where(self, predicate: Callable[[K], bool]) -> int:
+        """Xóa các key thỏa `predicate`, trả về số key đã xóa."""
+        keys = [key for key in self._data if predicate(key)]
+        for key in keys:
+            del self._data[key]
+        return len(keys)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def stats(self) -> Dict[str, float]:
+        """Số liệu hit/miss để theo dõi hiệu quả cache."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_ratio": (self.hits / lookups) if lookups else 0.0,
+        }
@@ -0,0 +1,92 @@
+# utils/dataloader.py
+import asyncio
+from typing import Awaitable, Callable, Dict, Generic, Hashable, Iterable, List, Mapping, Optional, Set, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+# Nhận danh sách key (không trùng), trả về key -> value; key không có trong kết quả là None
+BatchLoadFn = Callable[[List[K]], Awaitable[Mapping[K, V]]]
+
+# -----------------------------
+# Data Loader
+# -----------------------------
+class DataLoader(Generic[K, V]):
+    """
+    Gộp các lời gọi `load` trong cùng một vòng event loop thành một lần gọi
+    `batch_fn` (vd: một query `$in` thay cho N query theo id).
+
+    Key đầu tiên của một vòng lên lịch dispatch bằng `loop.call_soon`, nên mọi
+    `load` chạy trước khi event loop quay lại (cùng request hoặc các request
+    đang chạy song song) đi chung một batch. Loader không cache kết quả; cache
+    (nếu cần) đặt ở tầng gọi. Chỉ có tác dụng trong một process.
+    """
+
+    def __init__(self, batch_fn: BatchLoadFn[K, V], max_batch_size: int = 1000) -> None:
+        if max_batch_size <= 0:
+            raise ValueError("max_batch_size must be positive")
+
+        self._batch_fn = batch_fn
+        self._max_batch_size = max_batch_size
+        self._pending: Dict[K, "asyncio.Future[Optional[V]]"] = {}
+        self._dispatch_scheduled = False
+        self._tasks: Set["asyncio.Task[None]"] = set()
+
+    async def load(self, key: K) -> Optional[V]:
+        """Giá trị của `key` (None nếu không có)."""
+        return await asyncio.shield(self._future_for(key))
+
+    async def load_many(self, keys: Iterable[K]) -> List[Optional[V]]:
+        """Giá trị của nhiều key theo đúng thứ tự, trong cùng một batch."""
+        futures = [self._future_for(key) for key in keys]
+        if not futures:
+            return []
+        return list(await asyncio.shield(asyncio.gather(*futures)))
+
+    def _future_for(self, key: K) -> "asyncio.Future[Optional[V]]":
+        future = self._pending.get(key)
+        if future is not None:
+            return future
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        future.add_done_callback(_consume_exception)
+        self._pending[key] = future
+        if not self._dispatch_scheduled:
+            self._dispatch_scheduled = True
+            loop.call_soon(self._dispatch)
+        return future
+
+    def _dispatch(self) -> None:
+        pending, self._pending = self._pending, {}
+        self._dispatch_scheduled = False
+
+        keys = list(pending)
+        for start in range(0, len(keys), self._max_batch_size):
+            batch = {key: pending[key] for key in keys[start:start + self._max_batch_size]}
+            task = asyncio.ensure_future(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: Dict[K, "asyncio.Future[Optional[V]]"]) -> None:
+        try:
+            values = await self._batch_fn(list(batch))
+        except asyncio.CancelledError:
+            for future in batch.values():
+                future.cancel()
+            raise
+        except Exception as exc:
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(exc)
+            return
+
+        for key, future in batch.items():
+            if not future.done():
+                future.set_result(values.get(key))
+
+
+def _consume_exception(future: asyncio.Future) -> None:
+    # Đánh dấu exception đã được lấy khi mọi lời gọi chờ đều đã bị hủy
+    if not future.cancelled():
+        future.exception()
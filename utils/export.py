@@ -0,0 +1,227 @@
+# utils/export.py
+import asyncio
+import csv
+import io
+import json
+import os
+import tempfile
+from enum import Enum
+from typing import Any, AsyncIterable, AsyncIterator, List, Mapping, Sequence, Union
+
+DEFAULT_CHUNK_ROWS = 500
+FILE_READ_CHUNK_BYTES = 64 * 1024
+XLSX_MAX_ROWS = 1_048_576  # giới hạn số dòng của một sheet Excel (gồm header)
+
+Row = Union[Mapping[str, Any], Sequence[Any]]
+
+# -----------------------------
+# Export Format
+# -----------------------------
+class ExportFormat(str, Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+    XLSX = "xlsx"
+
+    @property
+    def media_type(self) -> str:
+        if self is ExportFormat.CSV:
+            return "text/csv; charset=utf-8"
+        if self is ExportFormat.XLSX:
+            return "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        return "application/x-ndjson"
+
+# -----------------------------
+# Streaming Encoders
+# -----------------------------
+async def iter_ndjson(
+    rows: AsyncIterable[Mapping[str, Any]],
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+) -> AsyncIterator[bytes]:
+    """Encode rows thành NDJSON, gom `chunk_rows` dòng cho mỗi chunk gửi đi."""
+    buffer: list[str] = []
+    async for row in rows:
+        buffer.append(json.dumps(row, ensure_ascii=False, default=str))
+        if len(buffer) >= chunk_rows:
+            yield ("\n".join(buffer) + "\n").encode("utf-8")
+            buffer.clear()
+
+    if buffer:
+        yield ("\n".join(buffer) + "\n").encode("utf-8")
+
+
+async def iter_csv(
+    rows: AsyncIterable[Mapping[str, Any]],
+    fieldnames: Sequence[str],
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    bom: bool = True,
+) -> AsyncIterator[bytes]:
+    """
+    Encode rows thành CSV, header được gửi ngay trước khi có dòng dữ liệu đầu tiên.
+
+    `bom=True` thêm UTF-8 BOM để Excel đọc đúng tiếng Việt có dấu.
+    """
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fieldnames, extrasaction="ignore")
+    writer.writeheader()
+
+    prefix = "\ufeff" if bom else ""
+    yield (prefix + buffer.getvalue()).encode("utf-8")
+    buffer.seek(0)
+    buffer.truncate()
+
+    pending = 0
+    async for row in rows:
+        writer.writerow(row)
+        pending += 1
+        if pending >= chunk_rows:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+
+    if pending:
+        yield buffer.getvalue().encode("utf-8")
+
+
+async def iter_xlsx(
+    rows: AsyncIterable[Row],
+    fieldnames: Sequence[str],
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+) -> AsyncIterator[bytes]:
+    """
+    Encode rows thành XLSX qua file tạm rồi gửi file theo từng chunk.
+
+    XLSX là file zip nên chỉ gửi được khi workbook đã đóng; byte đầu tiên đi ra
+    sau khi ghi xong nhưng bộ nhớ vẫn chỉ giữ một chunk dòng.
+    """
+    fd, path = tempfile.mkstemp(suffix=".xlsx")
+    os.close(fd)
+    try:
+        await write_rows_to_file(rows, path, ExportFormat.XLSX, fieldnames, chunk_rows=chunk_rows)
+        handle = await asyncio.to_thread(open, path, "rb")
+        try:
+            while True:
+                chunk = await asyncio.to_thread(handle.read, FILE_READ_CHUNK_BYTES)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            await asyncio.to_thread(handle.close)
+    finally:
+        await asyncio.to_thread(_remove_quietly, path)
+
+
+def stream_rows(
+    rows: AsyncIterable[Mapping[str, Any]],
+    export_format: ExportFormat,
+    fieldnames: Sequence[str],
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+) -> AsyncIterator[bytes]:
+    """Chọn encoder theo định dạng export."""
+    if export_format is ExportFormat.CSV:
+        return iter_csv(rows, fieldnames, chunk_rows=chunk_rows)
+    if export_format is ExportFormat.XLSX:
+        return iter_xlsx(rows, fieldnames, chunk_rows=chunk_rows)
+    return iter_ndjson(rows, chunk_rows=chunk_rows)
+
+# -----------------------------
+# File Writers
+# -----------------------------
+class _CsvFileWriter:
+    """Ghi CSV (UTF-8 BOM cho Excel) vào file, từng chunk một."""
+
+    def __init__(self, path: str, fieldnames: Sequence[str]) -> None:
+        self._handle = open(path, "w", newline="", encoding="utf-8-sig")
+        self._writer = csv.writer(self._handle)
+        self._writer.writerow(fieldnames)
+
+    def write_rows(self, rows: List[Sequence[Any]]) -> None:
+        self._writer.writerows(rows)
+
+    def close(self) -> None:
+        self._handle.close()
+
+
+class _XlsxFileWriter:
+    """
+    Ghi XLSX bằng xlsxwriter ở chế độ `constant_memory`: mỗi dòng được flush
+    xuống file tạm ngay khi sang dòng mới nên bộ nhớ không tăng theo số dòng.
+    """
+
+    def __init__(self, path: str, fieldnames: Sequence[str]) -> None:
+        try:
+            import xlsxwriter
+        except ImportError as exc:  # pragma: no cover - xlsxwriter là optional
+            raise RuntimeError("XLSX export requires the 'xlsxwriter' package") from exc
+
+        self._workbook = xlsxwriter.Workbook(path, {"constant_memory": True})
+        self._sheet = self._workbook.add_worksheet()
+        self._sheet.write_row(0, 0, fieldnames, self._workbook.add_format({"bold": True}))
+        self._sheet.freeze_panes(1, 0)
+        self._row = 1
+
+    def write_rows(self, rows: List[Sequence[Any]]) -> None:
+        if self._row + len(rows) > XLSX_MAX_ROWS:
+            raise ValueError(f"XLSX sheet cannot hold more than {XLSX_MAX_ROWS} rows")
+        for values in rows:
+            self._sheet.write_row(self._row, 0, values)
+            self._row += 1
+
+    def close(self) -> None:
+        self._workbook.close()
+
+
+async def write_rows_to_file(
+    rows: AsyncIterable[Row],
+    path: str,
+    export_format: ExportFormat,
+    fieldnames: Sequence[str],
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+) -> int:
+    """
+    Ghi rows ra file CSV hoặc XLSX, trả về số dòng dữ liệu đã ghi.
+
+    Rows được gom theo `chunk_rows` và encode trong thread pool nên event loop
+    không bị chặn; bộ nhớ chỉ giữ một chunk. File được ghi vào `<path>.part`
+    rồi rename nên người đọc không bao giờ thấy file dở dang.
+    """
+    if export_format is ExportFormat.CSV:
+        writer_class = _CsvFileWriter
+    elif export_format is ExportFormat.XLSX:
+        writer_class = _XlsxFileWriter
+    else:
+        raise ValueError(f"Unsupported file format: {export_format.value}")
+
+    tmp_path = f"{path}.part"
+    writer = await asyncio.to_thread(writer_class, tmp_path, fieldnames)
+    written = 0
+    try:
+        try:
+            chunk: List[Sequence[Any]] = []
+            async for row in rows:
+                chunk.append(
+                    [row.get(name) for name in fieldnames] if isinstance(row, Mapping) else row
+                )
+                if len(chunk) >= chunk_rows:
+                    await asyncio.to_thread(writer.write_rows, chunk)
+                    written += len(chunk)
+                    chunk = []
+
+            if chunk:
+                await asyncio.to_thread(writer.write_rows, chunk)
+                written += len(chunk)
+        finally:
+            await asyncio.to_thread(writer.close)
+        await asyncio.to_thread(os.replace, tmp_path, path)
+    except BaseException:
+        await asyncio.to_thread(_remove_quietly, tmp_path)
+        raise
+
+    return written
+
+
+def _remove_quietly(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,146 @@
+# utils/pagination.py
+import base64
+import binascii
+import struct
+from datetime import datetime, timedelta, timezone
+from typing import Any, List, Optional, Tuple, Type, TypeVar
+
+from beanie import Document
+from pydantic import BaseModel
+from bson import ObjectId
+from bson.errors import InvalidId
+from core.read_preference import analytics_to_list
+from utils.time import ensure_utc
+
+DEFAULT_PAGE_LIMIT = 50
+MAX_PAGE_LIMIT = 500
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+DocumentT = TypeVar("DocumentT", bound=Document)
+ItemT = TypeVar("ItemT", bound=BaseModel)
+
+# -----------------------------
+# Errors
+# -----------------------------
+class InvalidCursorError(ValueError):
+    """Cursor không hợp lệ (sai định dạng hoặc bị sửa đổi)."""
+
+# -----------------------------
+# Cursor Encoding
+# -----------------------------
+def encode_cursor(last_id: ObjectId) -> str:
+    """Mã hóa _id của phần tử cuối trang thành cursor opaque."""
+    return base64.urlsafe_b64encode(ObjectId(last_id).binary).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> ObjectId:
+    """Giải mã cursor opaque về _id tương ứng."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return ObjectId(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (binascii.Error, InvalidId, TypeError, ValueError, UnicodeEncodeError) as exc:
+        raise InvalidCursorError(f"Invalid cursor: {cursor!r}") from exc
+
+def encode_time_cursor(timestamp: datetime, last_id: ObjectId) -> str:
+    """Mã hóa (timestamp, _id) của phần tử cuối trang (timestamp theo mili giây như Mongo)."""
+    millis = (ensure_utc(timestamp) - _EPOCH) // timedelta(milliseconds=1)
+    raw = struct.pack(">q", millis) + ObjectId(last_id).binary
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_time_cursor(cursor: str) -> Tuple[datetime, ObjectId]:
+    """Giải mã cursor của `encode_time_cursor`."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode("ascii"))
+        if len(raw) != 20:
+            raise ValueError("unexpected cursor length")
+        (millis,) = struct.unpack(">q", raw[:8])
+        return _EPOCH + timedelta(milliseconds=millis), ObjectId(raw[8:])
+    except (binascii.Error, InvalidId, TypeError, ValueError, OverflowError, UnicodeEncodeError) as exc:
+        raise InvalidCursorError(f"Invalid cursor: {cursor!r}") from exc
+
+# -----------------------------
+# Keyset Pagination
+# -----------------------------
+async def paginate_by_id(
+    document_model: Type[DocumentT],
+    *filters: Any,
+    limit: int = DEFAULT_PAGE_LIMIT,
+    cursor: Optional[str] = None,
+    projection_model: Optional[Type[ItemT]] = None,
+    analytics: bool = False,
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    Phân trang keyset theo `_id` tăng dần.
+
+    Mỗi trang chỉ là một range scan trên index `_id` (`_id > cursor`) nên chi phí
+    không phụ thuộc vào vị trí trang, khác với skip/offset. Lấy dư 1 phần tử để
+    biết còn trang sau hay không; `next_cursor` là None khi đã hết dữ liệu.
+
+    `projection_model` (phải có field `id`) giới hạn các field Mongo trả về.
+    `analytics=True` đọc theo MONGO_ANALYTICS_READ_PREFERENCE (có thể là secondary).
+    """
+    limit = max(1, min(limit, MAX_PAGE_LIMIT))
+
+    criteria = list(filters)
+    if cursor:
+        criteria.append({"_id": {"$gt": decode_cursor(cursor)}})
+
+    query = (
+        document_model.find(*criteria, projection_model=projection_model)
+        .sort("+_id")
+        .limit(limit + 1)
+    )
+    items = await (analytics_to_list(query) if analytics else query.to_list())
+
+    next_cursor: Optional[str] = None
+    if len(items) > limit:
+        items = items[:limit]
+        next_cursor = encode_cursor(items[-1].id)
+
+    return items, next_cursor
+
+
+async def paginate_by_time(
+    document_model: Type[DocumentT],
+    *filters: Any,
+    time_field: str = "timestamp",
+    limit: int = DEFAULT_PAGE_LIMIT,
+    cursor: Optional[str] = None,
+    projection_model: Optional[Type[ItemT]] = None,
+    analytics: bool = False,
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    Phân trang keyset theo (`time_field`, `_id`) tăng dần, cho collection không
+    có index `_id` hữu ích (vd: time-series) nhưng có index trên `time_field`.
+
+    `_id` chỉ dùng để phân định các phần tử cùng timestamp, nên mỗi trang là
+    range scan `time_field >= timestamp của cursor`. Tham số còn lại như
+    `paginate_by_id`; phần tử trả về phải có field `id` và `time_field`.
+    """
+    limit = max(1, min(limit, MAX_PAGE_LIMIT))
+
+    criteria = list(filters)
+    if cursor:
+        last_time, last_id = decode_time_cursor(cursor)
+        criteria.append({time_field: {"$gte": last_time}})
+        criteria.append({"$or": [
+            {time_field: {"$gt": last_time}},
+            {time_field: last_time, "_id": {"$gt": last_id}},
+        ]})
+
+    query = (
+        document_model.find(*criteria, projection_model=projection_model)
+        .sort([(time_field, 1), ("_id", 1)])
+        .limit(limit + 1)
+    )
+    items = await (analytics_to_list(query) if analytics else query.to_list())
+
+    next_cursor: Optional[str] = None
+    if len(items) > limit:
+        items = items[:limit]
+        next_cursor = encode_time_cursor(getattr(items[-1], time_field), items[-1].id)
+
+    return items, next_cursor
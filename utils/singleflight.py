@@ -0,0 +1,49 @@
+# utils/singleflight.py
+import asyncio
+from typing import Awaitable, Callable, Dict, Generic, Hashable, Tuple, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+T = TypeVar("T")
+
+# -----------------------------
+# Single Flight
+# -----------------------------
+class SingleFlight(Generic[K, T]):
+    """
+    Gộp các lời gọi đồng thời có cùng key thành một lần thực thi.
+
+    Lời gọi đầu tiên (leader) chạy `fn`; các lời gọi trùng key trong lúc đó chờ
+    cùng kết quả hoặc cùng exception. Key được giải phóng ngay khi xong, nên lời
+    gọi đến sau sẽ chạy lại từ đầu. Chỉ có tác dụng trong một process.
+    """
+
+    def __init__(self) -> None:
+        self._calls: Dict[K, "asyncio.Task[T]"] = {}
+
+    def in_flight(self) -> int:
+        """Số key đang được thực thi."""
+        return len(self._calls)
+
+    async def do(self, key: K, fn: Callable[[], Awaitable[T]]) -> Tuple[T, bool]:
+        """
+        Thực thi `fn` cho `key`, trả về (kết quả, shared).
+
+        `shared=True` nghĩa là lời gọi này nhận lại kết quả của leader. `fn` chạy
+        trong task riêng nên leader bị hủy (client ngắt kết nối) không làm hỏng
+        kết quả của các lời gọi đang chờ.
+        """
+        task = self._calls.get(key)
+        if task is not None:
+            return await asyncio.shield(task), True
+
+        task = asyncio.ensure_future(fn())
+        self._calls[key] = task
+        task.add_done_callback(lambda done: self._release(key, done))
+        return await asyncio.shield(task), False
+
+    def _release(self, key: K, task: "asyncio.Task[T]") -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # Đánh dấu exception đã được lấy khi mọi lời gọi đều đã bị hủy
+        if not task.cancelled():
+            task.exception()
@@ -0,0 +1,74 @@
+# utils/time.py
+from datetime import date, datetime, time, timedelta, timezone
+from functools import lru_cache
+from typing import Tuple
+from zoneinfo import ZoneInfo
+
+import numpy as np
+
+
+def utc_now() -> datetime:
+    """Thời điểm hiện tại (UTC, timezone-aware)."""
+    return datetime.now(timezone.utc)
+
+
+def ensure_utc(value: datetime) -> datetime:
+    """Chuẩn hóa datetime về UTC; datetime naive được coi là UTC."""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+@lru_cache(maxsize=None)
+def get_timezone(name: str) -> ZoneInfo:
+    """ZoneInfo theo tên (cache để không đọc lại tzdata)."""
+    return ZoneInfo(name)
+
+
+def local_day_bounds(day: date, tz: ZoneInfo) -> Tuple[datetime, datetime]:
+    """Khoảng [start, end) theo UTC của một ngày lịch ở múi giờ `tz`."""
+    start = datetime.combine(day, time.min, tzinfo=tz)
+    end = datetime.combine(day + timedelta(days=1), time.min, tzinfo=tz)
+    return start.astimezone(timezone.utc), end.astimezone(timezone.utc)
+
+
+def local_day_starts(start_day: date, end_day: date, tz: ZoneInfo) -> np.ndarray:
+    """
+    Mốc bắt đầu (epoch giây UTC) của từng ngày local trong [start_day, end_day],
+    kèm mốc kết thúc của ngày cuối: mảng int64 dài (số ngày + 1).
+    Tính từng ngày nên vẫn đúng với múi giờ có DST.
+    """
+    days = (end_day - start_day).days + 1
+    return np.array(
+        [
+            int(datetime.combine(start_day + timedelta(days=offset), time.min, tzinfo=tz).timestamp())
+            for offset in range(days + 1)
+        ],
+        dtype=np.int64,
+    )
+
+
+def local_times(start_day: date, end_day: date, at: time, tz: ZoneInfo) -> np.ndarray:
+    """
+    Epoch giây UTC của giờ local `at` trong từng ngày của [start_day, end_day]
+    (mảng int64 dài bằng số ngày). Tính từng ngày như `local_day_starts` nên
+    ngày chuyển DST không bị lệch.
+    """
+    days = (end_day - start_day).days + 1
+    return np.array(
+        [
+            int(datetime.combine(start_day + timedelta(days=offset), at, tzinfo=tz).timestamp())
+            for offset in range(days)
+        ],
+        dtype=np.int64,
+    )
+
+
+def bucket_by_local_day(timestamps: np.ndarray, day_starts: np.ndarray) -> np.ndarray:
+    """
+    Chỉ số ngày local (0..n-1) cho mỗi timestamp (epoch giây), -1 nếu nằm ngoài
+    khoảng. Vectorized bằng searchsorted trên các mốc từ `local_day_starts`.
+    """
+    index = np.searchsorted(day_starts, timestamps, side="right") - 1
+    index[(index < 0) | (index >= len(day_starts) - 1)] = -1
+    return index